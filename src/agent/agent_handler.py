@@ -1,36 +1,63 @@
 # src/agent/agent_handler.py
+import asyncio
 import logging
+import threading
 import traceback
 from pathlib import Path
 
 from langchain.agents import AgentExecutor
 from langchain.agents.format_scratchpad import format_log_to_str
+from langchain.agents.format_scratchpad.openai_tools import format_to_openai_tool_messages
 from langchain.agents.output_parsers import ReActSingleInputOutputParser
-from langchain.memory import ConversationBufferMemory
-from langchain_core.prompts import PromptTemplate
+from langchain.agents.output_parsers.openai_tools import OpenAIToolsAgentOutputParser
+from langchain.tools.render import format_tool_to_openai_tool
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
 from langchain_openai import ChatOpenAI
 
+from src.agent.parallel_tools import with_timeouts
+from src.agent.session_memory import SessionMemory
+from src.agent.streaming import FinalAnswerStreamHandler
 from src.tools.setup import ToolSetup
 from src.utils.config import load_config, setup_environment_variables
+from src.utils.state import get_state_backend
 
 logger = logging.getLogger(__name__)
 
 # Global variable to store the agent handler instance
 _agent_instance = None
 
+# Responses returned instead of an answer; never worth caching
+UNPROCESSED_RESPONSE = "Unable to process your request."
+ERROR_RESPONSE = "An error occurred."
+FAILURE_RESPONSES = (UNPROCESSED_RESPONSE, ERROR_RESPONSE)
+
 
 class AgentHandler:
     def __init__(self):
+        # Event loop running the async agent for the synchronous entry points in 'parallel' mode
+        self._loop = None
+        self._loop_lock = threading.Lock()
         self._initialize()
 
     def _initialize(self):
         self.CONFIG = load_config()
         setup_environment_variables(self.CONFIG)
-        self.llm = ChatOpenAI(model=self.CONFIG["OpenAI"]["model"], temperature=self.CONFIG["OpenAI"]["llm_temp"])
-        self.memory = ConversationBufferMemory(memory_key="chat_history")
+        # Streaming lets callbacks see the tokens as they arrive; invoke still returns whole messages.
+        self.llm = ChatOpenAI(
+            model=self.CONFIG["OpenAI"]["model"],
+            temperature=self.CONFIG["OpenAI"]["llm_temp"],
+            streaming=True
+        )
+        self.sessions = SessionMemory.from_config(self.CONFIG, backend=get_state_backend(), llm=self.llm)
         self.tools = ToolSetup.setup_tools()
+        self.mode = self.CONFIG.get("Agent", {}).get("mode", "react")
         self._load_prompt_templates()
-        self.agent_executor = self._initialize_agent_executor()
+        if self.mode == "parallel":
+            self.agent_executor = self._initialize_parallel_agent_executor()
+        elif self.mode == "react":
+            self.agent_executor = self._initialize_agent_executor()
+        else:
+            raise ValueError(f"Unsupported agent mode: {self.mode}")
 
     def _load_prompt_templates(self):
         """Load templates for the ZeroShotAgent's prompts."""
@@ -86,12 +113,12 @@ class AgentHandler:
         # Bind the llm with a stop condition
         llm_with_stop = self.llm.bind(stop=["\nObservation"])
 
-        # Correctly retrieving chat history from memory
+        # The chat history of the session is rendered by the caller and passed in with the input
         react_chain = (
             {
                 "input": lambda x: x["input"],
                 "agent_scratchpad": lambda x: format_log_to_str(x["intermediate_steps"]),
-                "chat_history": lambda x: self.memory.load_memory_variables(x).get('chat_history', '')  # Correct retrieval of chat history
+                "chat_history": lambda x: x.get("chat_history", "")
             }
             | prompt
             | llm_with_stop
@@ -100,22 +127,164 @@ class AgentHandler:
 
         return AgentExecutor(agent=react_chain, tools=self.tools, verbose=True)
 
-    def chat_with_agent(self, user_input: str):
-        try:
-            response = self.agent_executor.invoke({'input': user_input})
+    def _initialize_parallel_agent_executor(self):
+        """
+        Builds an agent using OpenAI tool calling, which can request several tool calls in one LLM step.
+
+        The async executor runs the calls of a step concurrently and hands all their
+        observations to the next LLM call, so searching the web and the TechDocs takes
+        one round trip instead of two. Every call is bounded by its `Agent.tool_timeout`.
+        Tool call deltas are not merged correctly when streamed by this langchain
+        version, so the agent's LLM does not stream and answers arrive whole.
+        """
+        tools = with_timeouts(self.tools, self.CONFIG)
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", self.PROMPT_TEMPLATES["parallel_prefix"]),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ])
+        llm = ChatOpenAI(
+            model=self.CONFIG["OpenAI"]["model"],
+            temperature=self.CONFIG["OpenAI"]["llm_temp"]
+        )
+        llm_with_tools = llm.bind(tools=[format_tool_to_openai_tool(tool) for tool in tools])
+
+        tools_chain = (
+            {
+                "input": lambda x: x["input"],
+                "agent_scratchpad": lambda x: format_to_openai_tool_messages(x["intermediate_steps"]),
+                "chat_history": lambda x: x.get("chat_history", "")
+            }
+            | prompt
+            | llm_with_tools
+            | OpenAIToolsAgentOutputParser()
+        )
+
+        return AgentExecutor(agent=tools_chain, tools=tools, verbose=True)
+
+    def _agent_input(self, user_input: str, session_id: str = None) -> dict:
+        history = self.sessions.get_history(session_id) if session_id else ""
+        return {'input': user_input, 'chat_history': history}
+
+    async def _aagent_input(self, user_input: str, session_id: str = None) -> dict:
+        history = await self.sessions.aget_history(session_id) if session_id else ""
+        return {'input': user_input, 'chat_history': history}
+
+    def _run_async(self, coroutine):
+        """
+        Runs a coroutine on the background event loop of the handler and returns its result.
+
+        The loop is created once and kept, so the async clients bound to it are reused
+        across calls.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="agent-loop", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
 
-            if 'output' in response and hasattr(response['output'], 'response'):
-                chat_response = response['output'].response  # Extract the response text
-            else:
-                chat_response = "Unable to process your request."
+    def chat_with_agent(self, user_input: str, session_id: str = None):
+        """
+        Answers a user input with the agent.
+
+        In 'parallel' mode the run goes through achat_with_agent on the background loop
+        of the handler, since only the async executor runs the tool calls of a step
+        concurrently; the sync executor would run them one after another.
+        """
+        if self.mode == "parallel":
+            return self._run_async(self.achat_with_agent(user_input, session_id))
+        try:
+            response = self.agent_executor.invoke(self._agent_input(user_input, session_id))
+            chat_response = self._chat_response(user_input, response)
+            if session_id and chat_response != UNPROCESSED_RESPONSE:
+                self.sessions.save_turn(session_id, user_input, chat_response)
+            return chat_response
+        except Exception as e:
+            tb_str = traceback.format_exception(None, e, e.__traceback__)
+            logging.error(f"Chat error: {''.join(tb_str)}")
+            return ERROR_RESPONSE
 
-            # Log the concise chat response
-            logging.info(f"User input: '{user_input}' | Chatbot response: '{chat_response}'")
+    async def achat_with_agent(self, user_input: str, session_id: str = None):
+        """Async variant of chat_with_agent; the agent, its tools and Qdrant are all awaited."""
+        try:
+            response = await self.agent_executor.ainvoke(await self._aagent_input(user_input, session_id))
+            chat_response = self._chat_response(user_input, response)
+            if session_id and chat_response != UNPROCESSED_RESPONSE:
+                await self.sessions.asave_turn(session_id, user_input, chat_response)
             return chat_response
         except Exception as e:
             tb_str = traceback.format_exception(None, e, e.__traceback__)
             logging.error(f"Chat error: {''.join(tb_str)}")
-            return "An error occurred."
+            return ERROR_RESPONSE
+
+    def _chat_response(self, user_input: str, response: dict) -> str:
+        # Tool answers are llama_index Responses, direct LLM answers are plain strings.
+        chat_response = self._response_text(response.get('output')) or UNPROCESSED_RESPONSE
+
+        # Log the concise chat response
+        logging.info(f"User input: '{user_input}' | Chatbot response: '{chat_response}'")
+        return chat_response
+
+    async def astream_chat(self, user_input: str, session_id: str = None):
+        """
+        Runs the agent and yields its progress as events, as soon as each is produced.
+
+        Args:
+            user_input (str): The user input.
+            session_id (str): Optional; the session whose history is given to the agent
+                              and which records the turn.
+
+        Yields:
+            dict: Events with a "type" of:
+                - "action": a tool call, with the tool name and its input;
+                - "observation": the output of a tool call;
+                - "token": a piece of the final answer, as the LLM writes it (not sent in the
+                  'parallel' agent mode, whose LLM does not stream);
+                - "final": the complete answer, in "response";
+                - "error": the run failed, with the error response in "response".
+        """
+        queue = asyncio.Queue()
+        done = object()
+
+        async def run_agent():
+            try:
+                async for chunk in self.agent_executor.astream(
+                    await self._aagent_input(user_input, session_id), config={"callbacks": [FinalAnswerStreamHandler(queue)]}
+                ):
+                    for action in chunk.get("actions", []):
+                        await queue.put({"type": "action", "tool": action.tool, "tool_input": action.tool_input})
+                    for step in chunk.get("steps", []):
+                        await queue.put({"type": "observation", "tool": step.action.tool,
+                                         "observation": self._response_text(step.observation)})
+                    if "output" in chunk:
+                        chat_response = self._response_text(chunk["output"]) or UNPROCESSED_RESPONSE
+                        logging.info(f"User input: '{user_input}' | Chatbot response: '{chat_response}'")
+                        await queue.put({"type": "final", "response": chat_response})
+                        if session_id and chat_response != UNPROCESSED_RESPONSE:
+                            await self.sessions.asave_turn(session_id, user_input, chat_response)
+            except Exception as e:
+                tb_str = traceback.format_exception(None, e, e.__traceback__)
+                logging.error(f"Chat error: {''.join(tb_str)}")
+                await queue.put({"type": "error", "response": ERROR_RESPONSE})
+            finally:
+                await queue.put(done)
+
+        task = asyncio.create_task(run_agent())
+        try:
+            while (event := await queue.get()) is not done:
+                yield event
+        finally:
+            # Stop the agent when the client goes away before the end of the stream.
+            task.cancel()
+
+    @staticmethod
+    def _response_text(output) -> str:
+        """Returns the text of a tool or agent output: a llama_index Response or a plain string."""
+        if output is None:
+            return ""
+        if hasattr(output, 'response'):
+            return output.response
+        return output if isinstance(output, str) else str(output)
 
 
 def get_agent_handler():
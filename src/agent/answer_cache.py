@@ -0,0 +1,192 @@
+# src/agent/answer_cache.py
+import asyncio
+import logging
+import time
+import uuid
+
+from qdrant_client.http import models as rest
+
+from src.utils.resources import ResourceRegistry, get_resource_registry
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the answer cache instance
+_answer_cache_instance = None
+
+
+class AnswerCache:
+    """
+    Semantic cache of agent answers, stored in a dedicated Qdrant collection.
+
+    Each incoming question is embedded with the shared embedding model (through the
+    query embedding cache) and compared with the questions answered before. An answer
+    is reused when the cosine similarity is above the threshold and it is younger
+    than the TTL. The expired answers are deleted by the stores, at most once every
+    `purge_interval_seconds`. The cache is emptied whenever one of the collections it
+    depends on is re-ingested, since its answers may be stale.
+
+    Attributes:
+    - collection (str): Name of the Qdrant collection holding the answers.
+    - similarity_threshold (float): Minimum cosine similarity for a hit.
+    - ttl_seconds (int): Maximum age of a reusable answer.
+    - source_collections (list): Collections whose re-ingestion invalidates the cache.
+    - purge_interval_seconds (int): Minimum time between two purges of the expired answers.
+    """
+
+    def __init__(self, resources: ResourceRegistry, collection: str = "answer_cache",
+                 similarity_threshold: float = 0.95, ttl_seconds: int = 86400, source_collections: list = None,
+                 purge_interval_seconds: int = 3600):
+        self.resources = resources
+        self.collection = collection
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.source_collections = source_collections or []
+        self.purge_interval_seconds = purge_interval_seconds
+        self._collection_ready = False
+        self._last_purge = 0.0
+
+    def _ensure_collection(self):
+        if self._collection_ready:
+            return
+        client = self.resources.client
+        try:
+            client.get_collection(self.collection)
+        except Exception:
+            client.create_collection(
+                collection_name=self.collection,
+                vectors_config=rest.VectorParams(
+                    size=int(self.resources.CONFIG["Qdrant"]["vector_size"]),
+                    distance=rest.Distance.COSINE
+                )
+            )
+            client.create_payload_index(self.collection, "created_at", rest.PayloadSchemaType.FLOAT)
+        self._collection_ready = True
+
+    def _fresh_filter(self) -> rest.Filter:
+        return rest.Filter(must=[
+            rest.FieldCondition(key="created_at", range=rest.Range(gte=time.time() - self.ttl_seconds))
+        ])
+
+    def _expired_selector(self) -> rest.FilterSelector:
+        return rest.FilterSelector(filter=rest.Filter(must=[
+            rest.FieldCondition(key="created_at", range=rest.Range(lt=time.time() - self.ttl_seconds))
+        ]))
+
+    def _purge_due(self) -> bool:
+        now = time.time()
+        if now - self._last_purge < self.purge_interval_seconds:
+            return False
+        self._last_purge = now
+        return True
+
+    @staticmethod
+    def _point(user_input: str, answer: str, vector: list) -> rest.PointStruct:
+        return rest.PointStruct(
+            id=str(uuid.uuid4()),
+            vector=vector,
+            payload={"question": user_input, "answer": answer, "created_at": time.time()}
+        )
+
+    def _hit_answer(self, user_input: str, hits: list):
+        if not hits:
+            return None
+        logger.info(f"Answer cache hit (score {hits[0].score:.3f}) for '{user_input}'.")
+        return hits[0].payload["answer"]
+
+    def lookup(self, user_input: str):
+        """
+        Returns a previous answer to a semantically equivalent question, or None.
+
+        Args:
+            user_input (str): The incoming question.
+        """
+        self._ensure_collection()
+        hits = self.resources.client.search(
+            collection_name=self.collection,
+            query_vector=self.resources.get_query_embedding(user_input),
+            query_filter=self._fresh_filter(),
+            limit=1,
+            score_threshold=self.similarity_threshold,
+            with_payload=True
+        )
+        return self._hit_answer(user_input, hits)
+
+    async def alookup(self, user_input: str):
+        """Async variant of lookup, using the async Qdrant client."""
+        await asyncio.to_thread(self._ensure_collection)
+        hits = await self.resources.aclient.search(
+            collection_name=self.collection,
+            query_vector=await self.resources.aget_query_embedding(user_input),
+            query_filter=self._fresh_filter(),
+            limit=1,
+            score_threshold=self.similarity_threshold,
+            with_payload=True
+        )
+        return self._hit_answer(user_input, hits)
+
+    def store(self, user_input: str, answer: str):
+        """Records the answer given to a question."""
+        self._ensure_collection()
+        self.resources.client.upsert(
+            collection_name=self.collection,
+            points=[self._point(user_input, answer, self.resources.get_query_embedding(user_input))]
+        )
+        if self._purge_due():
+            self.purge_expired()
+
+    async def astore(self, user_input: str, answer: str):
+        """Async variant of store, using the async Qdrant client."""
+        await asyncio.to_thread(self._ensure_collection)
+        await self.resources.aclient.upsert(
+            collection_name=self.collection,
+            points=[self._point(user_input, answer, await self.resources.aget_query_embedding(user_input))]
+        )
+        if self._purge_due():
+            await self.resources.aclient.delete(collection_name=self.collection, points_selector=self._expired_selector())
+
+    def purge_expired(self):
+        """Deletes the answers older than the TTL, which lookups no longer return."""
+        self._ensure_collection()
+        self.resources.client.delete(collection_name=self.collection, points_selector=self._expired_selector())
+
+    def invalidate(self, collection: str = None):
+        """
+        Deletes every cached answer.
+
+        The points are deleted rather than the collection, which the other API
+        workers keep using without checking that it still exists.
+
+        Args:
+            collection (str): The collection that changed; the cache is only emptied
+                              when it is one of the source collections. None always empties it.
+        """
+        if collection is not None and collection not in self.source_collections:
+            return
+        self._ensure_collection()
+        self.resources.client.delete(
+            collection_name=self.collection,
+            points_selector=rest.FilterSelector(filter=rest.Filter(must=[
+                rest.FieldCondition(key="created_at", range=rest.Range(lte=time.time()))
+            ])),
+            wait=True
+        )
+        logger.info(f"Answer cache invalidated after changes to '{collection}'.")
+
+
+def get_answer_cache():
+    """Singleton-like accessor for the AnswerCache; returns None when it is disabled in config.yml."""
+    global _answer_cache_instance
+    if _answer_cache_instance is None:
+        resources = get_resource_registry()
+        cache_config = resources.CONFIG.get("Answer_Cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        _answer_cache_instance = AnswerCache(
+            resources,
+            collection=cache_config.get("collection", "answer_cache"),
+            similarity_threshold=cache_config.get("similarity_threshold", 0.95),
+            ttl_seconds=cache_config.get("ttl_seconds", 86400),
+            source_collections=cache_config.get("invalidate_on", ["techdocs"]),
+            purge_interval_seconds=cache_config.get("purge_interval_seconds", 3600)
+        )
+    return _answer_cache_instance
@@ -0,0 +1,89 @@
+# src/agent/parallel_tools.py
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+# Runs the synchronous tool calls, so a call can be abandoned once its timeout expires
+_tool_executor = ThreadPoolExecutor(thread_name_prefix="agent-tool")
+
+
+class TimeoutTool(BaseTool):
+    """
+    Wrapper giving a tool a time limit, for agents running several tool calls at once.
+
+    When a call takes longer than `timeout` seconds, or fails, its observation says
+    so instead of raising: the other calls of the same step keep their results and the
+    LLM answers with what it got. The wrapper never returns directly, so every
+    observation of a step goes back to the LLM.
+
+    Attributes:
+    - tool (BaseTool): The wrapped tool.
+    - timeout (float): Seconds a call may take.
+    """
+
+    tool: BaseTool
+    timeout: float
+
+    @classmethod
+    def wrap(cls, tool: BaseTool, timeout: float) -> "TimeoutTool":
+        return cls(name=tool.name, description=tool.description, args_schema=tool.args_schema,
+                   tool=tool, timeout=timeout)
+
+    @staticmethod
+    def _tool_input(args: tuple, kwargs: dict):
+        # Tools with an args_schema are called with keyword arguments, others with a single string.
+        return kwargs if kwargs else args[0]
+
+    def _timed_out(self) -> str:
+        logger.warning(f"Tool {self.name} timed out after {self.timeout} s.")
+        return f"The {self.name} tool did not answer within {self.timeout:g} seconds."
+
+    def _failed(self, error: Exception) -> str:
+        logger.warning(f"Tool {self.name} failed: {error}")
+        return f"The {self.name} tool failed: {error}"
+
+    def _run(self, *args: Any, run_manager: Optional[CallbackManagerForToolRun] = None, **kwargs: Any) -> Any:
+        future = _tool_executor.submit(self.tool.run, self._tool_input(args, kwargs),
+                                       callbacks=run_manager.get_child() if run_manager else None)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            return self._timed_out()
+        except Exception as e:
+            return self._failed(e)
+
+    async def _arun(self, *args: Any, run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+                    **kwargs: Any) -> Any:
+        try:
+            return await asyncio.wait_for(
+                self.tool.arun(self._tool_input(args, kwargs), callbacks=run_manager.get_child() if run_manager else None),
+                timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            return self._timed_out()
+        except Exception as e:
+            return self._failed(e)
+
+
+def with_timeouts(tools: list, config: dict) -> list:
+    """
+    Wraps the tools of the agent in TimeoutTools.
+
+    Args:
+        tools (list): The agent tools.
+        config (dict): The loaded configuration; `Agent.tool_timeout` is the limit of
+                       every tool and `Agent.tool_timeouts` overrides it per tool name.
+
+    Returns:
+        list: The wrapped tools.
+    """
+    agent_config = config.get("Agent", {})
+    default = agent_config.get("tool_timeout", 20)
+    overrides = agent_config.get("tool_timeouts") or {}
+    return [TimeoutTool.wrap(tool, overrides.get(tool.name, default)) for tool in tools]
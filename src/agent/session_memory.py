@@ -0,0 +1,266 @@
+# src/agent/session_memory.py
+import asyncio
+import json
+import logging
+import time
+
+from src.utils.state import InMemoryStateBackend, StateBackend
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "Progressively summarize the lines of conversation provided, adding onto the previous summary "
+    "and returning a new summary. Keep names, facts and open questions; drop pleasantries.\n\n"
+    "Current summary:\n{summary}\n\nNew lines of conversation:\n{lines}\n\nNew summary:"
+)
+
+# Keys of the session memory in the state backend
+SESSION_KEY = "session:{}"
+LRU_KEY = "sessions:lru"
+EVICTED_KEY = "sessions:evicted"
+EXPIRED_KEY = "sessions:expired"
+SUMMARIES_KEY = "sessions:summaries"
+
+
+class SessionMemory:
+    """
+    Conversation memory scoped to session ids, with a bounded footprint.
+
+    Each session keeps its last `window_turns` (human, AI) turns as plain strings.
+    Older turns are dropped ('window' mode) or folded by the LLM into a running
+    summary ('summary' mode); when the LLM fails, they wait for the next turn's
+    summary, and only the `window_turns` most recent of them are kept. The history rendered into the prompt is further
+    capped at `max_history_chars`, dropping the oldest turns first, so the prompt
+    size does not depend on how long a conversation runs. Sessions idle for more
+    than `ttl_seconds` expire, and the least recently used ones are evicted beyond
+    `max_sessions`, so memory use does not depend on uptime either.
+
+    Sessions live in a StateBackend as small JSON records, next to a sorted set
+    ranking them by last access. With a shared backend such as Redis, every API
+    worker and replica sees the same conversations; records are changed by atomic
+    backend updates, so workers saving turns of the same session never lose one.
+
+    Attributes:
+    - backend (StateBackend): Where sessions are stored.
+    - max_sessions (int): Maximum number of sessions held.
+    - ttl_seconds (int): Idle time after which a session expires.
+    - history_mode (str): 'window' or 'summary'.
+    - window_turns (int): Turns kept verbatim per session.
+    - max_history_chars (int): Character budget of the rendered history.
+    - llm: Chat model used to summarise, required in 'summary' mode.
+    """
+
+    def __init__(self, backend: StateBackend = None, max_sessions: int = 1000, ttl_seconds: int = 3600,
+                 history_mode: str = "window", window_turns: int = 5, max_history_chars: int = 4000, llm=None):
+        if history_mode not in ("window", "summary"):
+            raise ValueError(f"Unsupported history mode: {history_mode}")
+        if history_mode == "summary" and llm is None:
+            raise ValueError("The 'summary' history mode requires an llm")
+        self.backend = backend or InMemoryStateBackend()
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.history_mode = history_mode
+        self.window_turns = max(1, window_turns)
+        self.max_history_chars = max_history_chars
+        self.llm = llm
+
+    @classmethod
+    def from_config(cls, config: dict, backend: StateBackend = None, llm=None) -> "SessionMemory":
+        """Builds the memory from the `Memory` section of config.yml."""
+        memory_config = config.get("Memory", {})
+        return cls(
+            backend=backend,
+            max_sessions=memory_config.get("max_sessions", 1000),
+            ttl_seconds=memory_config.get("session_ttl_seconds", 3600),
+            history_mode=memory_config.get("history_mode", "window"),
+            window_turns=memory_config.get("window_turns", 5),
+            max_history_chars=memory_config.get("max_history_chars", 4000),
+            llm=llm
+        )
+
+    def _expire(self, now: float):
+        expired = self.backend.zremrangebyscore(LRU_KEY, now - self.ttl_seconds)
+        if expired:
+            self.backend.delete(*(SESSION_KEY.format(session_id) for session_id in expired))
+            self.backend.incr(EXPIRED_KEY, len(expired))
+
+    def _load(self, session_id: str) -> dict:
+        raw = self.backend.get(SESSION_KEY.format(session_id))
+        return json.loads(raw) if raw is not None else None
+
+    def _touch(self, session_id: str):
+        """Ranks a session as just used and evicts the least recently used sessions beyond max_sessions."""
+        self.backend.zadd(LRU_KEY, session_id, time.time())
+        overflow = self.backend.zcard(LRU_KEY) - self.max_sessions
+        if overflow > 0:
+            evicted = self.backend.zpopmin(LRU_KEY, overflow)
+            self.backend.delete(*(SESSION_KEY.format(evicted_id) for evicted_id in evicted))
+            self.backend.incr(EVICTED_KEY, len(evicted))
+
+    def has_history(self, session_id: str) -> bool:
+        """Checks whether a session has any turn, i.e. whether its next answer depends on context."""
+        session = self._load(session_id)
+        return session is not None and bool(session["turns"] or session.get("pending") or session["summary"])
+
+    async def ahas_history(self, session_id: str) -> bool:
+        """Async variant of has_history, keeping the backend round trip off the event loop."""
+        return await asyncio.to_thread(self.has_history, session_id)
+
+    def get_history(self, session_id: str) -> str:
+        """
+        Renders the history of a session for the prompt, within the character budget.
+
+        Args:
+            session_id (str): The session id.
+
+        Returns:
+            str: The summary and recent turns, or an empty string for a new session.
+        """
+        now = time.time()
+        self._expire(now)
+        session = self._load(session_id)
+        if session is None:
+            return ""
+        self.backend.zadd(LRU_KEY, session_id, now)
+
+        lines = []
+        budget = self.max_history_chars
+        summary = session["summary"]
+        if summary:
+            summary_line = f"Summary of the earlier conversation: {summary}"[:budget]
+            budget -= len(summary_line)
+        # Turns waiting to be folded into the summary are still rendered verbatim.
+        for human, ai in reversed(session.get("pending", []) + session["turns"]):
+            turn = f"Human: {human}\nAI: {ai}"
+            if len(turn) > budget:
+                break
+            lines.insert(0, turn)
+            budget -= len(turn) + 1
+        if summary:
+            lines.insert(0, summary_line)
+        return "\n".join(lines)
+
+    async def aget_history(self, session_id: str) -> str:
+        """Async variant of get_history, keeping the backend round trips off the event loop."""
+        return await asyncio.to_thread(self.get_history, session_id)
+
+    def _append(self, session_id: str, human: str, ai: str):
+        """
+        Stores a turn and returns the summary and the turns waiting to be folded into it.
+
+        The session is changed by an atomic update of the backend, so turns saved at the
+        same time by other workers are never overwritten. In 'summary' mode the turns
+        pushed out of the window wait in the session until a summary includes them; every
+        one of them is returned, so the summary covers the whole conversation.
+        """
+        self._expire(time.time())
+
+        def append(raw):
+            session = json.loads(raw) if raw is not None else {"summary": "", "turns": []}
+            session["turns"].append([human, ai])
+            overflow = session["turns"][:-self.window_turns]
+            session["turns"] = session["turns"][-self.window_turns:]
+            pending = session.get("pending", []) + overflow if self.history_mode == "summary" else []
+            session["pending"] = pending
+            return json.dumps(session).encode(), (session["summary"], pending)
+
+        result = self.backend.update(SESSION_KEY.format(session_id), append, ttl=self.ttl_seconds)
+        self._touch(session_id)
+        return result
+
+    @staticmethod
+    def _summary_prompt(summary: str, overflow: list) -> str:
+        lines = "\n".join(f"Human: {human}\nAI: {ai}" for human, ai in overflow)
+        return SUMMARY_PROMPT.format(summary=summary or "(none)", lines=lines)
+
+    def _set_summary(self, session_id: str, previous: str, folded: list, summary: str):
+        """
+        Replaces the summary of a session by one that folds in the `folded` pending turns.
+
+        The summary is only replaced when it is still the one the new summary was
+        built from and the folded turns are still pending; otherwise another worker
+        folded the session first, and the turns left pending are folded on a later turn.
+        """
+        def fold(raw):
+            if raw is None:
+                return None, False
+            session = json.loads(raw)
+            pending = session.get("pending", [])
+            if session["summary"] != previous or pending[:len(folded)] != folded:
+                return None, False
+            session["summary"] = summary.strip()[:self.max_history_chars]
+            session["pending"] = pending[len(folded):]
+            return json.dumps(session).encode(), True
+
+        if self.backend.update(SESSION_KEY.format(session_id), fold, ttl=self.ttl_seconds):
+            self.backend.incr(SUMMARIES_KEY)
+
+    def _trim_pending(self, session_id: str):
+        """
+        Drops the oldest pending turns beyond `window_turns`, once summarising them failed,
+        so a failing summariser cannot grow a session without limit.
+        """
+        def trim(raw):
+            if raw is None:
+                return None, 0
+            session = json.loads(raw)
+            dropped = len(session.get("pending", [])) - self.window_turns
+            if dropped <= 0:
+                return None, 0
+            session["pending"] = session["pending"][dropped:]
+            return json.dumps(session).encode(), dropped
+
+        dropped = self.backend.update(SESSION_KEY.format(session_id), trim, ttl=self.ttl_seconds)
+        if dropped:
+            logger.warning(f"Dropped {dropped} unsummarised turns of session {session_id}.")
+
+    def save_turn(self, session_id: str, human: str, ai: str):
+        """
+        Records a turn of a session, summarising the turns pushed out of the window in 'summary' mode.
+
+        Args:
+            session_id (str): The session id.
+            human (str): The user input.
+            ai (str): The agent answer.
+        """
+        summary, pending = self._append(session_id, human, ai)
+        if pending:
+            try:
+                self._set_summary(session_id, summary, pending,
+                                  self.llm.invoke(self._summary_prompt(summary, pending)).content)
+            except Exception as e:
+                # The answer was already given; the turns stay pending and are folded on a later turn.
+                logger.warning(f"Could not summarise session {session_id}: {e}")
+                self._trim_pending(session_id)
+
+    async def asave_turn(self, session_id: str, human: str, ai: str):
+        """Async variant of save_turn; the backend calls run in a thread, off the event loop."""
+        summary, pending = await asyncio.to_thread(self._append, session_id, human, ai)
+        if pending:
+            try:
+                response = await self.llm.ainvoke(self._summary_prompt(summary, pending))
+                await asyncio.to_thread(self._set_summary, session_id, summary, pending, response.content)
+            except Exception as e:
+                logger.warning(f"Could not summarise session {session_id}: {e}")
+                await asyncio.to_thread(self._trim_pending, session_id)
+
+    def stats(self) -> dict:
+        """Returns the number of sessions and turns held, their size and the eviction counters."""
+        self._expire(time.time())
+        sessions = [session for session in map(self._load, self.backend.zrange(LRU_KEY)) if session is not None]
+
+        def counter(key):
+            return int(self.backend.get(key) or 0)
+
+        return {
+            "sessions": len(sessions),
+            "max_sessions": self.max_sessions,
+            "turns": sum(len(session["turns"]) for session in sessions),
+            "stored_chars": sum(
+                len(session["summary"]) + sum(len(human) + len(ai) for human, ai in session["turns"])
+                for session in sessions
+            ),
+            "evicted_sessions": counter(EVICTED_KEY),
+            "expired_sessions": counter(EXPIRED_KEY),
+            "summaries": counter(SUMMARIES_KEY),
+        }
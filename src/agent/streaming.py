@@ -0,0 +1,59 @@
+# src/agent/streaming.py
+import asyncio
+import json
+import logging
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+FINAL_ANSWER_PREFIX = "Final Answer:"
+
+
+class FinalAnswerStreamHandler(AsyncCallbackHandler):
+    """
+    Callback handler forwarding the tokens of the agent's final answer to a queue.
+
+    The ReAct LLM writes its reasoning before the final answer, so the tokens of
+    each LLM call are buffered until the "Final Answer:" marker appears; only the
+    text after it is forwarded, as {"type": "token", "text": ...} events.
+
+    Attributes:
+    - queue (asyncio.Queue): Destination of the token events.
+    """
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self._reset()
+
+    def _reset(self):
+        self._buffer = ""
+        self._answering = False
+        self._started = False
+
+    async def on_llm_start(self, serialized, prompts, **kwargs):
+        self._reset()
+
+    async def on_chat_model_start(self, serialized, messages, **kwargs):
+        self._reset()
+
+    async def on_llm_new_token(self, token: str, **kwargs):
+        if not self._answering:
+            self._buffer += token
+            marker = self._buffer.find(FINAL_ANSWER_PREFIX)
+            if marker == -1:
+                return
+            self._answering = True
+            token = self._buffer[marker + len(FINAL_ANSWER_PREFIX):]
+
+        # Drop the whitespace between the marker and the answer.
+        if not self._started:
+            token = token.lstrip()
+            self._started = bool(token)
+        if token:
+            await self.queue.put({"type": "token", "text": token})
+
+
+def format_sse(event: dict) -> str:
+    """Formats an event dict as a server-sent event named after its type."""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -1,38 +1,135 @@
 # /app/src/api/handlers.py
 
 import logging
+import re
 
 from fastapi import Depends, HTTPException
-
-from src.agent.agent_handler import AgentHandler, get_agent_handler
-from src.api.models import (ChatInput, DocumentLoaderRequest,
+from fastapi.responses import StreamingResponse
+
+from src.agent.agent_handler import (FAILURE_RESPONSES, AgentHandler,
+                                     get_agent_handler)
+from src.agent.answer_cache import get_answer_cache
+from src.agent.streaming import format_sse
+from src.api.models import (BatchSearchRequest, BatchSearchResponse,
+                            ChatInput, CrawlRequest, DocumentLoaderRequest,
                             DocumentLoaderResponse, DocumentSearchRequest,
-                            ScrapeRequest)
+                            JobStatus, QueryCacheStats, RerankerStats,
+                            RetrievedChunk, ScrapeRequest, SessionMemoryStats)
+from src.jobs.manager import get_job_manager
 from src.loader.document import DocumentLoader
-from src.scraper.scraper import run_web_scraper
+from src.scraper.crawler import run_crawler
+from src.scraper.async_scraper import run_web_scraper_async
+from src.tools.batch_search import BatchDocumentSearch
 from src.tools.doc_search import DocumentSearch
+from src.tools.reranker import get_reranker
+from src.utils.resources import get_resource_registry
 
 logger = logging.getLogger(__name__)
 
 
 # ===== CHAT HANDLER =====
-def handle_chat(data: ChatInput, agent: AgentHandler = Depends(get_agent_handler)):
+async def _answer_cache_for(data: ChatInput, agent: AgentHandler):
+    """Returns the answer cache, unless the question follows earlier turns of its session.
+
+    A follow-up question only makes sense with its history, so it is neither
+    answered from nor stored into the cache.
+    """
+    if data.session_id and await agent.sessions.ahas_history(data.session_id):
+        return None
+    return get_answer_cache()
+
+
+async def handle_chat(data: ChatInput, agent: AgentHandler = Depends(get_agent_handler)):
     """Handles chat interactions with AgentHandler.
 
+    The agent runs on the async path, so a conversation waiting on the LLM holds
+    no thread. When the answer cache is enabled, a previous answer to a semantically
+    equivalent question is returned without running the agent.
+
     Args:
         data (ChatInput): The user input data
         agent (AgentHandler): The AgentHandler instance
 
     Returns:
-        dict: Response from agent
+        dict: Response from agent, flagged when it came from the answer cache
     """
-    response = agent.chat_with_agent(data.user_input)
+    answer_cache = await _answer_cache_for(data, agent)
+    if answer_cache is not None:
+        try:
+            cached_response = await answer_cache.alookup(data.user_input)
+            if cached_response is not None:
+                if data.session_id:
+                    await agent.sessions.asave_turn(data.session_id, data.user_input, cached_response)
+                return {"response": cached_response, "cached": True, "session_id": data.session_id}
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+
+    response = await agent.achat_with_agent(data.user_input, data.session_id)
     if isinstance(response, dict):
         # Extract just the string message from the response object
-        return {"response": response["output"].response}
-    else:
-        # If response is already a string, return as is
-        return {"response": response}
+        response = response["output"].response
+
+    if answer_cache is not None and response not in FAILURE_RESPONSES:
+        try:
+            await answer_cache.astore(data.user_input, str(response))
+        except Exception as e:
+            logger.warning(f"Answer cache store failed: {e}")
+
+    return {"response": response, "cached": False, "session_id": data.session_id}
+
+
+def handle_chat_stream(data: ChatInput, agent: AgentHandler) -> StreamingResponse:
+    """Streams a chat interaction with AgentHandler as server-sent events.
+
+    The agent's tool calls, their observations and the tokens of the final answer
+    are sent as they are produced, followed by a "final" event with the whole
+    answer. An answer cache hit is sent as a single "final" event.
+
+    Args:
+        data (ChatInput): The user input data
+        agent (AgentHandler): The AgentHandler instance
+
+    Returns:
+        StreamingResponse: A text/event-stream response
+    """
+    async def events():
+        answer_cache = await _answer_cache_for(data, agent)
+        if answer_cache is not None:
+            try:
+                cached_response = await answer_cache.alookup(data.user_input)
+                if cached_response is not None:
+                    if data.session_id:
+                        await agent.sessions.asave_turn(data.session_id, data.user_input, cached_response)
+                    yield format_sse({"type": "final", "response": cached_response, "cached": True,
+                                      "session_id": data.session_id})
+                    return
+            except Exception as e:
+                logger.warning(f"Answer cache lookup failed: {e}")
+
+        async for event in agent.astream_chat(data.user_input, data.session_id):
+            if event["type"] == "final":
+                event["cached"] = False
+                event["session_id"] = data.session_id
+                if answer_cache is not None and event["response"] not in FAILURE_RESPONSES:
+                    try:
+                        await answer_cache.astore(data.user_input, event["response"])
+                    except Exception as e:
+                        logger.warning(f"Answer cache store failed: {e}")
+            yield format_sse(event)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def handle_session_stats(agent: AgentHandler) -> SessionMemoryStats:
+    """Returns the size and eviction counters of the per-session conversation memory.
+
+    Args:
+        agent (AgentHandler): The AgentHandler instance
+
+    Returns:
+        SessionMemoryStats: The current counters of the session memory.
+    """
+    return SessionMemoryStats(**agent.sessions.stats())
 
 
 # ===== WEB SCRAPER HANDLER =====
@@ -42,6 +139,8 @@ async def handle_scrape(data: ScrapeRequest):
 
     This asynchronous function logs the triggering of the scrape endpoint
     and runs the web scraper on the URL provided in the ScrapeRequest object.
+    Fetching, parsing and saving all happen off the event loop, so a slow
+    site does not stall the other requests served by this worker.
 
     Args:
     data (ScrapeRequest): The data containing the URL to be scraped.
@@ -53,7 +152,36 @@ async def handle_scrape(data: ScrapeRequest):
     logger.info("Scrape endpoint triggered.")
 
     # Run the web scraper and return the result.
-    return run_web_scraper(data.url)
+    return await run_web_scraper_async(data.url)
+
+
+async def handle_crawl(data: CrawlRequest):
+    """
+    Crawls a site concurrently, starting from the seed URLs of the CrawlRequest.
+
+    Args:
+    data (CrawlRequest): The seed URLs and the depth, page, domain and URL pattern limits.
+
+    Returns:
+    dict: The outcome of the crawl with the filepaths of the saved pages.
+
+    Raises:
+    HTTPException: If a URL pattern is not a valid regular expression.
+    """
+    logger = logging.getLogger("Scraper")
+    logger.info("Crawl endpoint triggered.")
+
+    try:
+        return await run_crawler(
+            data.seed_urls,
+            max_depth=data.max_depth,
+            max_pages=data.max_pages,
+            allowed_domains=data.allowed_domains,
+            include_patterns=data.include_patterns,
+            exclude_patterns=data.exclude_patterns
+        )
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid URL pattern: {e}")
 
 
 # ===== DOCUMENT LOADER HANDLER =====
@@ -87,24 +215,25 @@ def handle_process_documents(data: DocumentLoaderRequest) -> DocumentLoaderRespo
 
 
 # ===== DOCUMENT SEARCHER HANDLER =====
-def handle_document_search(data: DocumentSearchRequest) -> str:
+def handle_document_search(data: DocumentSearchRequest):
     """Handles document search request and returns the raw response.
 
     This function receives a DocumentSearchRequest containing the collection
     name and user query input. It instantiates a DocumentSearch object and
     calls search_documents() to perform the actual search.
 
-    The search_documents() method is returning a raw string response rather
-    than a list of results. So this handler simply returns the raw string.
+    In synthesize mode the search_documents() method is returning a raw string
+    response rather than a list of results, so this handler simply returns the
+    raw string. No iteration or post-processing is done on the result string.
+    The client must handle the raw response appropriately.
 
-    No iteration or post-processing is done on the result string. The client
-    must handle the raw response appropriately.
+    In retrieve mode the top chunks are returned as a list, without any LLM call.
 
     Args:
-        data (DocumentSearchRequest): The request data containing the collection and query.
+        data (DocumentSearchRequest): The request data containing the collection, query and mode.
 
     Returns:
-        str: The raw response string from the DocumentSearch.
+        str | List[RetrievedChunk]: The raw response string, or the retrieved chunks.
 
     Raises:
         HTTPException: If any exception occurs during the search process. The
@@ -124,7 +253,18 @@ def handle_document_search(data: DocumentSearchRequest) -> str:
         ```
     """
     try:
-        document_search = DocumentSearch(collection=data.collection, user_input=data.user_input)
+        document_search = DocumentSearch(
+            query=data.user_input,
+            collection=data.collection,
+            top_k=data.top_k,
+            score_threshold=data.score_threshold,
+            domain=data.domain,
+            url_prefix=data.url_prefix,
+            fetched_after=data.fetched_after
+        )
+
+        if data.mode == "retrieve":
+            return [RetrievedChunk(**chunk) for chunk in document_search.retrieve()]
 
         results = document_search.search_documents()
         logging.debug(f"Raw results: {results}")
@@ -134,3 +274,107 @@ def handle_document_search(data: DocumentSearchRequest) -> str:
     except Exception as e:
         logging.error(f"Error searching documents: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
+
+
+async def handle_batch_document_search(data: BatchSearchRequest) -> BatchSearchResponse:
+    """Retrieves the top chunks of many queries at once, without LLM synthesis.
+
+    Args:
+        data (BatchSearchRequest): The collection, the queries and the number of chunks per query.
+
+    Returns:
+        BatchSearchResponse: The ranked chunks of every query, in request order, and
+        the errors of the queries that failed.
+
+    Raises:
+        HTTPException: If the batch is too large or the queries cannot be embedded.
+    """
+    try:
+        results, errors = await BatchDocumentSearch(collection=data.collection, top_k=data.top_k).search(data.queries)
+        return BatchSearchResponse(results=results, errors=errors)
+    except Exception as e:
+        logging.error(f"Error in batch document search: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def handle_query_cache_stats() -> QueryCacheStats:
+    """Returns the hit/miss counters of the shared query embedding cache.
+
+    Returns:
+        QueryCacheStats: The current counters of the cache.
+    """
+    return QueryCacheStats(**get_resource_registry().query_cache.stats())
+
+
+def handle_reranker_stats() -> RerankerStats:
+    """Returns the call counters and recent latency of the cross-encoder rerank stage.
+
+    Returns:
+        RerankerStats: The current counters of the reranker.
+    """
+    return RerankerStats(**get_reranker().stats())
+
+
+# ===== JOB HANDLERS =====
+def handle_submit_scrape_job(data: CrawlRequest) -> JobStatus:
+    """
+    Queues a background crawl of the seed URLs of the CrawlRequest.
+
+    A request with max_depth=0 scrapes just the seed URLs.
+
+    Args:
+    data (CrawlRequest): The seed URLs and crawl limits.
+
+    Returns:
+    JobStatus: The queued job.
+
+    Raises:
+    HTTPException: If a URL pattern is not a valid regular expression.
+    """
+    # Reject bad patterns now rather than in a failed job.
+    for pattern in (data.include_patterns or []) + (data.exclude_patterns or []):
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid URL pattern: {e}")
+    return JobStatus(**get_job_manager().submit("scrape", data.dict()))
+
+
+def handle_submit_ingest_job(data: DocumentLoaderRequest) -> JobStatus:
+    """
+    Queues a background load of a source directory into a collection.
+
+    Args:
+    data (DocumentLoaderRequest): The source directory and the target collection.
+
+    Returns:
+    JobStatus: The queued job.
+    """
+    return JobStatus(**get_job_manager().submit("ingest", data.dict()))
+
+
+def handle_get_job(job_id: str) -> JobStatus:
+    """
+    Returns the status, progress and outcome of a job.
+
+    Raises:
+    HTTPException: If the job id is unknown.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return JobStatus(**job)
+
+
+def handle_cancel_job(job_id: str) -> JobStatus:
+    """
+    Cancels a queued or running job. A running job stops at its next safe point
+    and keeps the pages or documents it has already stored.
+
+    Raises:
+    HTTPException: If the job id is unknown.
+    """
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return JobStatus(**job)
@@ -1,6 +1,7 @@
 # /app/src/api/models.py
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -14,8 +15,11 @@ class ChatInput(BaseModel):
 
     Attributes:
     user_input (str): The input string from the user to the chat.
+    session_id (Optional[str]): Identifies the conversation; its previous turns are
+                                given to the agent. Without it the chat is stateless.
     """
     user_input: str = "What are the basic steps to get rag_bot up and running?"
+    session_id: Optional[str] = None
 
 
 class ChatOutput(BaseModel):
@@ -24,8 +28,34 @@ class ChatOutput(BaseModel):
 
     Attributes:
     response (str): The response string from the chat agent to the user.
+    cached (bool): True when the response was served from the answer cache.
+    session_id (Optional[str]): The session of the conversation, as sent in the request.
     """
     response: str
+    cached: bool = False
+    session_id: Optional[str] = None
+
+
+class SessionMemoryStats(BaseModel):
+    """
+    Model representing the footprint of the per-session conversation memory.
+
+    Attributes:
+    sessions (int): Sessions currently held.
+    max_sessions (int): Capacity before the least recently used session is evicted.
+    turns (int): Turns held verbatim across all sessions.
+    stored_chars (int): Characters held by the turns and summaries.
+    evicted_sessions (int): Sessions evicted to stay within capacity.
+    expired_sessions (int): Sessions dropped after being idle past the TTL.
+    summaries (int): Summaries written for turns pushed out of the history window.
+    """
+    sessions: int
+    max_sessions: int
+    turns: int
+    stored_chars: int
+    evicted_sessions: int
+    expired_sessions: int
+    summaries: int
 
 
 # === Web Scraper Models ===
@@ -53,6 +83,44 @@ class ScrapeResponse(BaseModel):
     data: Optional[str]
 
 
+class CrawlRequest(BaseModel):
+    """
+    Model representing the request to crawl a site from seed URLs.
+
+    Attributes:
+    seed_urls (List[str]): The URLs the crawl starts from.
+    max_depth (Optional[int]): Number of link hops to follow from the seeds.
+                               Defaults to the Crawler configuration.
+    max_pages (Optional[int]): Maximum number of pages to fetch.
+                               Defaults to the Crawler configuration.
+    allowed_domains (Optional[List[str]]): Hosts that may be crawled. Defaults to the seed hosts.
+    include_patterns (Optional[List[str]]): Regexes of which one must match a URL to follow it.
+    exclude_patterns (Optional[List[str]]): Regexes of which none may match a URL to follow it.
+    """
+    seed_urls: List[str] = ['https://github.com/kylejtobin/rag_bot']
+    max_depth: Optional[int] = None
+    max_pages: Optional[int] = None
+    allowed_domains: Optional[List[str]] = None
+    include_patterns: Optional[List[str]] = None
+    exclude_patterns: Optional[List[str]] = None
+
+
+class CrawlResponse(BaseModel):
+    """
+    Model representing the response from a crawl.
+
+    Attributes:
+    message (str): The status message of the crawl.
+    data (List[str]): The filepaths of the saved pages.
+    unchanged (List[str]): The URLs skipped because they did not change since the last crawl.
+    failed (List[str]): The URLs that could not be fetched or saved.
+    """
+    message: str
+    data: List[str]
+    unchanged: List[str]
+    failed: List[str]
+
+
 # === Document Loader Models ===
 class DocumentLoaderResponse(BaseModel):
     """
@@ -90,6 +158,135 @@ class DocumentSearchRequest(BaseModel):
     Attributes:
     collection (str): The name of the collection to be queried.
     user_input (str): The user input query for searching documents.
+    mode (str): 'synthesize' returns an LLM answer written from the top chunks;
+                'retrieve' returns the chunks themselves, without any LLM call.
+    top_k (Optional[int]): The number of chunks retrieved. Defaults to `Search.top_k`.
+    score_threshold (Optional[float]): The minimum similarity of a retrieved chunk.
+    domain (Optional[str]): Only search pages of this host, e.g. 'docs.python.org'.
+    url_prefix (Optional[str]): Only search pages under this URL, e.g. 'https://docs.python.org/3/library'.
+    fetched_after (Optional[datetime]): Only search pages scraped at or after this time; UTC when no offset is given.
     """
     collection: str
     user_input: str
+    mode: Literal["synthesize", "retrieve"] = "synthesize"
+    top_k: Optional[int] = None
+    score_threshold: Optional[float] = None
+    domain: Optional[str] = None
+    url_prefix: Optional[str] = None
+    fetched_after: Optional[datetime] = None
+
+
+class RetrievedChunk(BaseModel):
+    """
+    Model representing a chunk retrieved from a collection.
+
+    Attributes:
+    text (str): The text of the chunk.
+    score (float): The similarity of the chunk to the query.
+    chunk_id (str): The id of the Qdrant point holding the chunk.
+    source (Optional[str]): The URL of the page the chunk comes from, or its document.
+    """
+    text: str
+    score: float
+    chunk_id: str
+    source: Optional[str] = None
+
+
+class BatchSearchRequest(BaseModel):
+    """
+    Model representing a retrieval request for many queries at once.
+
+    Attributes:
+    collection (str): The name of the collection to be queried.
+    queries (List[str]): The queries; at most `Search.batch_max_queries` of them.
+    top_k (int): The number of chunks returned per query.
+    """
+    collection: str = "techdocs"
+    queries: List[str]
+    top_k: int = 5
+
+
+class BatchSearchResponse(BaseModel):
+    """
+    Model representing the chunks retrieved for a batch of queries.
+
+    Attributes:
+    results (List[List[RetrievedChunk]]): For each query, in request order, its chunks ranked by score.
+    errors (Dict[int, str]): The error of every query whose search failed, by query index;
+                             those queries have no chunks in `results`.
+    """
+    results: List[List[RetrievedChunk]]
+    errors: Dict[int, str] = {}
+
+
+class QueryCacheStats(BaseModel):
+    """
+    Model representing the counters of the query embedding cache.
+
+    Attributes:
+    hits (int): Queries answered from the in-memory tier.
+    persistent_hits (int): Queries answered from the persistent tier.
+    misses (int): Queries that had to be embedded.
+    entries (int): Embeddings currently held in memory.
+    max_entries (int): Capacity of the in-memory tier.
+    """
+    hits: int
+    persistent_hits: int
+    misses: int
+    entries: int
+    max_entries: int
+
+
+class RerankerStats(BaseModel):
+    """
+    Model representing the counters and latency of the cross-encoder rerank stage.
+
+    Attributes:
+    model (str): The cross-encoder model.
+    candidates (int): Chunks retrieved before reranking.
+    calls (int): Searches reranked.
+    pairs_scored (int): (query, chunk) pairs scored by the model.
+    cache_hits (int): (query, chunk) pairs answered from the score cache.
+    cached_scores (int): Scores currently held in the cache.
+    p50_ms (float): Median latency of recent rerank calls.
+    p95_ms (float): 95th percentile latency of recent rerank calls.
+    max_ms (float): Slowest recent rerank call.
+    """
+    model: str
+    candidates: int
+    calls: int
+    pairs_scored: int
+    cache_hits: int
+    cached_scores: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+# === Job Models ===
+class JobStatus(BaseModel):
+    """
+    Model representing the state of a background scrape or ingest job.
+
+    Attributes:
+    id (str): The job id, used to poll or cancel the job.
+    kind (str): 'scrape' or 'ingest'.
+    status (str): 'queued', 'running', 'completed', 'failed' or 'cancelled'.
+    params (Dict[str, Any]): The request the job was submitted with.
+    progress (Dict[str, int]): Counters such as pages_fetched, chunks_embedded and points_upserted.
+    result (Optional[Dict[str, Any]]): The outcome of a finished job.
+    error (Optional[str]): The error of a failed job.
+    created_at (float): Submission time, as a Unix timestamp.
+    started_at (Optional[float]): Time the job started running.
+    finished_at (Optional[float]): Time the job ended.
+    """
+    id: str
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    progress: Dict[str, int]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
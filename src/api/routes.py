@@ -1,14 +1,26 @@
 # /app/src/api/routes.py
 import logging
+from typing import List, Union
 
 from fastapi import APIRouter
 
 from src.agent.agent_handler import get_agent_handler
-from src.api.handlers import (handle_chat, handle_document_search,
-                              handle_process_documents, handle_scrape)
-from src.api.models import (ChatInput, ChatOutput, DocumentLoaderRequest,
-                            DocumentLoaderResponse, DocumentSearchRequest,
-                            ScrapeRequest, ScrapeResponse)
+from src.api.handlers import (handle_batch_document_search,
+                              handle_cancel_job, handle_chat,
+                              handle_chat_stream, handle_crawl,
+                              handle_document_search, handle_get_job,
+                              handle_process_documents,
+                              handle_query_cache_stats,
+                              handle_reranker_stats, handle_scrape,
+                              handle_session_stats,
+                              handle_submit_ingest_job,
+                              handle_submit_scrape_job)
+from src.api.models import (BatchSearchRequest, BatchSearchResponse,
+                            ChatInput, ChatOutput, CrawlRequest, CrawlResponse,
+                            DocumentLoaderRequest, DocumentLoaderResponse,
+                            DocumentSearchRequest, JobStatus, QueryCacheStats,
+                            RerankerStats, RetrievedChunk, ScrapeRequest,
+                            ScrapeResponse, SessionMemoryStats)
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +31,11 @@ router = APIRouter()
 
 # === Chat Endpoint ===
 @router.post("/chat/", response_model=ChatOutput)
-def chat_endpoint(data: ChatInput):
+async def chat_endpoint(data: ChatInput):
     """
     Endpoint to interact with the chat agent.
 
-    This function receives user input, passes it to the chat handler,
+    This asynchronous function receives user input, passes it to the chat handler,
     and returns the chat agent's response.
 
     Args:
@@ -34,7 +46,38 @@ def chat_endpoint(data: ChatInput):
     """
     # Delegate to the chat handler and return the response.
     agent = get_agent_handler()
-    return handle_chat(data, agent)
+    return await handle_chat(data, agent)
+
+
+@router.post("/chat/stream/")
+async def chat_stream_endpoint(data: ChatInput):
+    """
+    Endpoint to interact with the chat agent, streaming its progress as server-sent events.
+
+    Events are named after their type: "action" (a tool call), "observation"
+    (a tool result), "token" (a piece of the final answer), "final" (the whole
+    answer) and "error". Each carries a JSON payload.
+
+    Args:
+    data (ChatInput): The user input data encapsulated in a ChatInput object.
+
+    Returns:
+    StreamingResponse: The text/event-stream of the agent run.
+    """
+    agent = get_agent_handler()
+    return handle_chat_stream(data, agent)
+
+
+@router.get("/chat/sessions/stats/", response_model=SessionMemoryStats)
+def session_stats_endpoint() -> SessionMemoryStats:
+    """
+    Endpoint to inspect the memory used by per-session conversation histories.
+
+    Returns:
+    SessionMemoryStats: The session, turn and size counters.
+    """
+    agent = get_agent_handler()
+    return handle_session_stats(agent)
 
 
 # === Web Scraper Endpoint ===
@@ -56,6 +99,23 @@ async def scrape_endpoint(data: ScrapeRequest):
     return await handle_scrape(data)
 
 
+@router.post("/crawl/", response_model=CrawlResponse)
+async def crawl_endpoint(data: CrawlRequest):
+    """
+    Endpoint to crawl a whole site from one or more seed URLs.
+
+    Pages are fetched concurrently within the depth, page count, domain and
+    URL pattern limits of the request, and each one is saved like a single scrape.
+
+    Args:
+    data (CrawlRequest): The seed URLs and crawl limits.
+
+    Returns:
+    CrawlResponse: The outcome of the crawl and the filepaths of the saved pages.
+    """
+    return await handle_crawl(data)
+
+
 # === Document Loader Endpoint ===
 @router.post("/process-documents/", response_model=DocumentLoaderResponse)
 def process_documents_endpoint(data: DocumentLoaderRequest) -> DocumentLoaderResponse:
@@ -78,15 +138,111 @@ def process_documents_endpoint(data: DocumentLoaderRequest) -> DocumentLoaderRes
 
 
 # === Document Search Endpoint ===
-@router.post("/search-documents/", response_model=str)
-def search_documents_endpoint(data: DocumentSearchRequest) -> str:
+@router.post("/search-documents/", response_model=Union[str, List[RetrievedChunk]])
+def search_documents_endpoint(data: DocumentSearchRequest) -> Union[str, List[RetrievedChunk]]:
     """
     Endpoint to initiate the document search process.
 
     Args:
-    data (DocumentSearchRequest): The data containing the collection name and user input.
+    data (DocumentSearchRequest): The data containing the collection name, user input and search mode.
 
     Returns:
-    DocumentSearchResponse: The result of the document search process.
+    DocumentSearchResponse: The synthesized answer, or the retrieved chunks in retrieve mode.
     """
     return handle_document_search(data)
+
+
+@router.post("/search-documents/batch", response_model=BatchSearchResponse)
+async def batch_search_documents_endpoint(data: BatchSearchRequest) -> BatchSearchResponse:
+    """
+    Endpoint to retrieve the top chunks of many queries in one call.
+
+    The queries are embedded in batches and searched with Qdrant batch requests;
+    no LLM is involved.
+
+    Args:
+    data (BatchSearchRequest): The collection, the queries and the number of chunks per query.
+
+    Returns:
+    BatchSearchResponse: The ranked chunks of every query, in request order.
+    """
+    return await handle_batch_document_search(data)
+
+
+@router.get("/search-documents/cache-stats/", response_model=QueryCacheStats)
+def query_cache_stats_endpoint() -> QueryCacheStats:
+    """
+    Endpoint to inspect the query embedding cache used by document searches.
+
+    Returns:
+    QueryCacheStats: The hit/miss counters of the cache.
+    """
+    return handle_query_cache_stats()
+
+
+@router.get("/search-documents/rerank-stats/", response_model=RerankerStats)
+def reranker_stats_endpoint() -> RerankerStats:
+    """
+    Endpoint to inspect the cross-encoder rerank stage, e.g. to tune Rerank.candidates.
+
+    Returns:
+    RerankerStats: The call and cache counters and the recent rerank latency.
+    """
+    return handle_reranker_stats()
+
+
+# === Background Job Endpoints ===
+@router.post("/jobs/scrape", response_model=JobStatus, status_code=202)
+def submit_scrape_job_endpoint(data: CrawlRequest) -> JobStatus:
+    """
+    Endpoint to queue a background crawl; returns the job at once.
+
+    Args:
+    data (CrawlRequest): The seed URLs and crawl limits. Use max_depth=0 to scrape only the seeds.
+
+    Returns:
+    JobStatus: The queued job, whose id is polled at /jobs/{job_id}.
+    """
+    return handle_submit_scrape_job(data)
+
+
+@router.post("/jobs/ingest", response_model=JobStatus, status_code=202)
+def submit_ingest_job_endpoint(data: DocumentLoaderRequest) -> JobStatus:
+    """
+    Endpoint to queue a background document load; returns the job at once.
+
+    Args:
+    data (DocumentLoaderRequest): The source directory and the target collection.
+
+    Returns:
+    JobStatus: The queued job, whose id is polled at /jobs/{job_id}.
+    """
+    return handle_submit_ingest_job(data)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job_endpoint(job_id: str) -> JobStatus:
+    """
+    Endpoint to poll the status and progress counters of a job.
+
+    Args:
+    job_id (str): The id returned when the job was submitted.
+
+    Returns:
+    JobStatus: The current state of the job.
+    """
+    return handle_get_job(job_id)
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+def cancel_job_endpoint(job_id: str) -> JobStatus:
+    """
+    Endpoint to cancel a queued or running job.
+
+    Args:
+    job_id (str): The id returned when the job was submitted.
+
+    Returns:
+    JobStatus: The state of the job after the cancellation request.
+    """
+    return handle_cancel_job(job_id)
@@ -0,0 +1,125 @@
+# /app/src/benchmarks/chunking.py
+"""
+Benchmark of the markdown chunker against the default sentence splitter.
+
+Reads and chunks a directory of scraped markdown files with each chunker, the
+way the loader does, and reports the number and size of the chunks, the tiny
+fragments (under 32 tokens) and the code blocks cut in the middle (chunks with
+an odd number of fences). Each set
+of chunks is then embedded with the configured embedding model into its own
+in-memory Qdrant collection, and the headings of the corpus are used as
+queries to measure the search latency and the size of the retrieved context.
+
+By default the corpus is Loader.out_dir, where the loader moves the files it
+has ingested.
+
+Usage:
+    python -m src.benchmarks.chunking [--source DIR] [--max-files N]
+        [--queries N] [--top-k N] [--seed N]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from llama_index import SimpleDirectoryReader
+from llama_index.ingestion import run_transformations
+from llama_index.schema import MetadataMode
+from llama_index.utils import get_tokenizer
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+
+from src.loader.document import build_chunking
+from src.loader.embedding_pipeline import EmbeddingPipeline
+from src.loader.markdown_chunker import parse_sections
+from src.utils.resources import get_resource_registry
+
+CHUNKERS = ("sentence", "markdown")
+TINY_CHUNK_TOKENS = 32
+
+
+def load_documents(source, max_files, file_extractor):
+    """Reads up to `max_files` files of the corpus as llama_index Documents, as the loader would."""
+    reader = SimpleDirectoryReader(source, num_files_limit=max_files, file_extractor=file_extractor)
+    return [document for file_documents in reader.iter_data() for document in file_documents]
+
+
+def sample_headings(documents, count, seed):
+    """Returns up to `count` distinct heading titles of the corpus, used as queries."""
+    headings = sorted({path[-1] for document in documents for path, _ in parse_sections(document.text) if path})
+    return random.Random(seed).sample(headings, min(count, len(headings)))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def benchmark_chunker(chunker, source, max_files, queries, query_vectors, top_k, resources, tokenizer):
+    """Reads, chunks, embeds and searches the corpus with one chunker and returns its measurements."""
+    file_extractor, transformations = build_chunking(resources.CONFIG, resources.service_context, chunker)
+    start = time.perf_counter()
+    nodes = run_transformations(load_documents(source, max_files, file_extractor), transformations)
+    chunk_seconds = time.perf_counter() - start
+
+    tokens = [len(tokenizer(node.get_content(metadata_mode=MetadataMode.NONE))) for node in nodes]
+    broken_fences = sum(
+        sum(line.lstrip().startswith("```") for line in node.get_content().splitlines()) % 2 for node in nodes
+    )
+
+    client = QdrantClient(":memory:")
+    vector_store = QdrantVectorStore(client=client, collection_name=chunker)
+    start = time.perf_counter()
+    EmbeddingPipeline.from_config(resources.embed_model, resources.CONFIG).run(nodes, vector_store)
+    embed_seconds = time.perf_counter() - start
+
+    latencies, context_tokens = [], []
+    for query_vector in query_vectors:
+        start = time.perf_counter()
+        points = client.search(collection_name=chunker, query_vector=query_vector, limit=top_k, with_payload=True)
+        latencies.append(time.perf_counter() - start)
+        ids = {str(point.id) for point in points}
+        context_tokens.append(sum(count for node, count in zip(nodes, tokens) if node.node_id in ids))
+
+    return {
+        "chunks": len(nodes),
+        "mean_tokens": statistics.mean(tokens) if tokens else 0,
+        "tiny": sum(count < TINY_CHUNK_TOKENS for count in tokens),
+        "broken_fences": broken_fences,
+        "chunk_s": chunk_seconds,
+        "embed_s": embed_seconds,
+        "p50_ms": percentile(latencies, 0.5) * 1000 if queries else 0.0,
+        "p95_ms": percentile(latencies, 0.95) * 1000 if queries else 0.0,
+        "context_tokens": statistics.mean(context_tokens) if queries else 0,
+    }
+
+
+def main():
+    resources = get_resource_registry()
+    parser = argparse.ArgumentParser(description="Compare the markdown chunker with the sentence splitter.")
+    parser.add_argument("--source", default=resources.CONFIG["Loader"]["out_dir"],
+                        help="Directory of markdown files (default: the loader out directory).")
+    parser.add_argument("--max-files", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100, help="Number of headings used as queries.")
+    parser.add_argument("--top-k", type=int, default=resources.CONFIG.get("Search", {}).get("top_k", 4))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    file_extractor, _ = build_chunking(resources.CONFIG, resources.service_context, "markdown")
+    documents = load_documents(args.source, args.max_files, file_extractor)
+    queries = sample_headings(documents, args.queries, args.seed)
+    query_vectors = resources.query_cache.get_query_embeddings(resources.embed_model, queries)
+    tokenizer = get_tokenizer()
+    print(f"{len(documents)} files, {len(queries)} queries, top {args.top_k}\n")
+    print(f"{'chunker':<10} {'chunks':>7} {'tokens':>7} {'tiny':>6} {'cut code':>9} {'chunk s':>8} "
+          f"{'embed s':>8} {'p50 ms':>7} {'p95 ms':>7} {'context':>8}")
+    for chunker in CHUNKERS:
+        result = benchmark_chunker(chunker, args.source, args.max_files, queries, query_vectors, args.top_k,
+                                   resources, tokenizer)
+        print(f"{chunker:<10} {result['chunks']:>7} {result['mean_tokens']:>7.0f} {result['tiny']:>6} "
+              f"{result['broken_fences']:>9} {result['chunk_s']:>8.2f} {result['embed_s']:>8.2f} "
+              f"{result['p50_ms']:>7.2f} {result['p95_ms']:>7.2f} {result['context_tokens']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# /app/src/benchmarks/collection_profiles.py
+"""
+Comparison of the collection profiles of config.yml on the points of a collection.
+
+Copies up to --max-points points of a collection (vectors and payload) into a
+scratch collection per profile, created with the HNSW, quantization and on-disk
+settings of the profile, waits for Qdrant to finish indexing, then searches it
+with the vectors of sampled points as queries. For each profile it reports the
+estimated RAM and disk footprint of the vectors, quantized vectors, HNSW graph
+and payload, the p50/p99 search latency with the search parameters of the
+profile, and the recall@k against an exact full-precision search of the same
+points. Scratch collections are deleted afterwards unless --keep is given.
+
+With --apply PROFILE, the profile is instead applied in place to the collection
+itself; Qdrant keeps serving it while it rebuilds the index in the background.
+
+Usage:
+    python -m src.benchmarks.collection_profiles [--collection NAME]
+        [--profiles default large compact] [--max-points N] [--queries N]
+        [--top-k N] [--seed N] [--keep] [--apply PROFILE]
+"""
+import argparse
+import json
+import random
+import time
+
+from qdrant_client.http import models as rest
+
+from src.loader.collection_profiles import get_collection_profile
+from src.loader.document import QdrantCollectionManager
+from src.utils.resources import get_resource_registry
+
+SCROLL_BATCH = 256
+INDEXING_TIMEOUT = 600
+
+
+def read_points(client, collection, max_points):
+    """Reads up to `max_points` points of a collection, with their vectors and payload."""
+    points, offset = [], None
+    while len(points) < max_points:
+        batch, offset = client.scroll(collection_name=collection, limit=min(SCROLL_BATCH, max_points - len(points)),
+                                      offset=offset, with_payload=True, with_vectors=True)
+        points.extend(batch)
+        if offset is None:
+            break
+    return points
+
+
+def wait_for_indexing(client, collection):
+    """Waits until Qdrant has finished optimizing the collection."""
+    deadline = time.monotonic() + INDEXING_TIMEOUT
+    while client.get_collection(collection).status != rest.CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            print(f"  {collection} still optimizing after {INDEXING_TIMEOUT} s, measuring anyway")
+            return
+        time.sleep(0.5)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def benchmark_profile(client, profile, scratch, points, query_vectors, top_k, vector_size):
+    """Loads the points into a scratch collection of the profile and returns its measurements."""
+    QdrantCollectionManager.create_collection(client, scratch, vector_size, profile)
+    start = time.perf_counter()
+    for i in range(0, len(points), SCROLL_BATCH):
+        client.upsert(collection_name=scratch, wait=True, points=[
+            rest.PointStruct(id=point.id, vector=point.vector, payload=point.payload)
+            for point in points[i:i + SCROLL_BATCH]
+        ])
+    wait_for_indexing(client, scratch)
+    load_seconds = time.perf_counter() - start
+
+    exact = rest.SearchParams(exact=True, quantization=rest.QuantizationSearchParams(ignore=True))
+    search_params = profile.search_params()
+    latencies, hits = [], 0
+    for query_vector in query_vectors:
+        expected = {point.id for point in client.search(collection_name=scratch, query_vector=query_vector,
+                                                        limit=top_k, search_params=exact)}
+        start = time.perf_counter()
+        found = client.search(collection_name=scratch, query_vector=query_vector, limit=top_k,
+                              search_params=search_params, with_payload=True)
+        latencies.append(time.perf_counter() - start)
+        hits += len(expected & {point.id for point in found})
+
+    payload_bytes = sum(len(json.dumps(point.payload)) for point in points)
+    memory = profile.estimate_memory(len(points), vector_size, payload_bytes)
+    return {
+        "ram_mb": memory["ram_bytes"] / 2 ** 20,
+        "disk_mb": memory["disk_bytes"] / 2 ** 20,
+        "load_s": load_seconds,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "recall": hits / (len(query_vectors) * top_k),
+    }
+
+
+def main():
+    resources = get_resource_registry()
+    parser = argparse.ArgumentParser(description="Compare the collection profiles on the points of a collection.")
+    parser.add_argument("--collection", default="techdocs")
+    parser.add_argument("--profiles", nargs="+", default=list(resources.CONFIG.get("Collection_Profiles") or ["default"]))
+    parser.add_argument("--max-points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled points used as queries.")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch collections.")
+    parser.add_argument("--apply", metavar="PROFILE", help="Apply a profile in place to the collection and exit.")
+    args = parser.parse_args()
+
+    client = resources.client
+    if args.apply:
+        profile = get_collection_profile(resources.CONFIG, args.collection, args.apply)
+        QdrantCollectionManager.apply_profile(client, args.collection, profile)
+        print(f"Applied profile {profile.name} to {args.collection}; Qdrant is rebuilding it in the background")
+        return
+
+    points = read_points(client, args.collection, args.max_points)
+    if not points:
+        print(f"No points in {args.collection}")
+        return
+    vector_size = len(points[0].vector)
+    rng = random.Random(args.seed)
+    query_vectors = [point.vector for point in rng.sample(points, min(args.queries, len(points)))]
+
+    print(f"{len(points)} points of {args.collection}, {len(query_vectors)} queries, top {args.top_k}\n")
+    print(f"{'profile':<10} {'RAM MB':>8} {'disk MB':>8} {'load s':>7} {'p50 ms':>7} {'p99 ms':>7} "
+          f"{f'R@{args.top_k}':>7}")
+    for name in args.profiles:
+        profile = get_collection_profile(resources.CONFIG, args.collection, name)
+        scratch = f"{args.collection}__profile_{name}"
+        try:
+            result = benchmark_profile(client, profile, scratch, points, query_vectors, args.top_k, vector_size)
+        finally:
+            if not args.keep:
+                client.delete_collection(scratch)
+        print(f"{name:<10} {result['ram_mb']:>8.1f} {result['disk_mb']:>8.1f} {result['load_s']:>7.1f} "
+              f"{result['p50_ms']:>7.2f} {result['p99_ms']:>7.2f} {result['recall']:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
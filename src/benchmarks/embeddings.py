@@ -0,0 +1,110 @@
+# /app/src/benchmarks/embeddings.py
+"""
+Benchmark of the ONNX embedding backend against the PyTorch model.
+
+Chunks a directory of scraped markdown files the way the loader does, then
+embeds the chunks with the PyTorch HuggingFaceEmbedding of the local model (the
+baseline) and with OnnxEmbedding in float32 and int8, each at every requested
+thread count. For each backend it reports the throughput in chunks per second
+and its agreement with the baseline: the mean and 1st percentile cosine
+similarity between the two vectors of each chunk, and the share of the 10
+nearest neighbours of sampled chunks that the backend finds in common with the
+baseline, which is what retrieval quality depends on.
+
+By default the corpus is Loader.out_dir, where the loader moves the files it
+has ingested. Exported models are kept under Onnx_Embedding.export_dir.
+
+Usage:
+    python -m src.benchmarks.embeddings [--source DIR] [--max-files N]
+        [--max-chunks N] [--threads 0 4] [--bucket-size N] [--batch-size N]
+        [--neighbours N]
+"""
+import argparse
+import time
+
+import numpy as np
+from llama_index.ingestion import run_transformations
+from llama_index.schema import MetadataMode
+
+from src.benchmarks.chunking import load_documents
+from src.loader.document import build_chunking
+from src.utils.embedding_selector import EmbeddingConfig
+from src.utils.onnx_embedding import OnnxEmbedding
+from src.utils.resources import get_resource_registry
+
+NEAREST = 10
+
+
+def embed(model, texts, batch_size):
+    """Embeds the texts in batches of `batch_size` and returns the vectors and the elapsed seconds."""
+    model.get_text_embedding_batch(texts[:1])  # Warm up, so the first batch does not pay for lazy initialization
+    start = time.perf_counter()
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(model.get_text_embedding_batch(texts[i:i + batch_size]))
+    return np.asarray(vectors, dtype=np.float32), time.perf_counter() - start
+
+
+def normalize(vectors):
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def neighbour_overlap(baseline, vectors, queries):
+    """Returns the mean share of the nearest neighbours of the query chunks found by both embeddings."""
+    def nearest(matrix):
+        scores = matrix[queries] @ matrix.T
+        scores[np.arange(len(queries)), queries] = -np.inf
+        return np.argsort(-scores, axis=1)[:, :NEAREST]
+
+    expected, found = nearest(baseline), nearest(vectors)
+    return float(np.mean([len(set(a) & set(b)) / NEAREST for a, b in zip(expected, found)]))
+
+
+def main():
+    resources = get_resource_registry()
+    embedding_config = EmbeddingConfig.from_config(resources.CONFIG)
+    parser = argparse.ArgumentParser(description="Compare the ONNX embedding backend with the PyTorch model.")
+    parser.add_argument("--source", default=resources.CONFIG["Loader"]["out_dir"],
+                        help="Directory of markdown files (default: the loader out directory).")
+    parser.add_argument("--max-files", type=int, default=100)
+    parser.add_argument("--max-chunks", type=int, default=1000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[embedding_config.onnx_threads],
+                        help="ONNX Runtime thread counts to measure; 0 for the default.")
+    parser.add_argument("--bucket-size", type=int, default=embedding_config.onnx_bucket_size)
+    parser.add_argument("--batch-size", type=int, default=resources.CONFIG["Loader"].get("embed_batch_size", 64),
+                        help="Chunks per embedding call, as in the loader.")
+    parser.add_argument("--neighbours", type=int, default=200, help="Chunks whose nearest neighbours are compared.")
+    args = parser.parse_args()
+
+    file_extractor, transformations = build_chunking(resources.CONFIG, resources.service_context)
+    nodes = run_transformations(load_documents(args.source, args.max_files, file_extractor), transformations)
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes[:args.max_chunks]]
+    if not texts:
+        print(f"No chunks in {args.source}")
+        return
+    queries = np.random.default_rng(0).choice(len(texts), min(args.neighbours, len(texts)), replace=False)
+
+    from llama_index.embeddings import HuggingFaceEmbedding
+
+    baseline, seconds = embed(HuggingFaceEmbedding(model_name=embedding_config.huggingface_model, device="cpu"),
+                              texts, args.batch_size)
+    baseline = normalize(baseline)
+    print(f"{len(texts)} chunks of {args.source}, batches of {args.batch_size}\n")
+    print(f"{'backend':<16} {'threads':>7} {'chunks/s':>9} {'cos mean':>9} {'cos p1':>7} {f'nn@{NEAREST}':>7}")
+    print(f"{'pytorch':<16} {'-':>7} {len(texts) / seconds:>9.1f} {1.0:>9.4f} {1.0:>7.4f} {1.0:>7.3f}")
+
+    for quantize in (False, True):
+        for threads in args.threads:
+            model = OnnxEmbedding(model_name=embedding_config.huggingface_model,
+                                  export_dir=embedding_config.onnx_export_dir, quantize=quantize,
+                                  threads=threads, bucket_size=args.bucket_size)
+            vectors, seconds = embed(model, texts, args.batch_size)
+            vectors = normalize(vectors)
+            cosines = np.sum(baseline * vectors, axis=1)
+            name = "onnx int8" if quantize else "onnx float32"
+            print(f"{name:<16} {threads or 'auto':>7} {len(texts) / seconds:>9.1f} {cosines.mean():>9.4f} "
+                  f"{np.percentile(cosines, 1):>7.4f} {neighbour_overlap(baseline, vectors, queries):>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
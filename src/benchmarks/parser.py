@@ -0,0 +1,83 @@
+# /app/src/benchmarks/parser.py
+"""
+Micro-benchmark of the HTML parser backends of the scraper.
+
+Parses every saved HTML page of a fixture directory with each backend and
+reports the parsing time per page and how many pages produce exactly the
+same markdown as the html.parser reference.
+
+By default the corpus is the scraper response cache (Scraper.CACHE_DIR),
+which holds the HTML of every page fetched so far.
+
+Usage:
+    python -m src.benchmarks.parser [--fixtures DIR] [--repeat N]
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from src.scraper.scraper import PARSER_BACKENDS, parse_html
+from src.utils.config import load_config
+
+REFERENCE_BACKEND = "html.parser"
+
+
+def load_fixtures(fixtures_dir):
+    """Returns the (name, html) pairs of every .html file of a directory."""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    return fixtures
+
+
+def benchmark_backend(backend, fixtures, repeat):
+    """Parses every fixture `repeat` times and returns the per-page timings and outputs."""
+    timings = []
+    outputs = {}
+    for name, html in fixtures:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs[name] = parse_html(html, backend)["content"]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+    return timings, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the scraper HTML parser backends.")
+    parser.add_argument("--fixtures", default=load_config()["Scraper"]["CACHE_DIR"],
+                        help="Directory of saved .html pages (default: the scraper response cache).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page; the fastest one is kept.")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No .html fixtures found in {args.fixtures}")
+        return
+
+    total_kb = sum(len(html) for _, html in fixtures) / 1024
+    print(f"{len(fixtures)} pages, {total_kb:.0f} KiB of HTML, best of {args.repeat} runs\n")
+    print(f"{'backend':<12} {'total ms':>10} {'median ms':>10} {'pages/s':>9} {'same output':>12}")
+
+    reference = None
+    for backend in (REFERENCE_BACKEND,) + tuple(b for b in PARSER_BACKENDS if b != REFERENCE_BACKEND):
+        try:
+            timings, outputs = benchmark_backend(backend, fixtures, args.repeat)
+        except ImportError as e:
+            print(f"{backend:<12} skipped ({e})")
+            continue
+        if reference is None:
+            reference = outputs
+        same = sum(outputs[name] == reference[name] for name, _ in fixtures)
+        total = sum(timings)
+        print(f"{backend:<12} {total * 1000:>10.1f} {statistics.median(timings) * 1000:>10.2f} "
+              f"{len(fixtures) / total:>9.1f} {same:>5}/{len(fixtures):<6}")
+
+
+if __name__ == "__main__":
+    main()
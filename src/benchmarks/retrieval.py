@@ -0,0 +1,132 @@
+# /app/src/benchmarks/retrieval.py
+"""
+Benchmark of dense versus hybrid (dense + BM25) retrieval on a collection.
+
+Runs every query of an evaluation set through DocumentSearch.retrieve in both
+modes, and with --rerank also in both modes followed by the cross-encoder
+rerank stage, and reports recall@k, the mean reciprocal rank of the first relevant
+chunk, and the retrieval latency. Query embeddings are computed once up front
+(and cached), so latencies compare the retrieval paths themselves.
+
+The evaluation set is a JSONL file of {"query": ..., "relevant": [...]} lines,
+where a chunk is relevant when its chunk id or its source is listed. Without
+one, queries are sampled from the collection: each is made of the identifiers
+(names with underscores, digits or inner capitals) of a random chunk, which is
+the relevant chunk, to mimic questions about exact function names, flags and
+error codes.
+
+Usage:
+    python -m src.benchmarks.retrieval [--collection NAME] [--queries FILE]
+        [--sample N] [--k 1 5 10] [--seed N] [--rebuild-index] [--rerank]
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+
+from llama_index.vector_stores.utils import metadata_dict_to_node
+
+from src.loader.document import DocumentLoader
+from src.tools.doc_search import DocumentSearch
+from src.utils.resources import get_resource_registry
+
+IDENTIFIER_PATTERN = re.compile(r"\b(?:\w*[_\d]\w*|[a-z]+[A-Z]\w*)\b")
+WORD_PATTERN = re.compile(r"\b[a-zA-Z]{6,}\b")
+
+
+def load_queries(path):
+    """Reads the evaluation set from a JSONL file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def sample_queries(collection, count, seed, terms=4):
+    """Builds identifier queries from random chunks of the collection."""
+    client = get_resource_registry().client
+    points, offset = [], None
+    while True:
+        batch, offset = client.scroll(collection_name=collection, limit=256, offset=offset,
+                                      with_payload=True, with_vectors=False)
+        points.extend(batch)
+        if offset is None:
+            break
+
+    rng = random.Random(seed)
+    rng.shuffle(points)
+    queries = []
+    for point in points:
+        text = metadata_dict_to_node(point.payload).get_content()
+        candidates = list(dict.fromkeys(IDENTIFIER_PATTERN.findall(text))) or list(dict.fromkeys(WORD_PATTERN.findall(text)))
+        if len(candidates) < 2:
+            continue
+        queries.append({"query": " ".join(rng.sample(candidates, min(terms, len(candidates)))),
+                        "relevant": [str(point.id)]})
+        if len(queries) == count:
+            break
+    return queries
+
+
+def evaluate(collection, queries, ks, hybrid, rerank):
+    """Runs every query in one mode and returns recall@k per k, the MRR and the latencies."""
+    hits = {k: 0 for k in ks}
+    reciprocal_ranks = []
+    latencies = []
+    for item in queries:
+        relevant = set(item["relevant"])
+        start = time.perf_counter()
+        chunks = DocumentSearch(item["query"], collection, top_k=max(ks), hybrid=hybrid,
+                                rerank=rerank).retrieve()
+        latencies.append(time.perf_counter() - start)
+
+        rank = next((i for i, chunk in enumerate(chunks, start=1)
+                     if chunk["chunk_id"] in relevant or chunk["source"] in relevant), None)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+        for k in ks:
+            hits[k] += rank is not None and rank <= k
+    return {k: hits[k] / len(queries) for k in ks}, statistics.mean(reciprocal_ranks), latencies
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dense and hybrid retrieval on a collection.")
+    parser.add_argument("--collection", default="techdocs")
+    parser.add_argument("--queries", help="JSONL evaluation set; queries are sampled from the collection if omitted.")
+    parser.add_argument("--sample", type=int, default=200, help="Number of sampled queries.")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10], help="Cut-offs of recall@k.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Rebuild the lexical index of the collection from Qdrant first.")
+    parser.add_argument("--rerank", action="store_true",
+                        help="Also run both modes through the cross-encoder rerank stage.")
+    args = parser.parse_args()
+
+    if args.rebuild_index:
+        print(f"Indexed {DocumentLoader(collection=args.collection).rebuild_lexical_index()} chunks")
+
+    queries = load_queries(args.queries) if args.queries else sample_queries(args.collection, args.sample, args.seed)
+    if not queries:
+        print(f"No queries to run against {args.collection}")
+        return
+    resources = get_resource_registry()
+    resources.query_cache.get_query_embeddings(resources.embed_model, [item["query"] for item in queries])
+
+    ks = sorted(set(args.k))
+    print(f"{len(queries)} queries on {args.collection}\n")
+    modes = [("dense", False, False), ("hybrid", True, False)]
+    if args.rerank:
+        modes += [("dense+rr", False, True), ("hybrid+rr", True, True)]
+    print(f"{'mode':<10} " + " ".join(f"{f'R@{k}':>7}" for k in ks) + f" {'MRR':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode, hybrid, rerank in modes:
+        recall, mrr, latencies = evaluate(args.collection, queries, ks, hybrid, rerank)
+        print(f"{mode:<10} " + " ".join(f"{recall[k]:>7.3f}" for k in ks) + f" {mrr:>7.3f} "
+              f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
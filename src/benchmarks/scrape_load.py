@@ -0,0 +1,103 @@
+# /app/src/benchmarks/scrape_load.py
+"""
+Load test of the API event loop: chat latency with and without scrapes in flight.
+
+First measures the latency of a series of /chat/ requests on an idle server,
+then measures the same series again while a number of /scrape/ requests run
+continuously against a slow page. If the scrape path blocked the event loop,
+the second series would be delayed by the slow fetches; with the async scrape
+path both latency distributions should match.
+
+Each scrape URL gets a unique query string, so the response cache never
+answers it and every scrape really waits on the slow site.
+
+Usage:
+    python -m src.benchmarks.scrape_load [--api URL] [--scrape-url URL]
+        [--scrapes N] [--chats N] [--message TEXT]
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+import httpx
+
+
+async def timed_post(client, path, payload):
+    """Posts a JSON payload and returns the request latency in seconds."""
+    start = time.perf_counter()
+    response = await client.post(path, json=payload)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def measure_chat(client, chats, message):
+    """Sends `chats` sequential chat requests and returns their latencies."""
+    return [await timed_post(client, "/chat/", {"user_input": message}) for _ in range(chats)]
+
+
+async def scrape_forever(client, scrape_url, counter, stats):
+    """Keeps one scrape in flight, each one on a URL the response cache has never seen."""
+    while True:
+        separator = "&" if "?" in scrape_url else "?"
+        url = f"{scrape_url}{separator}load_test={next(counter)}"
+        try:
+            await timed_post(client, "/scrape/", {"url": url})
+            stats["completed"] += 1
+        except httpx.HTTPError:
+            stats["failed"] += 1
+
+
+def describe(latencies):
+    """Formats the p50, p95 and max of a list of latencies in milliseconds."""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return (f"p50 {statistics.median(ordered) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms   "
+            f"max {ordered[-1] * 1000:8.1f} ms")
+
+
+async def run(args):
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(base_url=args.api, timeout=timeout) as chat_client, \
+            httpx.AsyncClient(base_url=args.api, timeout=timeout) as scrape_client:
+        # One unmeasured request so model loading and caches do not skew the baseline.
+        await timed_post(chat_client, "/chat/", {"user_input": args.message})
+
+        baseline = await measure_chat(chat_client, args.chats, args.message)
+
+        counter = itertools.count()
+        stats = {"completed": 0, "failed": 0}
+        scrapers = [asyncio.create_task(scrape_forever(scrape_client, args.scrape_url, counter, stats))
+                    for _ in range(args.scrapes)]
+        # Let the scrapes reach the slow fetch before measuring.
+        await asyncio.sleep(0.5)
+        try:
+            under_load = await measure_chat(chat_client, args.chats, args.message)
+        finally:
+            for task in scrapers:
+                task.cancel()
+            await asyncio.gather(*scrapers, return_exceptions=True)
+
+    print(f"{args.chats} chat requests, {args.scrapes} concurrent scrapes of {args.scrape_url}\n")
+    print(f"idle          {describe(baseline)}")
+    print(f"under scrape  {describe(under_load)}")
+    print(f"\nscrapes completed: {stats['completed']}, failed: {stats['failed']}")
+    slowdown = statistics.median(under_load) / statistics.median(baseline)
+    print(f"median chat slowdown under scrape load: {slowdown:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure chat latency while scrapes are in flight.")
+    parser.add_argument("--api", default="http://localhost:8000", help="Base URL of the running API.")
+    parser.add_argument("--scrape-url", default="https://httpbin.org/delay/5",
+                        help="A slow page to scrape; a unique query string is appended to every request.")
+    parser.add_argument("--scrapes", type=int, default=8, help="Scrape requests kept in flight.")
+    parser.add_argument("--chats", type=int, default=20, help="Chat requests per measured series.")
+    parser.add_argument("--message", default="Hello", help="The chat message sent in every request.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds.")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# /app/src/jobs/manager.py
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from src.jobs.runners import JOB_RUNNERS
+from src.jobs.store import CANCELLED, COMPLETED, FAILED, FINISHED_STATUSES, JobStore
+from src.utils.config import load_config
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the job manager instance
+_job_manager_instance = None
+_job_manager_lock = threading.Lock()
+
+
+class JobContext:
+    """
+    Handle given to a running job to report progress and observe cancellation.
+
+    Attributes:
+    - job_id (str): The id of the job.
+    - cancel_event (threading.Event): Set when the job is cancelled; long-running
+      steps check it at safe points and stop early.
+    - progress (dict): The progress counters reported so far.
+    """
+
+    def __init__(self, job_id: str, store: JobStore):
+        self.job_id = job_id
+        self.cancel_event = threading.Event()
+        self.progress = {}
+        self._store = store
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def report(self, **increments):
+        """Adds to the progress counters of the job, e.g. report(pages_fetched=1)."""
+        with self._lock:
+            for counter, amount in increments.items():
+                self.progress[counter] = self.progress.get(counter, 0) + amount
+            progress = dict(self.progress)
+        self._store.update(self.job_id, progress=progress)
+
+
+class JobManager:
+    """
+    Runs scrape and ingest jobs in the background on a bounded pool of worker threads.
+
+    Submitting a job stores it as queued and returns at once; a worker later runs it,
+    recording its progress, result or error in the job store. Jobs can be cancelled
+    while queued or running: a running job stops at its next safe point, keeping the
+    work it has already committed.
+
+    Every API worker has its own manager sharing the store. A watcher thread keeps
+    the heartbeat of the manager in the store, stops the jobs of this manager whose
+    cancellation was requested through any worker, and fails the jobs left behind
+    by managers whose heartbeat stopped.
+
+    Attributes:
+    - store (JobStore): Persistent state of every job.
+    - max_workers (int): Number of jobs running at the same time.
+    - runners (dict): The function running each kind of job, called with the job
+      parameters and its JobContext.
+    - owner (str): Id of this manager in the store.
+    - poll_interval (float): Seconds between two rounds of the watcher.
+    - owner_timeout (float): Age of a heartbeat after which its manager is considered dead.
+    """
+
+    def __init__(self, store: JobStore, runners: dict, max_workers: int = 2, poll_interval: float = 2.0,
+                 owner_timeout: float = 60.0):
+        self.store = store
+        self.runners = runners
+        self.max_workers = max(1, max_workers)
+        self.owner = uuid.uuid4().hex
+        self.poll_interval = poll_interval
+        self.owner_timeout = max(owner_timeout, poll_interval * 3)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._contexts = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.store.heartbeat(self.owner)
+        self.store.fail_interrupted(self.owner_timeout)
+        self._watcher = threading.Thread(target=self._watch, name="job-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.store.heartbeat(self.owner)
+                for job_id in self.store.cancel_requested(self.owner):
+                    with self._lock:
+                        context = self._contexts.get(job_id)
+                    if context is not None and not context.cancelled:
+                        context.cancel_event.set()
+                        logger.info(f"Stopping job {job_id} at its next safe point.")
+                self.store.fail_interrupted(self.owner_timeout)
+            except Exception as e:
+                logger.warning(f"Job watcher round failed: {e}")
+
+    def submit(self, kind: str, params: dict) -> dict:
+        """
+        Queues a job.
+
+        Args:
+            kind (str): The job kind, one of the keys of `runners`.
+            params (dict): The job parameters, passed to its runner.
+
+        Returns:
+            dict: The queued job.
+        """
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job_id = uuid.uuid4().hex
+        job = self.store.create(job_id, kind, params, owner=self.owner)
+        with self._lock:
+            self._contexts[job_id] = JobContext(job_id, self.store)
+        self._executor.submit(self._run, job_id, kind, params)
+        logger.info(f"Queued {kind} job {job_id}.")
+        return job
+
+    def _run(self, job_id: str, kind: str, params: dict):
+        with self._lock:
+            context = self._contexts[job_id]
+        try:
+            if context.cancelled or not self.store.start(job_id):
+                return
+            result = self.runners[kind](params, context)
+            status = CANCELLED if context.cancelled else COMPLETED
+            self.store.update(job_id, status=status, result=result, finished_at=time.time())
+            logger.info(f"{kind.capitalize()} job {job_id} {status}.")
+        except Exception as e:
+            logger.error(f"{kind.capitalize()} job {job_id} failed: {e}")
+            self.store.update(job_id, status=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            with self._lock:
+                self._contexts.pop(job_id, None)
+
+    def get(self, job_id: str) -> dict:
+        """Returns a job, or None if the id is unknown."""
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> dict:
+        """
+        Cancels a queued or running job; finished jobs are left as they are.
+
+        Args:
+            job_id (str): The job to cancel.
+
+        Returns:
+            dict: The job after the request, or None if the id is unknown.
+        """
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return job
+
+        # The flag reaches the owner of the job through its watcher, in whichever worker it runs.
+        self.store.request_cancel(job_id)
+        with self._lock:
+            context = self._contexts.get(job_id)
+        if context is not None:
+            context.cancel_event.set()
+        logger.info(f"Cancellation requested for job {job_id}.")
+        return self.store.get(job_id)
+
+    def shutdown(self):
+        """Cancels every pending job, waits for the running ones to stop and closes the store."""
+        with self._lock:
+            contexts = list(self._contexts.values())
+        for context in contexts:
+            context.cancel_event.set()
+        self._stopped.set()
+        self._watcher.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.store.remove_owner(self.owner)
+        self.store.close()
+
+
+def get_job_manager() -> JobManager:
+    """Singleton-like accessor for the JobManager, configured from the `Jobs` section of config.yml."""
+    global _job_manager_instance
+    if _job_manager_instance is None:
+        with _job_manager_lock:
+            if _job_manager_instance is None:
+                jobs_config = load_config().get("Jobs", {})
+                _job_manager_instance = JobManager(
+                    JobStore(jobs_config.get("store_path", "/app/src/data/jobs.sqlite")),
+                    JOB_RUNNERS,
+                    max_workers=jobs_config.get("max_workers", 2),
+                    poll_interval=jobs_config.get("poll_interval", 2.0),
+                    owner_timeout=jobs_config.get("owner_timeout", 60.0)
+                )
+    return _job_manager_instance
+
+
+def shutdown_job_manager():
+    """Stops the job manager, if it was started."""
+    global _job_manager_instance
+    if _job_manager_instance is not None:
+        _job_manager_instance.shutdown()
+        _job_manager_instance = None
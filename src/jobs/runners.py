@@ -0,0 +1,65 @@
+# /app/src/jobs/runners.py
+import asyncio
+import logging
+
+from src.loader.document import DocumentLoader
+from src.scraper.async_scraper import close_http_client
+from src.scraper.crawler import AsyncCrawler
+
+logger = logging.getLogger(__name__)
+
+
+def run_scrape_job(params: dict, context) -> dict:
+    """
+    Crawls from the seed URLs of a scrape job on the job's worker thread.
+
+    Args:
+        params (dict): The fields of a CrawlRequest.
+        context (JobContext): Receives the pages_fetched and pages_saved counters.
+
+    Returns:
+        dict: The outcome of the crawl.
+    """
+    crawler = AsyncCrawler(
+        max_depth=params.get("max_depth"),
+        max_pages=params.get("max_pages"),
+        allowed_domains=params.get("allowed_domains"),
+        include_patterns=params.get("include_patterns"),
+        exclude_patterns=params.get("exclude_patterns"),
+        progress_callback=context.report,
+        cancel_event=context.cancel_event
+    )
+    return asyncio.run(_crawl(crawler, params["seed_urls"]))
+
+
+async def _crawl(crawler: AsyncCrawler, seed_urls: list) -> dict:
+    # The HTTP client of the job's event loop is closed with the loop.
+    try:
+        return await crawler.crawl(seed_urls)
+    finally:
+        await close_http_client()
+
+
+def run_ingest_job(params: dict, context) -> dict:
+    """
+    Loads a directory of documents into a collection on the job's worker thread.
+
+    Args:
+        params (dict): The fields of a DocumentLoaderRequest.
+        context (JobContext): Receives the files_processed, chunks_embedded and points_upserted counters.
+
+    Returns:
+        dict: A status message.
+    """
+    loader = DocumentLoader(source_dir=params["source_dir"], collection=params["collection"])
+    loader.load_documents(progress_callback=context.report, cancel_event=context.cancel_event)
+    if context.cancelled:
+        return {"message": "Ingestion cancelled; the files loaded so far were kept"}
+    return {"message": "Documents processed successfully"}
+
+
+# The runner of each job kind
+JOB_RUNNERS = {
+    "scrape": run_scrape_job,
+    "ingest": run_ingest_job,
+}
@@ -0,0 +1,165 @@
+# /app/src/jobs/store.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Job statuses; a job ends in one of the last three.
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobStore:
+    """
+    SQLite store of background jobs, so their state survives API restarts.
+
+    Each row holds the job kind, its request parameters, its status, its progress
+    counters, and once it is over its result or error. Parameters, progress and
+    results are stored as JSON.
+
+    Several API workers share the file: each job records the job manager that owns
+    it, and every manager keeps a heartbeat in the `owners` table, so the jobs of a
+    dead worker can be told from those of a live one. Cancellation is a flag on the
+    row, seen by the owning manager whichever worker received the request.
+
+    Attributes:
+    - path (str): SQLite file of the store, or ':memory:'.
+    """
+
+    COLUMNS = ("id", "kind", "status", "params", "progress", "result", "error",
+               "created_at", "started_at", "finished_at")
+    JSON_COLUMNS = ("params", "progress", "result")
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+            "params TEXT NOT NULL, progress TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+            "owner TEXT, cancel_requested INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL)")
+        self._db.commit()
+
+    def _to_dict(self, row) -> dict:
+        job = dict(zip(self.COLUMNS, row))
+        for column in self.JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def create(self, job_id: str, kind: str, params: dict, owner: str = None) -> dict:
+        """Stores a new queued job, owned by the job manager `owner`, and returns it."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, params, progress, created_at, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params), json.dumps({}), time.time(), owner)
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict:
+        """Returns a job, or None if the id is unknown."""
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def update(self, job_id: str, **fields):
+        """
+        Updates columns of a job.
+
+        Args:
+            job_id (str): The job to update.
+            **fields: Column values; params, progress and result are serialised to JSON.
+        """
+        if not fields:
+            return
+        values = [json.dumps(value) if column in self.JSON_COLUMNS and value is not None else value
+                  for column, value in fields.items()]
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values, job_id))
+            self._db.commit()
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            self._db.commit()
+        return cursor.rowcount
+
+    def start(self, job_id: str) -> bool:
+        """Moves a queued job to running, unless it was cancelled first; returns whether it may run."""
+        return self._execute(
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ? AND cancel_requested = 0",
+            (RUNNING, time.time(), job_id, QUEUED)
+        ) == 1
+
+    def request_cancel(self, job_id: str):
+        """Flags a job as cancelled; a queued job is final right away, since it will never start."""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            self._db.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                             (CANCELLED, time.time(), job_id, QUEUED))
+            self._db.commit()
+
+    def cancel_requested(self, owner: str) -> list:
+        """Returns the ids of the unfinished jobs of an owner that were asked to stop."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE owner = ? AND cancel_requested = 1 AND status IN (?, ?)",
+                (owner, QUEUED, RUNNING)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def heartbeat(self, owner: str):
+        """Records that a job manager is alive."""
+        self._execute("INSERT OR REPLACE INTO owners (owner, heartbeat_at) VALUES (?, ?)", (owner, time.time()))
+
+    def remove_owner(self, owner: str):
+        """Forgets a job manager that stopped; its unfinished jobs are failed by the next recovery."""
+        self._execute("DELETE FROM owners WHERE owner = ?", (owner,))
+
+    def fail_interrupted(self, stale_after: float = 60.0) -> int:
+        """
+        Marks the unfinished jobs of job managers that are no longer alive as failed.
+
+        A manager is alive while its heartbeat is at most `stale_after` seconds old;
+        jobs without an owner come from stores older than the owner column.
+
+        Returns:
+            int: Number of interrupted jobs.
+        """
+        live_since = time.time() - stale_after
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?) AND "
+                "(owner IS NULL OR owner NOT IN (SELECT owner FROM owners WHERE heartbeat_at >= ?))",
+                (FAILED, "Interrupted by an API restart", time.time(), QUEUED, RUNNING, live_since)
+            )
+            self._db.execute("DELETE FROM owners WHERE heartbeat_at < ?", (live_since,))
+            self._db.commit()
+        if cursor.rowcount:
+            logger.warning(f"Marked {cursor.rowcount} interrupted jobs as failed.")
+        return cursor.rowcount
+
+    def close(self):
+        """Closes the database."""
+        with self._lock:
+            self._db.close()
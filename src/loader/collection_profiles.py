@@ -0,0 +1,182 @@
+# /src/loader/collection_profiles.py
+import logging
+from dataclasses import dataclass
+
+from qdrant_client.http import models as rest
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_TYPES = ("none", "scalar", "binary")
+
+
+@dataclass
+class CollectionProfile:
+    """
+    Named storage and index settings of a Qdrant collection, from `Collection_Profiles` in config.yml.
+
+    A profile trades memory for speed and accuracy: HNSW links (`m`, `ef_construct`)
+    and the search-time `ef` set the accuracy of the graph search; scalar (1 byte per
+    dimension) or binary (1 bit per dimension) quantization keeps a compressed copy
+    of the vectors in RAM, optionally rescoring the best candidates with the original
+    vectors; on-disk vectors and payload move the bulk of a collection out of RAM.
+
+    Attributes:
+        name (str): The profile name.
+        hnsw_m (int): Links per node of the HNSW graph.
+        hnsw_ef_construct (int): Candidates considered while building the graph.
+        hnsw_on_disk (bool): Whether the graph itself is stored on disk.
+        search_ef (int): Candidates considered by a search; None for the Qdrant default.
+        quantization (str): 'none', 'scalar' or 'binary'.
+        quantile (float): Share of values kept within the int8 range by scalar quantization.
+        quantization_always_ram (bool): Keep the quantized vectors in RAM even when the originals are on disk.
+        rescore (bool): Rescore the best quantized candidates with the original vectors.
+        oversampling (float): Candidates fetched with quantized vectors per result, before rescoring.
+        on_disk_vectors (bool): Store the original vectors on disk (memmap).
+        on_disk_payload (bool): Store the payload on disk.
+        indexing_threshold (int): Segment size (kB of vectors) above which the HNSW index is built.
+        memmap_threshold (int): Segment size (kB of vectors) above which segments are memory-mapped.
+    """
+    name: str = "default"
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    hnsw_on_disk: bool = False
+    search_ef: int = None
+    quantization: str = "none"
+    quantile: float = 0.99
+    quantization_always_ram: bool = True
+    rescore: bool = True
+    oversampling: float = None
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    indexing_threshold: int = None
+    memmap_threshold: int = None
+
+    @classmethod
+    def from_dict(cls, name: str, settings: dict) -> "CollectionProfile":
+        """Builds a profile from its section of config.yml."""
+        settings = settings or {}
+        hnsw = settings.get("hnsw", {})
+        quantization = settings.get("quantization") or {"type": "none"}
+        optimizers = settings.get("optimizers", {})
+        profile = cls(
+            name=name,
+            hnsw_m=hnsw.get("m", 16),
+            hnsw_ef_construct=hnsw.get("ef_construct", 100),
+            hnsw_on_disk=hnsw.get("on_disk", False),
+            search_ef=settings.get("search_ef"),
+            quantization=quantization.get("type", "none"),
+            quantile=quantization.get("quantile", 0.99),
+            quantization_always_ram=quantization.get("always_ram", True),
+            rescore=quantization.get("rescore", True),
+            oversampling=quantization.get("oversampling"),
+            on_disk_vectors=settings.get("on_disk_vectors", False),
+            on_disk_payload=settings.get("on_disk_payload", False),
+            indexing_threshold=optimizers.get("indexing_threshold"),
+            memmap_threshold=optimizers.get("memmap_threshold"),
+        )
+        if profile.quantization not in QUANTIZATION_TYPES:
+            raise ValueError(f"Unsupported quantization in collection profile '{name}': {profile.quantization}")
+        return profile
+
+    def _hnsw_config(self) -> rest.HnswConfigDiff:
+        return rest.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct, on_disk=self.hnsw_on_disk)
+
+    def _optimizers_config(self) -> rest.OptimizersConfigDiff:
+        return rest.OptimizersConfigDiff(indexing_threshold=self.indexing_threshold,
+                                         memmap_threshold=self.memmap_threshold)
+
+    def _quantization_config(self):
+        if self.quantization == "scalar":
+            return rest.ScalarQuantization(scalar=rest.ScalarQuantizationConfig(
+                type=rest.ScalarType.INT8, quantile=self.quantile, always_ram=self.quantization_always_ram))
+        if self.quantization == "binary":
+            return rest.BinaryQuantization(binary=rest.BinaryQuantizationConfig(
+                always_ram=self.quantization_always_ram))
+        return None
+
+    def create_kwargs(self, vector_size: int) -> dict:
+        """Returns the arguments of `recreate_collection` for a collection of this profile."""
+        return {
+            "vectors_config": rest.VectorParams(size=int(vector_size), distance=rest.Distance.COSINE,
+                                                on_disk=self.on_disk_vectors),
+            "on_disk_payload": self.on_disk_payload,
+            "hnsw_config": self._hnsw_config(),
+            "optimizers_config": self._optimizers_config(),
+            "quantization_config": self._quantization_config(),
+        }
+
+    def update_kwargs(self) -> dict:
+        """
+        Returns the arguments of `update_collection` that move an existing collection to
+        this profile. Qdrant rebuilds the affected segments in the background.
+        """
+        return {
+            "vectors_config": {"": rest.VectorParamsDiff(on_disk=self.on_disk_vectors)},
+            "collection_params": rest.CollectionParamsDiff(on_disk_payload=self.on_disk_payload),
+            "hnsw_config": self._hnsw_config(),
+            "optimizers_config": self._optimizers_config(),
+            "quantization_config": self._quantization_config() or rest.Disabled.DISABLED,
+        }
+
+    def search_params(self):
+        """Returns the search parameters of this profile, or None when it uses the Qdrant defaults."""
+        quantization = None
+        if self.quantization != "none":
+            quantization = rest.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        if self.search_ef is None and quantization is None:
+            return None
+        return rest.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+    def estimate_memory(self, points: int, vector_size: int, payload_bytes: int = 0) -> dict:
+        """
+        Estimates where the data of a collection of this profile lives.
+
+        The estimate counts the float32 vectors, their quantized copy, the HNSW links
+        (about 2 * m links of 4 bytes per point on the base layer) and the payload;
+        Qdrant adds its own overhead, and the OS page cache keeps hot on-disk data in RAM.
+
+        Returns:
+            dict: ram_bytes and disk_bytes.
+        """
+        vectors = points * int(vector_size) * 4
+        quantized = {"scalar": points * int(vector_size), "binary": points * int(vector_size) // 8}.get(
+            self.quantization, 0)
+        graph = points * self.hnsw_m * 2 * 4
+        ram = disk = 0
+        for size, on_disk in ((vectors, self.on_disk_vectors), (graph, self.hnsw_on_disk),
+                              (payload_bytes, self.on_disk_payload)):
+            if on_disk:
+                disk += size
+            else:
+                ram += size
+        if quantized:
+            if self.quantization_always_ram or not self.on_disk_vectors:
+                ram += quantized
+            else:
+                disk += quantized
+        return {"ram_bytes": ram, "disk_bytes": disk}
+
+
+def get_collection_profile(config: dict, collection: str, profile_name: str = None) -> CollectionProfile:
+    """
+    Returns the profile of a collection: the one assigned to it under `Qdrant.collection_profiles`,
+    or `Qdrant.default_collection_profile`.
+
+    Args:
+        config (dict): The loaded configuration.
+        collection (str): The collection name.
+        profile_name (str): Overrides the configured profile.
+
+    Returns:
+        CollectionProfile: The profile; built-in defaults when no profile is configured.
+    """
+    qdrant_config = config.get("Qdrant", {})
+    name = (profile_name
+            or (qdrant_config.get("collection_profiles") or {}).get(collection)
+            or qdrant_config.get("default_collection_profile", "default"))
+    profiles = config.get("Collection_Profiles") or {}
+    if name not in profiles:
+        if profile_name is not None or name != "default":
+            raise ValueError(f"Unknown collection profile: {name}")
+        return CollectionProfile()
+    return CollectionProfile.from_dict(name, profiles[name])
@@ -3,13 +3,24 @@ import logging
 import os
 import shutil
 
-from llama_index import (ServiceContext, SimpleDirectoryReader, StorageContext,
-                         VectorStoreIndex)
-from llama_index.vector_stores.qdrant import QdrantVectorStore
+from llama_index import SimpleDirectoryReader
+from llama_index.ingestion import run_transformations
+from llama_index.readers.file.base import default_file_metadata_func
+from llama_index.schema import MetadataMode
+from llama_index.vector_stores.utils import metadata_dict_to_node
 from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
 
-from src.utils.config import load_config, setup_environment_variables
-from src.utils.embedding_selector import EmbeddingConfig, EmbeddingSelector
+from src.agent.answer_cache import get_answer_cache
+from src.loader.collection_profiles import CollectionProfile, get_collection_profile
+from src.loader.embedding_pipeline import EmbeddingPipeline
+from src.loader.lexical_index import get_lexical_index
+from src.loader.markdown_chunker import MarkdownChunker, RawMarkdownReader
+from src.loader.manifest import get_ingestion_manifest
+from src.utils.page_metadata import (EXCLUDED_EMBED_KEYS, EXCLUDED_LLM_KEYS,
+                                     PAYLOAD_INDEXES, SIDECAR_SUFFIX,
+                                     read_sidecar, sidecar_path)
+from src.utils.resources import get_resource_registry
 
 logger = logging.getLogger(__name__)
 
@@ -25,19 +36,56 @@ class QdrantCollectionManager:
             return False
 
     @staticmethod
-    def create_collection(client: QdrantClient, collection_name: str, vector_size: int):
-        client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config={
-                "size": vector_size,
-                "distance": "Cosine"
-            }
-        )
+    def create_collection(client: QdrantClient, collection_name: str, vector_size: int,
+                          profile: CollectionProfile = None):
+        """Creates (or recreates) a collection with the storage and index settings of its profile."""
+        profile = profile or CollectionProfile()
+        client.recreate_collection(collection_name=collection_name, **profile.create_kwargs(vector_size))
+        logger.info(f"Created collection {collection_name} with profile {profile.name}.")
+        QdrantCollectionManager.ensure_payload_indexes(client, collection_name)
+
+    @staticmethod
+    def apply_profile(client: QdrantClient, collection_name: str, profile: CollectionProfile):
+        """
+        Moves an existing collection to a profile in place, keeping its points.
+        Qdrant rebuilds the index and the quantized vectors in the background.
+        """
+        client.update_collection(collection_name=collection_name, **profile.update_kwargs())
+        logger.info(f"Applied profile {profile.name} to collection {collection_name}.")
 
     @staticmethod
-    def ensure_collection(client: QdrantClient, collection_name: str, vector_size: int):
+    def ensure_payload_indexes(client: QdrantClient, collection_name: str):
+        """Indexes the page metadata fields of the payload, so filtered searches only visit matching points."""
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            client.create_payload_index(collection_name=collection_name, field_name=field_name,
+                                        field_schema=field_schema)
+
+    @staticmethod
+    def ensure_collection(client: QdrantClient, collection_name: str, vector_size: int,
+                          profile: CollectionProfile = None):
         if not QdrantCollectionManager.collection_exists(client, collection_name):
-            QdrantCollectionManager.create_collection(client, collection_name, vector_size)
+            QdrantCollectionManager.create_collection(client, collection_name, vector_size, profile)
+
+
+def build_chunking(config: dict, service_context, chunker: str = None) -> tuple:
+    """
+    Returns the file readers and the chunking stage selected by `Loader.chunker`.
+
+    Args:
+        config (dict): The loaded configuration.
+        service_context: The shared ServiceContext, whose sentence splitter is the 'sentence' chunker.
+        chunker (str): Overrides `Loader.chunker` with 'markdown' or 'sentence'.
+
+    Returns:
+        tuple: The file extractor of SimpleDirectoryReader (None for its defaults) and
+               the llama_index transformations turning documents into nodes.
+    """
+    chunker = chunker or config["Loader"].get("chunker", "sentence")
+    if chunker == "markdown":
+        return {".md": RawMarkdownReader()}, [MarkdownChunker.from_config(config)]
+    if chunker == "sentence":
+        return None, service_context.transformations
+    raise ValueError(f"Unsupported chunker: {chunker}")
 
 
 class DocumentLoader:
@@ -45,38 +93,250 @@ class DocumentLoader:
     def __init__(self, source_dir='/app/src/scraper/scraped_data', collection="techdocs"):
         self.source_dir = source_dir
         self.collection_name = collection
-        self.CONFIG = load_config()
-        setup_environment_variables(self.CONFIG)
-        self.embedding_config = EmbeddingConfig(type=self.CONFIG["Embedding_Type"])
-        self.embed_model = EmbeddingSelector(self.embedding_config).get_embedding_model()
-
-        self.client = QdrantClient(url="http://RAG_BOT_QDRANT:6333")
+        self.resources = get_resource_registry()
+        self.CONFIG = self.resources.CONFIG
+        self.embed_model = self.resources.embed_model
+        self.client = self.resources.client
+        self.manifest = get_ingestion_manifest()
+        self.lexical_index = get_lexical_index()
+        self.pipeline = EmbeddingPipeline.from_config(self.embed_model, self.CONFIG)
+        self.file_extractor, self.transformations = build_chunking(self.CONFIG, self.resources.service_context)
+        self.vector_size = int(self.CONFIG["Qdrant"]["vector_size"])
+        self.max_inflight_bytes = self.CONFIG["Loader"].get("max_inflight_mb", 256) * 1024 * 1024
 
         if not QdrantCollectionManager.collection_exists(self.client, collection):
-            QdrantCollectionManager.create_collection(self.client, collection, self.CONFIG["Qdrant"]["vector_size"])
+            QdrantCollectionManager.create_collection(self.client, collection, self.vector_size,
+                                                      get_collection_profile(self.CONFIG, collection))
+            self.resources.evict(collection)
+            # A fresh collection holds none of the points the manifest remembers.
+            self.manifest.forget(collection)
+            self.lexical_index.forget(collection)
+        else:
+            # Collections created before the page metadata existed get their indexes here.
+            QdrantCollectionManager.ensure_payload_indexes(self.client, collection)
+
+    def load_documents(self, progress_callback=None, cancel_event=None):
+        """
+        Loads new and modified documents from the source directory into the collection.
 
-    def load_documents(self):
+        Files are read, chunked, embedded and upserted in bounded windows, so memory use
+        is capped by `Loader.max_inflight_mb` rather than by the size of the directory.
+        Documents whose content hash matches the ingestion manifest are skipped. Changed
+        documents have their previous points deleted once the new ones are stored, and
+        only chunks whose text is new are sent to the embedding pipeline; the vectors of
+        unchanged chunks are reused.
+        Stored chunks are also indexed in the BM25 lexical index used by hybrid search.
+
+        Parameters:
+        - progress_callback (callable): Optional; called with files_processed,
+          chunks_embedded and points_upserted increments.
+        - cancel_event (threading.Event): Optional; once set, no further file is read.
+          The files already read are still stored, so the manifest stays consistent.
+
+        Returns:
+        - VectorStoreIndex: The index of the collection.
+        """
         try:
-            service_context = ServiceContext.from_defaults(embed_model=self.embed_model)
-            documents = SimpleDirectoryReader(self.source_dir).load_data()
-            vector_store = QdrantVectorStore(client=self.client, collection_name=self.collection_name)
-            storage_context = StorageContext.from_defaults(vector_store=vector_store)
-            index = VectorStoreIndex.from_documents(documents, storage_context=storage_context, service_context=service_context)
+            vector_store = self.resources.get_vector_store(self.collection_name)
+            changed = False
+            for file_paths, nodes, records in self.iter_windows(cancel_event):
+                self.pipeline.run(nodes, vector_store, progress_callback)
+                self.lexical_index.add(self.collection_name, nodes)
+
+                # Only drop the previous points of changed documents, and remember the
+                # documents, once their new points are stored.
+                self._delete_replaced(records, nodes)
+                for record in records:
+                    self.manifest.record(self.collection_name, **record)
+                self.manifest.save()
 
-            # Move the files after successfully loading them to the vector index
-            self.move_files_to_out()
+                # Move the files after successfully loading them to the vector index
+                self.move_files_to_out(file_paths)
+                changed = changed or bool(records)
+                if progress_callback is not None:
+                    progress_callback(files_processed=len(file_paths))
 
-            return index
+            if changed:
+                self._invalidate_answer_cache()
+
+            return self.resources.get_index(self.collection_name)
         except Exception as e:
             logging.error(f"load_documents: Error - {str(e)}")
             raise e
 
-    def move_files_to_out(self):
-        out_dir = '/app/src/scraper/out'
+    def _invalidate_answer_cache(self):
+        """Drops cached chat answers that may have been built on the previous contents of the collection."""
+        answer_cache = get_answer_cache()
+        if answer_cache is not None:
+            answer_cache.invalidate(self.collection_name)
+
+    def iter_windows(self, cancel_event=None):
+        """
+        Reads the source directory one file at a time and groups the resulting nodes
+        into windows whose estimated footprint stays within the in-flight budget.
+
+        Args:
+            cancel_event (threading.Event): Optional; once set, reading stops after the
+                                            current file and the partial window is yielded.
+
+        Yields:
+            tuple: The file paths of the window, the nodes to upsert and the pending
+                   manifest records of its changed documents.
+        """
+        file_paths, nodes, records, inflight = [], [], [], 0
+        reader = SimpleDirectoryReader(
+            self.source_dir,
+            file_extractor=self.file_extractor,
+            exclude=[f"*{SIDECAR_SUFFIX}"],
+            file_metadata=self.file_metadata
+        )
+        for file_documents in reader.iter_data():
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("Loading cancelled; stopping after the files already read.")
+                break
+            file_nodes, record = self._prepare_file(file_documents)
+            file_paths.append(file_documents[0].metadata["file_path"])
+            nodes.extend(file_nodes)
+            if record:
+                records.append(record)
+            inflight += sum(self._estimate_node_bytes(node) for node in file_nodes)
+
+            if inflight >= self.max_inflight_bytes:
+                yield file_paths, nodes, records
+                file_paths, nodes, records, inflight = [], [], [], 0
+
+        if file_paths:
+            yield file_paths, nodes, records
+
+    @staticmethod
+    def file_metadata(file_path: str) -> dict:
+        """Returns the metadata of a file: the llama_index file metadata plus the page metadata of its sidecar."""
+        return {**default_file_metadata_func(file_path), **read_sidecar(file_path)}
+
+    def _estimate_node_bytes(self, node) -> int:
+        """Approximates the memory a node holds once embedded: its text plus a list of Python floats."""
+        return len(node.get_content()) * 2 + self.vector_size * 32
+
+    def _prepare_file(self, file_documents: list) -> tuple:
+        """
+        Chunks the documents read from one file, if the file changed since it was last ingested.
+
+        Args:
+            file_documents (list): The llama_index Documents read from a single file.
+
+        Returns:
+            tuple: The nodes to insert (empty when the file is unchanged) and the manifest
+                   record to store once they are upserted (None when unchanged). The record
+                   of a changed file also lists the doc ids of its previous points under
+                   `replaced_doc_ids`.
+        """
+        doc_key = file_documents[0].metadata["file_name"]
+        for i, document in enumerate(file_documents):
+            document.id_ = f"{doc_key}_part_{i}"
+            # The page metadata goes to the payload for filtering, not into the embedded text.
+            document.excluded_embed_metadata_keys.extend(EXCLUDED_EMBED_KEYS)
+            document.excluded_llm_metadata_keys.extend(EXCLUDED_LLM_KEYS)
+
+        content_hash = self.manifest.hash_text("".join(document.text for document in file_documents))
+        entry = self.manifest.get(self.collection_name, doc_key)
+        if entry and entry["hash"] == content_hash:
+            logger.info(f"Skipping unchanged document {doc_key}.")
+            return [], None
+
+        nodes = run_transformations(file_documents, self.transformations)
+        chunk_hashes = [self.manifest.hash_text(node.get_content(metadata_mode=MetadataMode.EMBED)) for node in nodes]
+
+        if entry:
+            self._reuse_embeddings(nodes, chunk_hashes, entry["chunks"])
+            logger.info(f"Replacing modified document {doc_key}.")
+
+        record = {
+            "doc_key": doc_key,
+            "content_hash": content_hash,
+            "doc_ids": [document.id_ for document in file_documents],
+            "chunks": dict(zip(chunk_hashes, (node.node_id for node in nodes))),
+            "replaced_doc_ids": entry["doc_ids"] if entry else [],
+        }
+        return nodes, record
+
+    def _delete_replaced(self, records: list, nodes: list):
+        """
+        Deletes the previous points of the changed documents of a window, once its new
+        points are stored. The new points reuse the doc ids of the documents, so only
+        the points of these doc ids that are not among the new nodes are deleted.
+        """
+        replaced = [doc_id for record in records for doc_id in record.pop("replaced_doc_ids")]
+        if not replaced:
+            return
+        new_ids = [node.node_id for node in nodes]
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=rest.FilterSelector(filter=rest.Filter(
+                must=[rest.FieldCondition(key="doc_id", match=rest.MatchAny(any=replaced))],
+                must_not=[rest.HasIdCondition(has_id=new_ids)] if new_ids else None
+            )),
+            wait=True
+        )
+        for doc_id in replaced:
+            self.lexical_index.delete(self.collection_name, doc_id, keep=new_ids)
+
+    def _reuse_embeddings(self, nodes: list, chunk_hashes: list, previous_chunks: dict):
+        """Copies the stored vectors of unchanged chunks onto their new nodes."""
+        reusable = {chunk_hash: previous_chunks[chunk_hash] for chunk_hash in chunk_hashes if chunk_hash in previous_chunks}
+        if not reusable:
+            return
+
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=list(reusable.values()),
+            with_payload=False,
+            with_vectors=True
+        )
+        vectors = {str(point.id): point.vector for point in points}
+
+        for node, chunk_hash in zip(nodes, chunk_hashes):
+            point_id = reusable.get(chunk_hash)
+            if point_id in vectors:
+                node.embedding = vectors[point_id]
+        logger.info(f"Reused {len(vectors)} of {len(nodes)} chunk embeddings.")
+
+    def rebuild_lexical_index(self, batch_size: int = 256) -> int:
+        """
+        Rebuilds the lexical index of the collection from the chunks stored in Qdrant,
+        e.g. for a collection loaded before hybrid search existed.
+
+        Returns:
+            int: Number of chunks indexed.
+        """
+        self.lexical_index.forget(self.collection_name)
+        indexed, offset = 0, None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            nodes = [metadata_dict_to_node(point.payload) for point in points]
+            self.lexical_index.add(self.collection_name, nodes)
+            indexed += len(nodes)
+            if offset is None:
+                break
+        logger.info(f"Indexed {indexed} chunks of {self.collection_name} in the lexical index.")
+        return indexed
+
+    def move_files_to_out(self, file_paths: list = None):
+        """Moves the given files and their metadata sidecars, or every file of the source directory, to the out directory."""
+        out_dir = self.CONFIG["Loader"]["out_dir"]
         if not os.path.exists(out_dir):
             os.makedirs(out_dir)
 
-        for filename in os.listdir(self.source_dir):
-            file_path = os.path.join(self.source_dir, filename)
+        if file_paths is None:
+            file_paths = [os.path.join(self.source_dir, filename) for filename in os.listdir(self.source_dir)]
+        else:
+            file_paths = file_paths + [sidecar_path(file_path) for file_path in file_paths]
+
+        for file_path in file_paths:
             if os.path.isfile(file_path):
-                shutil.move(file_path, os.path.join(out_dir, filename))
+                shutil.move(file_path, os.path.join(out_dir, os.path.basename(file_path)))
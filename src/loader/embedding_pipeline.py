@@ -0,0 +1,178 @@
+# /src/loader/embedding_pipeline.py
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from llama_index.schema import MetadataMode
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def iter_batches(items: list, size: int):
+    """Yields consecutive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class EmbeddingPipeline:
+    """
+    Embedding stage between chunking and the Qdrant upsert.
+
+    Nodes are embedded in fixed-size batches. Local models run their batches on a
+    thread pool; by default it is sized so that the pool threads times the threads
+    of one model call (torch or ONNX Runtime intra-op threads) fit in the CPU cores.
+    Remote (OpenAI) models run their batches as async requests with bounded
+    concurrency, on an event loop of their own thread. Embedded nodes are streamed into Qdrant
+    in batched upserts as soon as enough of them are ready, so the number of nodes
+    waiting in memory never exceeds the upsert batch plus the batches in flight.
+
+    Attributes:
+    - embed_model: The llama_index embedding model.
+    - embedding_type (str): The configured `Embedding_Type`; 'openai' selects the async path.
+    - batch_size (int): Number of nodes per embedding call.
+    - workers (int): Thread pool size for local models; 0 to size it from the CPU cores.
+    - max_concurrency (int): Maximum concurrent batch requests for remote models.
+    - upsert_batch_size (int): Number of points per Qdrant upsert.
+    """
+
+    def __init__(self, embed_model, embedding_type: str, batch_size: int = 64, workers: int = 0,
+                 max_concurrency: int = 8, upsert_batch_size: int = 256):
+        self.embed_model = embed_model
+        self.embedding_type = embedding_type
+        self.batch_size = max(1, batch_size)
+        self.workers = max(0, workers)
+        self.max_concurrency = max(1, max_concurrency)
+        self.upsert_batch_size = max(1, upsert_batch_size)
+
+    @classmethod
+    def from_config(cls, embed_model, config: dict) -> "EmbeddingPipeline":
+        """Builds a pipeline from the `Loader` section of config.yml."""
+        loader_config = config.get("Loader", {})
+        return cls(
+            embed_model,
+            config["Embedding_Type"],
+            batch_size=loader_config.get("embed_batch_size", 64),
+            workers=loader_config.get("embed_workers", 0),
+            max_concurrency=loader_config.get("embed_max_concurrency", 8),
+            upsert_batch_size=loader_config.get("upsert_batch_size", 256),
+        )
+
+    def run(self, nodes: list, vector_store: QdrantVectorStore, progress_callback=None) -> int:
+        """
+        Embeds the nodes that have no embedding yet and upserts every node into Qdrant.
+
+        Blocks until every node is upserted; coroutines should call it through asyncio.to_thread.
+
+        Args:
+            nodes (list): Nodes to store. Nodes that already carry an embedding skip the model.
+            vector_store (QdrantVectorStore): Destination of the upserts.
+            progress_callback (callable): Optional; called with chunks_embedded and
+                                          points_upserted increments as batches complete.
+
+        Returns:
+            int: Number of points upserted.
+        """
+        pending = [node for node in nodes if node.embedding is None]
+        buffer = [node for node in nodes if node.embedding is not None]
+        upserted = 0
+
+        def upsert(batch):
+            count = self._upsert(vector_store, batch)
+            if progress_callback is not None:
+                progress_callback(points_upserted=count)
+            return count
+
+        for embedded_batch in self._embed_batches(pending):
+            if progress_callback is not None:
+                progress_callback(chunks_embedded=len(embedded_batch))
+            buffer.extend(embedded_batch)
+            while len(buffer) >= self.upsert_batch_size:
+                upserted += upsert(buffer[:self.upsert_batch_size])
+                buffer = buffer[self.upsert_batch_size:]
+
+        if buffer:
+            upserted += upsert(buffer)
+
+        logger.info(f"Embedded {len(pending)} nodes and upserted {upserted} points.")
+        return upserted
+
+    def _embed_batches(self, nodes: list):
+        """Yields batches of nodes with their embeddings set, in input order."""
+        batches = list(iter_batches(nodes, self.batch_size))
+        if not batches:
+            return
+        if self.embedding_type == "openai":
+            yield from self._embed_batches_async(batches)
+        else:
+            yield from self._embed_batches_threaded(batches)
+
+    def _model_threads(self, cores: int) -> int:
+        """Returns the number of threads one call of the local model runs on."""
+        threads = getattr(self.embed_model, "threads", None)
+        if threads is not None:
+            # OnnxEmbedding; 0 lets ONNX Runtime use every core
+            return threads or cores
+        try:
+            import torch
+        except ImportError:
+            return 1
+        return torch.get_num_threads()
+
+    def _local_workers(self) -> int:
+        if self.workers:
+            return self.workers
+        cores = os.cpu_count() or 1
+        return max(1, cores // max(1, self._model_threads(cores)))
+
+    def _embed_batches_threaded(self, batches: list):
+        workers = self._local_workers()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as executor:
+            # Keep at most two batches per worker queued so embedded nodes are
+            # drained into Qdrant before more work is submitted.
+            window = workers * 2
+            futures = [executor.submit(self._embed_batch, batch) for batch in batches[:window]]
+            next_batch = window
+            while futures:
+                yield futures.pop(0).result()
+                if next_batch < len(batches):
+                    futures.append(executor.submit(self._embed_batch, batches[next_batch]))
+                    next_batch += 1
+
+    def _embed_batches_async(self, batches: list):
+        # The loop runs in a thread of its own, so run() also works from a thread
+        # whose event loop is running.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-loop") as executor:
+            loop = asyncio.new_event_loop()
+            try:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                window = self.max_concurrency * 2
+                for start in range(0, len(batches), window):
+                    gathered = self._aembed_batches(batches[start:start + window], semaphore)
+                    yield from executor.submit(loop.run_until_complete, gathered).result()
+            finally:
+                executor.submit(loop.close).result()
+
+    async def _aembed_batches(self, batches: list, semaphore: asyncio.Semaphore) -> list:
+        return await asyncio.gather(*(self._aembed_batch(batch, semaphore) for batch in batches))
+
+    def _embed_batch(self, batch: list) -> list:
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+        embeddings = self.embed_model.get_text_embedding_batch(texts)
+        for node, embedding in zip(batch, embeddings):
+            node.embedding = embedding
+        return batch
+
+    async def _aembed_batch(self, batch: list, semaphore: asyncio.Semaphore) -> list:
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+        async with semaphore:
+            embeddings = await self.embed_model.aget_text_embedding_batch(texts)
+        for node, embedding in zip(batch, embeddings):
+            node.embedding = embedding
+        return batch
+
+    @staticmethod
+    def _upsert(vector_store: QdrantVectorStore, nodes: list) -> int:
+        vector_store.add(nodes)
+        return len(nodes)
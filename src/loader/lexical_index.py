@@ -0,0 +1,187 @@
+# /src/loader/lexical_index.py
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from llama_index.schema import MetadataMode
+
+from src.utils.config import load_config
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the lexical index instance shared by loaders and searches
+_lexical_index_instance = None
+_lexical_index_lock = threading.Lock()
+
+# Query terms are split like the FTS5 tokenizer splits documents: runs of letters,
+# digits and underscores, so snake_case names and error codes stay whole.
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+MAX_QUERY_TERMS = 64
+
+
+def match_expression(query: str) -> str:
+    """
+    Builds the FTS5 MATCH expression of a free-text query: any of its terms, each
+    quoted so that operators and punctuation in user input are taken literally.
+
+    Returns:
+        str: The expression, or an empty string when the query has no term.
+    """
+    terms = list(dict.fromkeys(term.lower() for term in TERM_PATTERN.findall(query)))[:MAX_QUERY_TERMS]
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class LexicalIndex:
+    """
+    BM25 index of the chunks stored in Qdrant, kept in SQLite FTS5.
+
+    Dense retrieval matches meaning but often misses exact identifiers such as
+    function names, error codes or command-line flags; this index matches them
+    term by term. Each chunk is indexed under its Qdrant point id, so search results
+    can be fused with dense results and their payload fetched from Qdrant. Chunks
+    are also tagged with their llama_index doc id, so the loader can drop the chunks
+    of a document when it replaces it.
+
+    Each collection has its own FTS5 table, so a search only scans the postings of
+    its collection and BM25 term statistics are not skewed by other collections.
+    The index is a local file: hybrid search only finds the chunks ingested on the
+    same host.
+
+    Attributes:
+    - path (str): SQLite file of the index, or ':memory:'.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "rowid INTEGER PRIMARY KEY, collection TEXT NOT NULL, chunk_id TEXT NOT NULL, "
+            "ref_doc_id TEXT, UNIQUE (collection, chunk_id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_by_doc ON chunks (collection, ref_doc_id)")
+        self._db.commit()
+
+    @staticmethod
+    def _text_table(collection: str) -> str:
+        # Collection names may hold any character, so the table is named after their hash
+        return "chunk_text_" + hashlib.sha256(collection.encode("utf-8")).hexdigest()[:16]
+
+    def _create_text_table(self, collection: str) -> str:
+        table = self._text_table(collection)
+        self._db.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(text, tokenize=\"unicode61 tokenchars '_'\")"
+        )
+        return table
+
+    def _delete_rows(self, collection: str, where: str, params: tuple):
+        rowids = [row[0] for row in self._db.execute(f"SELECT rowid FROM chunks WHERE {where}", params)]
+        return self._delete_rowids(collection, rowids)
+
+    def _delete_rowids(self, collection: str, rowids: list):
+        if rowids:
+            table = self._create_text_table(collection)
+            self._db.executemany(f"DELETE FROM {table} WHERE rowid = ?", ((rowid,) for rowid in rowids))
+            self._db.executemany("DELETE FROM chunks WHERE rowid = ?", ((rowid,) for rowid in rowids))
+        return len(rowids)
+
+    def add(self, collection: str, nodes: list):
+        """
+        Indexes nodes under their point ids, replacing any chunk already indexed under the same id.
+
+        Args:
+            collection (str): Collection the nodes were upserted into.
+            nodes (list): The llama_index nodes.
+        """
+        with self._lock:
+            table = self._create_text_table(collection)
+            for node in nodes:
+                self._delete_rows(collection, "collection = ? AND chunk_id = ?", (collection, node.node_id))
+                cursor = self._db.execute(
+                    "INSERT INTO chunks (collection, chunk_id, ref_doc_id) VALUES (?, ?, ?)",
+                    (collection, node.node_id, node.ref_doc_id)
+                )
+                self._db.execute(
+                    f"INSERT INTO {table} (rowid, text) VALUES (?, ?)",
+                    (cursor.lastrowid, node.get_content(metadata_mode=MetadataMode.NONE))
+                )
+            self._db.commit()
+
+    def delete(self, collection: str, ref_doc_id: str, keep=()) -> int:
+        """
+        Removes the chunks of a llama_index document and returns how many were removed.
+
+        Args:
+            collection (str): The collection of the document.
+            ref_doc_id (str): The llama_index doc id of the document.
+            keep (Iterable): Chunk ids left in place, e.g. the new chunks of a replaced document.
+        """
+        keep = set(keep)
+        with self._lock:
+            rowids = [rowid for rowid, chunk_id in self._db.execute(
+                "SELECT rowid, chunk_id FROM chunks WHERE collection = ? AND ref_doc_id = ?", (collection, ref_doc_id)
+            ) if chunk_id not in keep]
+            removed = self._delete_rowids(collection, rowids)
+            self._db.commit()
+        return removed
+
+    def forget(self, collection: str):
+        """Drops every chunk of a collection."""
+        with self._lock:
+            self._db.execute(f"DROP TABLE IF EXISTS {self._text_table(collection)}")
+            self._db.execute("DELETE FROM chunks WHERE collection = ?", (collection,))
+            self._db.commit()
+
+    def search(self, collection: str, query: str, limit: int) -> list:
+        """
+        Ranks the chunks of a collection against a query with BM25.
+
+        Args:
+            collection (str): The collection searched.
+            query (str): The free-text query.
+            limit (int): Maximum number of chunks returned.
+
+        Returns:
+            list: (chunk_id, score) pairs, best first; higher scores are better.
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        with self._lock:
+            table = self._create_text_table(collection)
+            rows = self._db.execute(
+                f"SELECT chunks.chunk_id, bm25({table}) AS rank FROM {table} "
+                f"JOIN chunks ON chunks.rowid = {table}.rowid "
+                f"WHERE {table} MATCH ? ORDER BY rank LIMIT ?",
+                (expression, limit)
+            ).fetchall()
+        # FTS5 returns BM25 negated so that ascending order ranks best first.
+        return [(chunk_id, -rank) for chunk_id, rank in rows]
+
+    def count(self, collection: str) -> int:
+        """Returns the number of chunks indexed for a collection."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks WHERE collection = ?", (collection,)).fetchone()[0]
+
+    def close(self):
+        """Closes the database."""
+        with self._lock:
+            self._db.close()
+
+
+def get_lexical_index() -> LexicalIndex:
+    # Singleton-like accessor for the LexicalIndex instance
+    global _lexical_index_instance
+    if _lexical_index_instance is None:
+        with _lexical_index_lock:
+            if _lexical_index_instance is None:
+                _lexical_index_instance = LexicalIndex(load_config()["Search"]["lexical_index_path"])
+    return _lexical_index_instance
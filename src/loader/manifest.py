@@ -0,0 +1,100 @@
+# /src/loader/manifest.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from src.utils.config import load_config
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the manifest instance shared by every loader
+_manifest_instance = None
+
+
+class IngestionManifest:
+    """
+    Record of what has already been ingested into each collection.
+
+    Entries are keyed by collection and document id (the source file name) and hold
+    the content hash of the document, the llama_index doc ids its points were stored
+    under, and a map of chunk hash to Qdrant point id. The loader uses it to skip
+    unchanged documents, to delete the stale points of changed ones, and to reuse the
+    vectors of chunks whose text did not change.
+
+    Attributes:
+    - path (str): Location of the JSON manifest file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = self._read()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Returns the content hash used for documents and chunks."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+            return {}
+
+    def get(self, collection: str, doc_key: str) -> dict:
+        """Returns the manifest entry of a document, or None if it was never ingested."""
+        with self._lock:
+            return self._entries.get(collection, {}).get(doc_key)
+
+    def record(self, collection: str, doc_key: str, content_hash: str, doc_ids: list, chunks: dict):
+        """
+        Records a document as ingested.
+
+        Args:
+            collection (str): Collection the document was loaded into.
+            doc_key (str): Stable identifier of the document (its file name).
+            content_hash (str): Hash of the document text.
+            doc_ids (list): llama_index doc ids whose points belong to the document.
+            chunks (dict): Map of chunk hash to the Qdrant point id holding its vector.
+        """
+        with self._lock:
+            self._entries.setdefault(collection, {})[doc_key] = {
+                "hash": content_hash,
+                "doc_ids": doc_ids,
+                "chunks": chunks,
+                "ingested_at": time.time(),
+            }
+
+    def forget(self, collection: str, doc_key: str = None):
+        """Drops one document, or a whole collection when no document is given."""
+        with self._lock:
+            if doc_key is None:
+                self._entries.pop(collection, None)
+            else:
+                self._entries.get(collection, {}).pop(doc_key, None)
+
+    def save(self):
+        """Writes the manifest atomically so a crash never leaves it half-written."""
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+
+
+def get_ingestion_manifest() -> IngestionManifest:
+    # Singleton-like accessor for the IngestionManifest instance
+    global _manifest_instance
+    if _manifest_instance is None:
+        _manifest_instance = IngestionManifest(load_config()["Loader"]["manifest_path"])
+    return _manifest_instance
@@ -0,0 +1,233 @@
+# /src/loader/markdown_chunker.py
+import logging
+import re
+from typing import Any, Callable, List, Optional, Sequence
+
+from llama_index.bridge.pydantic import Field, PrivateAttr
+from llama_index.callbacks import CallbackManager
+from llama_index.node_parser import SentenceSplitter
+from llama_index.node_parser.interface import NodeParser
+from llama_index.node_parser.node_utils import build_nodes_from_splits
+from llama_index.readers.base import BaseReader
+from llama_index.schema import BaseNode, Document, MetadataMode
+from llama_index.utils import get_tokenizer, get_tqdm_iterable
+
+logger = logging.getLogger(__name__)
+
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+HEADING_PATH_SEPARATOR = " > "
+
+
+def parse_sections(text: str) -> list:
+    """
+    Splits markdown into sections at its headings.
+
+    Each section starts at a heading (or at the top of the text) and holds its blocks:
+    the heading line, paragraphs and lists separated by blank lines, and whole fenced
+    code blocks, blank lines included. Lines inside a fence are never read as headings.
+
+    Returns:
+        list: (heading path, blocks) pairs in document order; the heading path is the
+              tuple of the titles of the enclosing headings, outermost first.
+    """
+    sections, blocks, lines = [], [], []
+    path = []
+    fence = None
+
+    def flush_block():
+        if any(line.strip() for line in lines):
+            blocks.append("\n".join(lines).strip("\n"))
+        lines.clear()
+
+    def flush_section():
+        flush_block()
+        if blocks:
+            sections.append((tuple(title for _, title in path), list(blocks)))
+        blocks.clear()
+
+    for line in text.splitlines():
+        if fence is not None:
+            lines.append(line)
+            if line.strip().startswith(fence):
+                flush_block()
+                fence = None
+            continue
+
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            flush_block()
+            fence = fence_match.group(1)
+            lines.append(line)
+            continue
+
+        heading_match = HEADING_PATTERN.match(line)
+        if heading_match:
+            flush_section()
+            level = len(heading_match.group(1))
+            path = [(lvl, title) for lvl, title in path if lvl < level] + [(level, heading_match.group(2))]
+            blocks.append(line)
+        elif line.strip():
+            lines.append(line)
+        else:
+            flush_block()
+
+    flush_section()
+    return sections
+
+
+class RawMarkdownReader(BaseReader):
+    """
+    Reads a markdown file as a single document with its markup intact.
+
+    The default llama_index markdown reader already splits files at every line
+    starting with '#', code comments included, and strips the heading markers and
+    anything between angle brackets; the MarkdownChunker needs the original text.
+    """
+
+    def load_data(self, file, extra_info: dict = None) -> List[Document]:
+        with open(file, "r", encoding="utf-8", errors="replace") as f:
+            return [Document(text=f.read(), metadata=extra_info or {})]
+
+
+class MarkdownChunker(NodeParser):
+    """
+    Chunker following the structure of the markdown written by the scraper.
+
+    Documents are cut at their headings, so a chunk never mixes the end of one topic
+    with the start of another, and fenced code blocks are kept whole. Consecutive
+    sections smaller than the token budget are merged, which avoids the many tiny
+    fragments a sentence splitter makes of short sections and list items. A section
+    over the budget is split between its blocks; only a single block over the budget
+    is split further, a code block on line boundaries with its fence repeated around
+    each piece, and prose by sentences.
+
+    Every chunk records the heading path of the section it starts in, e.g.
+    "Install > Configuration", in its `heading_path` metadata, so the path is part
+    of the embedded text and shown with retrieved chunks.
+
+    Attributes:
+    - chunk_size (int): Token budget of a chunk, metadata included.
+    """
+
+    chunk_size: int = Field(default=512, description="Token budget of a chunk, metadata included.", gt=0)
+
+    _tokenizer: Callable = PrivateAttr()
+
+    def __init__(
+        self,
+        chunk_size: int = 512,
+        tokenizer: Optional[Callable] = None,
+        callback_manager: Optional[CallbackManager] = None,
+        include_metadata: bool = True,
+        include_prev_next_rel: bool = True,
+    ):
+        super().__init__(
+            chunk_size=chunk_size,
+            callback_manager=callback_manager or CallbackManager([]),
+            include_metadata=include_metadata,
+            include_prev_next_rel=include_prev_next_rel,
+        )
+        self._tokenizer = tokenizer or get_tokenizer()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "MarkdownChunker":
+        """Builds the chunker from the `Loader` section of config.yml."""
+        return cls(chunk_size=config.get("Loader", {}).get("chunk_size", 512))
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "MarkdownChunker"
+
+    def _count(self, text: str) -> int:
+        return len(self._tokenizer(text))
+
+    def _parse_nodes(self, nodes: Sequence[BaseNode], show_progress: bool = False, **kwargs: Any) -> List[BaseNode]:
+        all_nodes = []
+        for node in get_tqdm_iterable(nodes, show_progress, "Chunking markdown"):
+            # Leave room for the document metadata embedded with every chunk.
+            metadata_tokens = self._count(node.get_metadata_str(mode=MetadataMode.EMBED)) if self.include_metadata else 0
+            budget = max(self.chunk_size // 2, self.chunk_size - metadata_tokens)
+            chunks = self.split_sections(node.get_content(metadata_mode=MetadataMode.NONE), budget)
+
+            split_nodes = build_nodes_from_splits([text for _, text in chunks], node, id_func=self.id_func)
+            for split_node, (path, _) in zip(split_nodes, chunks):
+                split_node.metadata["heading_path"] = HEADING_PATH_SEPARATOR.join(path)
+            all_nodes.extend(split_nodes)
+        return all_nodes
+
+    def split_sections(self, text: str, budget: int = None) -> list:
+        """
+        Chunks a markdown text.
+
+        Args:
+            text (str): The markdown text.
+            budget (int): Token budget of a chunk; defaults to chunk_size.
+
+        Returns:
+            list: (heading path, chunk text) pairs in document order.
+        """
+        budget = budget or self.chunk_size
+        chunks, merged, merged_tokens, merged_path = [], [], 0, ()
+
+        def flush():
+            nonlocal merged, merged_tokens
+            if merged:
+                chunks.append((merged_path, "\n\n".join(merged)))
+            merged, merged_tokens = [], 0
+
+        for path, blocks in parse_sections(text):
+            section = "\n\n".join(blocks)
+            tokens = self._count(section)
+            if tokens > budget:
+                flush()
+                chunks.extend((path, piece) for piece in self._pack(blocks, budget))
+                continue
+            if merged and merged_tokens + tokens > budget:
+                flush()
+            if not merged:
+                merged_path = path
+            merged.append(section)
+            merged_tokens += tokens
+        flush()
+        return chunks
+
+    def _pack(self, blocks: list, budget: int) -> list:
+        """Packs the blocks of an oversized section into pieces within the budget."""
+        pieces, current, current_tokens = [], [], 0
+        for block in blocks:
+            tokens = self._count(block)
+            parts = [block] if tokens <= budget else self._split_block(block, budget)
+            for part in parts:
+                part_tokens = tokens if len(parts) == 1 else self._count(part)
+                if current and current_tokens + part_tokens > budget:
+                    pieces.append("\n\n".join(current))
+                    current, current_tokens = [], 0
+                current.append(part)
+                current_tokens += part_tokens
+        if current:
+            pieces.append("\n\n".join(current))
+        return pieces
+
+    def _split_block(self, block: str, budget: int) -> list:
+        """Splits a single block over the budget: code on line boundaries, prose by sentences."""
+        lines = block.split("\n")
+        if not FENCE_PATTERN.match(lines[0]):
+            return SentenceSplitter(chunk_size=budget, chunk_overlap=0, tokenizer=self._tokenizer).split_text(block)
+
+        opening = lines[0]
+        closing = lines[-1] if len(lines) > 1 and FENCE_PATTERN.match(lines[-1]) else FENCE_PATTERN.match(opening).group(1)
+        body = lines[1:-1] if closing == lines[-1] else lines[1:]
+        line_budget = max(1, budget - self._count(opening) - self._count(closing))
+
+        pieces, current, current_tokens = [], [], 0
+        for line in body:
+            tokens = self._count(line) + 1
+            if current and current_tokens + tokens > line_budget:
+                pieces.append("\n".join([opening] + current + [closing]))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += tokens
+        if current:
+            pieces.append("\n".join([opening] + current + [closing]))
+        return pieces
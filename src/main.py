@@ -7,6 +7,11 @@ from fastapi import FastAPI
 from src.api.routes import router
 from src.utils.config import load_config, setup_environment_variables
 from src.agent.agent_handler import get_agent_handler  # Dependency function and AgentHandler for the application
+from src.utils.resources import get_resource_registry  # Shared embedding model, Qdrant client and indexes
+from src.utils.state import close_state_backend  # Session and cache state shared by the workers
+from src.jobs.manager import shutdown_job_manager
+from src.scraper.async_scraper import close_http_client
+from src.scraper.parser_pool import shutdown_parser_pool
 import logging
 import sys
 
@@ -30,8 +35,11 @@ app = FastAPI()
 async def startup_event():
     """
     Actions to be performed when the application starts up.
-    Currently initializes the AgentHandler. Extend this function if more startup logic is needed.
+    Warms up the shared resources (embedding model, Qdrant client, collection indexes)
+    and initializes the AgentHandler. Extend this function if more startup logic is needed.
     """
+    app.resources = get_resource_registry()
+    app.resources.warm_up()
     app.agent_instance = get_agent_handler()
 
 
@@ -39,9 +47,15 @@ async def startup_event():
 async def shutdown_event():
     """
     Cleanup actions to be performed when the application shuts down.
-    Extend this function if any cleanup logic for components like AgentHandler is required.
+    Stops the background jobs, closes the shared Qdrant and scraper HTTP clients and
+    stops the HTML parser pool. Extend this function if any cleanup logic for
+    components like AgentHandler is required.
     """
-    pass
+    shutdown_job_manager()
+    await get_resource_registry().aclose()
+    close_state_backend()
+    await close_http_client()
+    shutdown_parser_pool()
 
 # Include the API router
 app.include_router(router)
@@ -0,0 +1,135 @@
+# /app/src/scraper/async_scraper.py
+import asyncio
+import logging
+import threading
+import weakref
+
+import httpx
+
+from src.scraper.parser_pool import parse_in_pool
+from src.scraper.scraper import FetchResult, WebScraper
+
+logger = logging.getLogger(__name__)
+
+# HTTP clients of the running event loops, shared by the scrapes and crawls of each loop
+_http_clients = weakref.WeakKeyDictionary()
+_http_clients_lock = threading.Lock()
+
+
+def get_http_client(config: dict):
+    """Returns the async HTTP client of the running event loop, creating it on first use.
+
+    A client's connections belong to the loop that opened them, so the API loop and
+    the loop of each background crawl job get their own client.
+
+    Args:
+        config (dict): The loaded configuration; its `Crawler` section sizes the pool.
+
+    Returns:
+        httpx.AsyncClient: A client whose connection pool is reused across scrapes and crawls.
+    """
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        client = _http_clients.get(loop)
+        if client is None:
+            crawler_config = config.get("Crawler", {})
+            concurrency = crawler_config.get("concurrency", 16)
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+                timeout=crawler_config.get("timeout", 10),
+                follow_redirects=True
+            )
+            _http_clients[loop] = client
+    return client
+
+
+async def close_http_client():
+    """Closes the HTTP client of the running event loop, if it was created."""
+    with _http_clients_lock:
+        client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def afetch_page(scraper, url):
+    """Async counterpart of WebScraper.fetch_page, using the shared HTTP client.
+
+    Args:
+        scraper (WebScraper): The scraper holding the response cache.
+        url (str): The URL to fetch content from.
+
+    Returns:
+        FetchResult: The content and whether it is unchanged, or None on failure.
+    """
+    http_cache = scraper.http_cache
+    entry = await asyncio.to_thread(http_cache.get, url)
+    if entry and http_cache.is_fresh(entry):
+        logger.info(f"Using cached response for {url}")
+        return FetchResult(await asyncio.to_thread(http_cache.read_body, url), unchanged=True)
+
+    logger.info(f"Attempting to fetch content from {url}")
+    headers = {"User-Agent": scraper.get_random_user_agent(), **http_cache.conditional_headers(entry)}
+    try:
+        response = await get_http_client(scraper.CONFIG).get(url, headers=headers)
+    except httpx.HTTPError as e:
+        logger.error(f"Error fetching content from {url}: {e}")
+        return None
+    return await asyncio.to_thread(
+        scraper.handle_response, url, entry, response.status_code, response.headers, response.text
+    )
+
+
+async def ascrape_site(url):
+    """Async counterpart of WebScraper.scrape_site that never blocks the event loop.
+
+    The scraper is set up, and the page written to disk, from worker threads; the
+    page is fetched with the shared async client and parsed in the parser process pool.
+
+    Args:
+        url (str): The URL to scrape.
+
+    Returns:
+        dict: Contains a message indicating the outcome and, if successful, the filepath where content was saved.
+    """
+    # Its first construction reads the configuration and creates the data and cache directories.
+    scraper = await asyncio.to_thread(WebScraper)
+    logger.info(f"Starting scraping for URL: {url}")
+
+    if not scraper.is_valid_url(url):
+        logger.error("Provided URL is invalid.")
+        return {"message": "Invalid URL", "data": ""}
+
+    result = await afetch_page(scraper, url)
+    if not result or not result.content:
+        logger.error("Failed to fetch content from URL.")
+        return {"message": "Failed to fetch content from URL", "data": ""}
+
+    # An unchanged page was already saved (and possibly ingested); skip re-parsing it.
+    if result.unchanged:
+        logger.info("Content unchanged since the last scrape.")
+        return {"message": "Content unchanged since last scrape", "data": ""}
+
+    parsed_data = await parse_in_pool(result.content, scraper.parser_backend)
+
+    filepath = await asyncio.to_thread(scraper.save_to_file, url, parsed_data["content"],
+                                       parsed_data["title"], parsed_data["metadata"]["description"])
+    if not filepath:
+        logger.error("Failed to save content.")
+        return {"message": "Failed to save content", "data": ""}
+    await asyncio.to_thread(scraper.commit_response, url, result, parsed_data["links"])
+
+    logger.info("Scraping completed successfully.")
+    return {"message": "Scraping completed successfully", "data": filepath}
+
+
+async def run_web_scraper_async(url):
+    """
+    Scrapes the given URL without blocking the event loop.
+
+    Args:
+        url (str): The URL of the website to be scraped.
+
+    Returns:
+        dict: A dictionary containing the result of the scraping process.
+    """
+    return await ascrape_site(url)
@@ -0,0 +1,261 @@
+# /app/src/scraper/crawler.py
+import asyncio
+import logging
+import re
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import httpx
+
+from src.scraper.async_scraper import get_http_client
+from src.scraper.parser_pool import parse_in_pool
+from src.scraper.scraper import FetchResult, WebScraper
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_url(url):
+    """Normalizes a URL for de-duplication: drops the fragment and lowercases scheme and host.
+
+    Args:
+        url (str): The URL to normalize.
+
+    Returns:
+        str: The normalized URL.
+    """
+    url, _ = urldefrag(url)
+    parsed = urlparse(url)
+    return parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower()).geturl()
+
+
+class AsyncCrawler:
+    """Concurrent crawler that follows links from seed URLs and saves every page through WebScraper.
+
+    Pages are fetched by a pool of async workers through the HTTP client of the event
+    loop, whose connection pool is also reused by the other scrapes and crawls.
+    A frontier queue holds the URLs still to visit and a seen set de-duplicates them.
+    Each host gets its own concurrency limit and a politeness delay between requests.
+    Fetched HTML is parsed in the shared process pool, so a batch of pages parses
+    across all cores and never blocks the event loop. A crawl with max_depth=0 is a
+    plain multi-URL scrape of the seed URLs.
+
+    Attributes:
+        max_depth (int): Number of link hops followed from the seeds.
+        max_pages (int): Maximum number of URLs scheduled in one crawl.
+        allowed_domains (set): Hosts that may be crawled; defaults to the seed hosts.
+        include_patterns (list): Regexes of which one must match a URL for it to be followed.
+        exclude_patterns (list): Regexes of which none may match a URL for it to be followed.
+        progress_callback (callable): Optional; called with pages_fetched=1 and pages_saved=1 increments.
+        cancel_event (threading.Event): Optional; once set, the URLs left in the frontier are dropped.
+    """
+
+    def __init__(self, max_depth=None, max_pages=None, allowed_domains=None, include_patterns=None,
+                 exclude_patterns=None, scraper=None, progress_callback=None, cancel_event=None):
+        self.scraper = scraper or WebScraper()
+        crawler_config = self.scraper.CONFIG.get("Crawler", {})
+        self.max_depth = max_depth if max_depth is not None else crawler_config.get("max_depth", 2)
+        self.max_pages = max_pages if max_pages is not None else crawler_config.get("max_pages", 200)
+        self.concurrency = crawler_config.get("concurrency", 16)
+        self.per_host_concurrency = crawler_config.get("per_host_concurrency", 4)
+        self.politeness_delay = crawler_config.get("politeness_delay", 0.5)
+        self.allowed_domains = {domain.lower() for domain in allowed_domains or []}
+        self.include_patterns = [re.compile(pattern) for pattern in include_patterns or []]
+        self.exclude_patterns = [re.compile(pattern) for pattern in exclude_patterns or []]
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+
+        self._frontier = None
+        self._seen = set()
+        self._host_semaphores = {}
+        self._host_locks = {}
+        self._host_next_slot = {}
+        self._saved = []
+        self._unchanged = []
+        self._failed = []
+
+    def should_follow(self, url):
+        """Checks a normalized URL against the scheme, domain and pattern limits.
+
+        Args:
+            url (str): The URL to check.
+
+        Returns:
+            bool: True if the URL may be crawled.
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return False
+        if self.allowed_domains and parsed.netloc not in self.allowed_domains:
+            return False
+        if self.include_patterns and not any(pattern.search(url) for pattern in self.include_patterns):
+            return False
+        return not any(pattern.search(url) for pattern in self.exclude_patterns)
+
+    def _schedule(self, url, depth):
+        """Adds a URL to the frontier unless it was already seen or a limit is reached."""
+        url = normalize_url(url)
+        if url in self._seen or len(self._seen) >= self.max_pages or not self.should_follow(url):
+            return
+        self._seen.add(url)
+        self._frontier.put_nowait((url, depth))
+
+    async def _wait_for_host(self, host):
+        """Spaces consecutive requests to the same host by the politeness delay."""
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            next_slot = self._host_next_slot.get(host, now)
+            if next_slot > now:
+                await asyncio.sleep(next_slot - now)
+            self._host_next_slot[host] = max(now, next_slot) + self.politeness_delay
+
+    async def fetch(self, client, url):
+        """Fetches an HTML page through the response cache, honouring the per-host limits.
+
+        Args:
+            client (httpx.AsyncClient): The shared HTTP client.
+            url (str): The URL to fetch.
+
+        Returns:
+            FetchResult: The page HTML, whether it is unchanged and the URL it was served
+                         from, or None on failure.
+        """
+        http_cache = self.scraper.http_cache
+        entry = await asyncio.to_thread(http_cache.get, url)
+        if entry and http_cache.is_fresh(entry):
+            return FetchResult(await asyncio.to_thread(http_cache.read_body, url), unchanged=True)
+
+        host = urlparse(url).netloc
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        headers = {"User-Agent": self.scraper.get_random_user_agent(), **http_cache.conditional_headers(entry)}
+        async with semaphore:
+            await self._wait_for_host(host)
+            try:
+                response = await client.get(url, headers=headers)
+            except httpx.HTTPError as e:
+                logger.error(f"Error fetching content from {url}: {e}")
+                return None
+
+        if 200 <= response.status_code < 300 and "html" not in response.headers.get("content-type", "html"):
+            logger.info(f"Skipping non-HTML content at {url}")
+            return None
+        result = await asyncio.to_thread(
+            self.scraper.handle_response, url, entry, response.status_code, response.headers, response.text
+        )
+        if result is not None:
+            result.final_url = str(response.url)
+        return result
+
+    async def _process_page(self, url, result):
+        """Parses a fetched page in the parser pool and saves and caches it off the event loop.
+
+        Unchanged pages are not saved again, and their links come from the
+        response cache when they were recorded by a previous crawl. A changed page
+        is cached, with its links, only once it is saved.
+        """
+        http_cache = self.scraper.http_cache
+        if result.unchanged:
+            entry = await asyncio.to_thread(http_cache.get, url)
+            if entry and entry.get("links") is not None:
+                return entry["links"], None
+            parsed_data = await parse_in_pool(result.content, self.scraper.parser_backend)
+            await asyncio.to_thread(http_cache.store_links, url, parsed_data["links"])
+            return parsed_data["links"], None
+
+        parsed_data = await parse_in_pool(result.content, self.scraper.parser_backend)
+        filepath = await asyncio.to_thread(self.scraper.save_to_file, url, parsed_data["content"],
+                                           parsed_data["title"], parsed_data["metadata"]["description"])
+        if filepath:
+            await asyncio.to_thread(self.scraper.commit_response, url, result, parsed_data["links"])
+        return parsed_data["links"], filepath
+
+    @property
+    def cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def _report(self, **increments):
+        if self.progress_callback is not None:
+            self.progress_callback(**increments)
+
+    async def _worker(self, client):
+        while True:
+            url, depth = await self._frontier.get()
+            try:
+                if self.cancelled:
+                    continue
+                result = await self.fetch(client, url)
+                if result is None:
+                    self._failed.append(url)
+                    continue
+                self._report(pages_fetched=1)
+
+                links, filepath = await self._process_page(url, result)
+                if filepath:
+                    self._saved.append(filepath)
+                    self._report(pages_saved=1)
+                elif result.unchanged:
+                    self._unchanged.append(url)
+                else:
+                    self._failed.append(url)
+
+                if depth < self.max_depth:
+                    # Relative links resolve against the page's URL after redirects.
+                    base_url = result.final_url or url
+                    for link in links:
+                        self._schedule(urljoin(base_url, link), depth + 1)
+            except Exception as e:
+                logger.error(f"Error crawling {url}: {e}")
+                self._failed.append(url)
+            finally:
+                self._frontier.task_done()
+
+    async def crawl(self, seed_urls):
+        """Crawls from the seed URLs until the frontier is exhausted or a limit is reached.
+
+        Args:
+            seed_urls (list): The URLs to start from.
+
+        Returns:
+            dict: A message, the filepaths of the saved pages, the URLs found unchanged
+                  since the last crawl and the URLs that failed.
+        """
+        self._frontier = asyncio.Queue()
+        valid_seeds = [url for url in seed_urls if self.scraper.is_valid_url(url)]
+        if not valid_seeds:
+            return {"message": "Invalid URL", "data": [], "unchanged": [], "failed": list(seed_urls)}
+
+        if not self.allowed_domains:
+            self.allowed_domains = {urlparse(url).netloc.lower() for url in valid_seeds}
+        for url in valid_seeds:
+            self._schedule(url, 0)
+
+        client = get_http_client(self.scraper.CONFIG)
+        workers = [asyncio.create_task(self._worker(client)) for _ in range(self.concurrency)]
+        try:
+            await self._frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        message = "Crawl cancelled" if self.cancelled else "Crawl completed"
+        logger.info(
+            f"{message}: {len(self._saved)} pages saved, {len(self._unchanged)} unchanged, "
+            f"{len(self._failed)} failed."
+        )
+        return {"message": message, "data": self._saved, "unchanged": self._unchanged, "failed": self._failed}
+
+
+async def run_crawler(seed_urls, **limits):
+    """
+    Crawls a site from the given seed URLs.
+
+    Args:
+        seed_urls (list): The URLs to start crawling from.
+        **limits: Optional max_depth, max_pages, allowed_domains, include_patterns and exclude_patterns.
+
+    Returns:
+        dict: The outcome of the crawl, with the filepaths of the saved pages.
+    """
+    crawler = AsyncCrawler(**limits)
+    return await crawler.crawl(seed_urls)
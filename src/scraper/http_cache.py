@@ -0,0 +1,141 @@
+# /app/src/scraper/http_cache.py
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCache:
+    """On-disk cache of fetched pages and their HTTP validators.
+
+    For every URL the cache keeps the response body plus a small JSON record with
+    the ETag, the Last-Modified date, the time of the last fetch, the hash of the
+    body and, once known, the links found on the page. Fresh entries (younger than
+    the TTL) are served without any request; stale ones are revalidated with a
+    conditional request.
+
+    Attributes:
+        cache_dir (str): Directory holding the cached bodies and records.
+        ttl_seconds (int): Age under which an entry is used without revalidation.
+    """
+
+    def __init__(self, cache_dir, ttl_seconds=3600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def _paths(self, url):
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{url_hash}.json"), os.path.join(self.cache_dir, f"{url_hash}.html")
+
+    @staticmethod
+    def _write_atomic(path, text):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        """Returns the cached record of a URL, or None if the URL or its body is not cached.
+
+        Args:
+            url (str): The URL to look up.
+
+        Returns:
+            dict: The cached record.
+        """
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache record for {url}: {e}")
+            return None
+
+    def read_body(self, url):
+        """Returns the cached body of a URL."""
+        _, body_path = self._paths(url)
+        with open(body_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def is_fresh(self, entry):
+        """Checks whether a record may be used without revalidating it."""
+        return time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Builds the If-None-Match / If-Modified-Since headers of a cached record."""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def _body_hash(body):
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+    def has_changed(self, url, body):
+        """Checks whether a downloaded body differs from the cached one (or nothing is cached)."""
+        previous = self.get(url)
+        return previous is None or previous.get("body_hash") != self._body_hash(body)
+
+    def store(self, url, body, etag=None, last_modified=None, links=None):
+        """Caches a downloaded body.
+
+        A changed body must only be stored once the page has been saved: the record
+        tells later fetches that the page is unchanged, so they skip saving it.
+
+        Args:
+            url (str): The fetched URL.
+            body (str): The response body.
+            etag (str): The ETag response header, if any.
+            last_modified (str): The Last-Modified response header, if any.
+            links (list): The links found on the page, if known; the cached ones are
+                          kept when the body did not change.
+
+        Returns:
+            bool: True if the body differs from the previously cached one.
+        """
+        meta_path, body_path = self._paths(url)
+        previous = self.get(url)
+        body_hash = self._body_hash(body)
+        changed = previous is None or previous.get("body_hash") != body_hash
+        if links is None and not changed:
+            links = previous.get("links")
+
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+            "body_hash": body_hash,
+            "links": links,
+        }
+        if changed:
+            self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(entry))
+        return changed
+
+    def touch(self, url):
+        """Marks a cached record as just revalidated (after a 304 response)."""
+        entry = self.get(url)
+        if entry is not None:
+            entry["fetched_at"] = time.time()
+            meta_path, _ = self._paths(url)
+            self._write_atomic(meta_path, json.dumps(entry))
+
+    def store_links(self, url, links):
+        """Remembers the links of a cached page so unchanged pages need not be parsed again."""
+        entry = self.get(url)
+        if entry is not None:
+            entry["links"] = links
+            meta_path, _ = self._paths(url)
+            self._write_atomic(meta_path, json.dumps(entry))
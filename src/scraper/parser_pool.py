@@ -0,0 +1,56 @@
+# /app/src/scraper/parser_pool.py
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.scraper.scraper import parse_html
+from src.utils.config import load_config
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the process pool shared by every scrape job
+_parser_pool = None
+
+
+def get_parser_pool():
+    """
+    Returns the process pool that parses fetched HTML, creating it on first use.
+
+    The pool size comes from Scraper.PARSE_WORKERS (0 means one worker per CPU core).
+    Workers are spawned rather than forked so they do not inherit the threads and
+    model weights of the API process.
+
+    Returns:
+        ProcessPoolExecutor: The shared parser pool.
+    """
+    global _parser_pool
+    if _parser_pool is None:
+        workers = load_config()["Scraper"].get("PARSE_WORKERS", 0) or os.cpu_count() or 1
+        _parser_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        logger.info(f"Started HTML parser pool with {workers} workers.")
+    return _parser_pool
+
+
+async def parse_in_pool(content, backend):
+    """
+    Parses an HTML page in the parser pool without blocking the event loop.
+
+    Args:
+        content (str): The HTML to parse.
+        backend (str): The parser backend, one of PARSER_BACKENDS.
+
+    Returns:
+        dict: The parsed data, as returned by parse_html.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parser_pool(), parse_html, content, backend)
+
+
+def shutdown_parser_pool():
+    """Stops the parser pool workers, if the pool was started."""
+    global _parser_pool
+    if _parser_pool is not None:
+        _parser_pool.shutdown(cancel_futures=True)
+        _parser_pool = None
@@ -3,14 +3,18 @@ import hashlib
 import logging
 import os
 import random
+import re
 import sys
+from dataclasses import dataclass
 from urllib.parse import urlparse
 
 import requests
 from bs4 import BeautifulSoup, Tag
 from requests.exceptions import RequestException
 
+from src.scraper.http_cache import HttpCache
 from src.utils.config import load_config
+from src.utils.page_metadata import build_page_metadata, write_sidecar
 
 logger = logging.getLogger(__name__)
 
@@ -100,6 +104,10 @@ class ContentParser:
 
     Supported HTML tags include paragraphs, headers (h1-h6), list items, links,
     inline code, and code blocks.
+
+    This base class works on Beautiful Soup trees (html.parser or lxml backends).
+    The node access hooks (_tag_name, _children, _text, _attr) are overridden by
+    parsers for other tree types.
     """
 
     # Dictionary that maps HTML tags to their corresponding extraction methods
@@ -117,65 +125,209 @@ class ContentParser:
         "pre": "pre"
     }
 
+    def __init__(self):
+        # Resolve the extraction method of every mapped tag once, instead of per node
+        self._extractors = {
+            tag: getattr(self, f"_extract_{tag_type}_content") for tag, tag_type in self.TAG_TYPES.items()
+        }
+
     def extract_content(self, element):
         """
         Extract content from a given HTML element and its descendants,
         converting it into markdown format.
 
+        The tree is walked iteratively in document order with an explicit stack:
+        mapped tags produce one markdown block and are not descended into, other
+        tags are expanded into their children. The blocks are joined once at the end.
+
         Args:
-        - element (Tag): A Beautiful Soup Tag object to extract content from.
+        - element: The tree node to extract content from.
 
         Returns:
         - str: The extracted content in markdown format.
         """
         content_list = []
+        extractors = self._extractors
+        stack = [element] if element is not None else []
+
+        while stack:
+            node = stack.pop()
+            tag_name = self._tag_name(node)
+            if tag_name is None:
+                continue
+
+            extractor = extractors.get(tag_name)
+            if extractor:
+                content = extractor(node)
+                if content:
+                    content_list.append(content)
+            else:
+                # Push the children reversed so they are visited in document order
+                stack.extend(reversed(self._children(node)))
 
-        # Check if the element is a valid Beautiful Soup Tag
-        if isinstance(element, Tag):
+        # Join the extracted content list into a single markdown string
+        return "\n\n".join(content_list)
 
-            # Get the type of tag (e.g., header, text, link)
-            tag_type = self.TAG_TYPES.get(element.name)
+    # Node access hooks
+    @staticmethod
+    def _tag_name(node):
+        """Return the tag name of an element node, or None for text, comments and other nodes."""
+        return node.name if isinstance(node, Tag) else None
 
-            if tag_type:
-                # Find the corresponding extraction method for the tag type
-                content_method = getattr(self, f"_extract_{tag_type}_content")
+    @staticmethod
+    def _children(node):
+        return node.contents
 
-                # Extract content from the tag
-                content_list.append(content_method(element))
-            else:
-                # If the tag isn't directly mapped in TAG_TYPES,
-                # check its children for content extraction
-                for child in element.children:
-                    content_list.append(self.extract_content(child))
+    @staticmethod
+    def _text(node, strip=True):
+        return node.get_text(strip=strip)
 
-        # Join the extracted content list into a single markdown string
-        return "\n\n".join(filter(None, content_list))
+    @staticmethod
+    def _attr(node, name):
+        return node.get(name, '')
 
     def _extract_text_content(self, element):
         """Extract content from a paragraph tag."""
-        return element.get_text(strip=True)
+        return self._text(element)
 
     def _extract_header_content(self, element):
         """Extract content from header tags (h1-h6) and convert to markdown format."""
-        return "#" * int(element.name[1]) + " " + element.get_text(strip=True)
+        return "#" * int(self._tag_name(element)[1]) + " " + self._text(element)
 
     def _extract_list_item_content(self, element):
         """Extract content from list item tags and convert to markdown format."""
-        return "* " + element.get_text(strip=True)
+        return "* " + self._text(element)
 
     def _extract_link_content(self, element):
         """Extract content from anchor tags, converting them to markdown links."""
-        text = element.get_text(strip=True)
-        href = element.get('href', '')
+        text = self._text(element)
+        href = self._attr(element, 'href')
         return f"[{text}]({href})"
 
     def _extract_code_content(self, element):
         """Extract content from inline code tags and convert to markdown format."""
-        return f"`{element.get_text(strip=True)}`"
+        return f"`{self._text(element)}`"
 
     def _extract_pre_content(self, element):
         """Extract content from code block tags and convert to markdown format."""
-        return f"```\n{element.get_text()}\n```"
+        return f"```\n{self._text(element, strip=False)}\n```"
+
+
+class SelectolaxContentParser(ContentParser):
+    """
+    ContentParser for selectolax (lexbor) trees.
+
+    Produces the same markdown as the Beautiful Soup parser. Script, style and
+    template contents must be stripped from the tree first, because lexbor counts
+    them as text while Beautiful Soup's get_text() does not.
+    """
+
+    @staticmethod
+    def _tag_name(node):
+        tag = node.tag
+        # lexbor names non-element nodes "-text", "-comment", "-doctype", ...
+        return None if tag[0] in "-_" else tag
+
+    @staticmethod
+    def _children(node):
+        return list(node.iter(include_text=False))
+
+    @staticmethod
+    def _text(node, strip=True):
+        return node.text(deep=True, separator='', strip=strip)
+
+    @staticmethod
+    def _attr(node, name):
+        return node.attributes.get(name) or ''
+
+
+# Parser backends accepted by the Scraper.PARSER setting
+PARSER_BACKENDS = ("html.parser", "lxml", "selectolax")
+
+_soup_content_parser = ContentParser()
+_selectolax_content_parser = SelectolaxContentParser()
+
+# Markup left in a title: lexbor keeps it as text, Beautiful Soup parses it into tags
+_TITLE_MARKUP = re.compile(r"<[^>]*>")
+
+
+def _clean_title(text):
+    """Normalizes a page title so every backend returns the same one: markup removed, whitespace collapsed."""
+    return " ".join(_TITLE_MARKUP.sub("", text).split())
+
+
+def _parse_with_soup(content, backend):
+    soup = BeautifulSoup(content, backend)
+    description = soup.find("meta", attrs={"name": "description"})
+    return {
+        "title": _clean_title(soup.title.get_text()) if soup.title else "",
+        "metadata": {
+            "description": description.get("content", "") if description else ""
+        },
+        "content": _soup_content_parser.extract_content(soup.body),
+        "links": [anchor["href"] for anchor in soup.find_all("a", href=True)]
+    }
+
+
+def _parse_with_selectolax(content):
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(content)
+    tree.strip_tags(["script", "style", "template"])
+    title = tree.css_first("title")
+    description = tree.css_first('meta[name="description"]')
+    return {
+        "title": _clean_title(title.text(deep=True)) if title else "",
+        "metadata": {
+            "description": (description.attributes.get("content") or "") if description else ""
+        },
+        "content": _selectolax_content_parser.extract_content(tree.body),
+        "links": [anchor.attributes.get("href") or "" for anchor in tree.css("a[href]")]
+    }
+
+
+def parse_html(content, backend="html.parser"):
+    """
+    Parse an HTML page into its title, description, markdown content and links.
+
+    Args:
+        content (str): The HTML to parse.
+        backend (str): One of PARSER_BACKENDS. lxml and selectolax are much faster
+                       than the pure-Python html.parser on large pages.
+
+    Returns:
+        dict: The parsed data.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    if backend == "selectolax":
+        return _parse_with_selectolax(content)
+    elif backend in ("html.parser", "lxml"):
+        return _parse_with_soup(content, backend)
+    else:
+        raise ValueError(f"Unsupported parser backend: {backend}")
+
+
+# WebScraper Fetch Result
+@dataclass
+class FetchResult:
+    """Outcome of fetching a page.
+
+    Attributes:
+        content (str): The page HTML, from the network or from the response cache.
+        unchanged (bool): True when the page is known not to have changed since the
+                          last fetch (fresh cache entry, 304 response or identical body).
+        etag (str): The ETag of a changed page, cached once the page is saved.
+        last_modified (str): The Last-Modified date of a changed page, cached once the page is saved.
+        final_url (str): The URL the page was served from after redirects, which its relative
+                         links resolve against; None when the page came from the response cache.
+    """
+    content: str
+    unchanged: bool = False
+    etag: str = None
+    last_modified: str = None
+    final_url: str = None
 
 
 # WebScraper Class
@@ -204,7 +356,14 @@ class WebScraper(Scraper, metaclass=SingletonMeta):
         self.logger = logging.getLogger(__name__)
         self.content_parser = ContentParser()
         self.CONFIG = load_config()
+        self.parser_backend = self.CONFIG["Scraper"].get("PARSER", "html.parser")
+        if self.parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unsupported parser backend: {self.parser_backend}")
         self.setup_data_directory()
+        self.http_cache = HttpCache(
+            self.CONFIG["Scraper"]["CACHE_DIR"],
+            ttl_seconds=self.CONFIG["Scraper"].get("CACHE_TTL_SECONDS", 3600)
+        )
 
     def setup_data_directory(self):
         """Sets up the data directory for saving scraped content."""
@@ -239,39 +398,88 @@ class WebScraper(Scraper, metaclass=SingletonMeta):
         Returns:
             str: Fetched content if successful, otherwise None.
         """
+        result = self.fetch_page(url)
+        return result.content if result else None
+
+    def fetch_page(self, url):
+        """Fetches a page through the response cache, using conditional requests when possible.
+
+        A fresh cache entry is returned without any request. Otherwise the stored
+        ETag/Last-Modified are sent as If-None-Match/If-Modified-Since, and a 304
+        response is answered from the cache.
+
+        Args:
+            url (str): The URL to fetch content from.
+
+        Returns:
+            FetchResult: The content and whether it is unchanged, or None on failure.
+        """
+        entry = self.http_cache.get(url)
+        if entry and self.http_cache.is_fresh(entry):
+            self.logger.info(f"Using cached response for {url}")
+            return FetchResult(self.http_cache.read_body(url), unchanged=True)
+
         self.logger.info(f"Attempting to fetch content from {url}")
-        headers = {"User-Agent": self.get_random_user_agent()}
+        headers = {"User-Agent": self.get_random_user_agent(), **self.http_cache.conditional_headers(entry)}
         try:
             response = requests.get(url, headers=headers, timeout=10)
-            if 200 <= response.status_code < 300:
-                return response.text
-            else:
-                self.logger.warning(f"Received a non-2xx status code ({response.status_code}) from {url}")
-                return None
         except RequestException as e:
             self.logger.error(f"Error fetching content from {url}: {e}")
             return None
+        return self.handle_response(url, entry, response.status_code, response.headers, response.text)
+
+    def handle_response(self, url, entry, status_code, headers, text):
+        """Turns an HTTP response into a FetchResult and updates the response cache.
+
+        Shared by the synchronous fetch and the async crawler. A changed page is not
+        cached here: the caller caches it with commit_response once it is saved, so a
+        page whose parsing or saving failed is downloaded and saved again next time.
+
+        Args:
+            url (str): The fetched URL.
+            entry (dict): The cache record the request was made with, if any.
+            status_code (int): The response status code.
+            headers (Mapping): The response headers.
+            text (str): The response body.
+
+        Returns:
+            FetchResult: The content and whether it is unchanged, or None on failure.
+        """
+        if status_code == 304 and entry:
+            self.logger.info(f"{url} not modified since the last fetch.")
+            self.http_cache.touch(url)
+            return FetchResult(self.http_cache.read_body(url), unchanged=True)
+
+        if 200 <= status_code < 300:
+            if self.http_cache.has_changed(url, text):
+                return FetchResult(text, etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"))
+            self.http_cache.store(url, text, headers.get("ETag"), headers.get("Last-Modified"))
+            return FetchResult(text, unchanged=True)
+
+        self.logger.warning(f"Received a non-2xx status code ({status_code}) from {url}")
+        return None
+
+    def commit_response(self, url, result, links=None):
+        """Caches a changed page once it has been saved.
+
+        Args:
+            url (str): The fetched URL.
+            result (FetchResult): The result of fetching the page.
+            links (list): The links found on the page, if known.
+        """
+        self.http_cache.store(url, result.content, result.etag, result.last_modified, links)
 
     def parse_content(self, content):
-        """Parses the fetched content using BeautifulSoup and extracts the meaningful data.
+        """Parses the fetched content with the configured parser backend and extracts the meaningful data.
 
         Args:
             content (str): The fetched web content.
 
         Returns:
-            dict: A dictionary containing the parsed data.
+            dict: A dictionary containing the parsed data, including the raw hrefs of the page links.
         """
-        self.logger.info("Parsing the content.")
-        soup = BeautifulSoup(content, 'html.parser')
-
-        parsed_data = {
-            "title": soup.title.string if soup.title else "",
-            "metadata": {
-                "description": soup.find("meta", attrs={"name": "description"})["content"] if soup.find("meta", attrs={"name": "description"}) else ""
-            },
-            "content": self.content_parser.extract_content(soup.body)  # Use ContentParser to extract content
-        }
-
+        self.logger.info(f"Parsing the content with {self.parser_backend}.")
+        parsed_data = parse_html(content, self.parser_backend)
         self.logger.info("Content parsed successfully.")
         return parsed_data
 
@@ -288,12 +496,18 @@ class WebScraper(Scraper, metaclass=SingletonMeta):
         url_hash = hashlib.md5(url.encode()).hexdigest()
         return os.path.join(load_config()["Scraper"]["DATA_DIR"], f"{url_hash}.md")
 
-    def save_to_file(self, url, content):
-        """Saves the parsed content to a file.
+    def save_to_file(self, url, content, title="", description=""):
+        """Saves the parsed content to a file, and the page metadata to its sidecar file.
+
+        The sidecar (<hash>.meta.json) holds the URL, domain, title, description and
+        fetch time of the page; the document loader stores them in the payload of
+        the page chunks, so searches can be filtered by site, section and age.
 
         Args:
             url (str): The URL used to generate the filename.
             content (str): The parsed content to save.
+            title (str): The page title.
+            description (str): The page meta description.
 
         Returns:
             str: The filepath where content was saved if successful, otherwise None.
@@ -303,6 +517,7 @@ class WebScraper(Scraper, metaclass=SingletonMeta):
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
+            write_sidecar(filepath, build_page_metadata(url, title, description))
             self.logger.info(f"Content saved successfully to {filepath}.")
         except Exception as e:
             self.logger.error(f"Error saving content to {filepath}: {e}")
@@ -324,18 +539,24 @@ class WebScraper(Scraper, metaclass=SingletonMeta):
             self.logger.error("Provided URL is invalid.")
             return {"message": "Invalid URL", "data": ""}
 
-        content = self.fetch_content(url)
-        if not content:
+        result = self.fetch_page(url)
+        if not result or not result.content:
             self.logger.error("Failed to fetch content from URL.")
             return {"message": "Failed to fetch content from URL", "data": ""}
 
-        parsed_data = self.parse_content(content)
+        # An unchanged page was already saved (and possibly ingested); skip re-parsing it.
+        if result.unchanged:
+            self.logger.info("Content unchanged since the last scrape.")
+            return {"message": "Content unchanged since last scrape", "data": ""}
+
+        parsed_data = self.parse_content(result.content)
         parsed_content = parsed_data["content"]
 
-        filepath = self.save_to_file(url, parsed_content)
+        filepath = self.save_to_file(url, parsed_content, parsed_data["title"], parsed_data["metadata"]["description"])
         if not filepath:
             self.logger.error("Failed to save content.")
             return {"message": "Failed to save content", "data": ""}
+        self.commit_response(url, result, parsed_data["links"])
 
         self.logger.info("Scraping completed successfully.")
         return {"message": "Scraping completed successfully", "data": filepath}
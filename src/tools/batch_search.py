@@ -0,0 +1,93 @@
+# /app/src/tools/batch_search.py
+import asyncio
+import logging
+
+from qdrant_client.http import models as rest
+
+from src.loader.collection_profiles import get_collection_profile
+from src.tools.doc_search import node_to_chunk, point_to_node
+from src.utils.resources import get_resource_registry
+
+logger = logging.getLogger(__name__)
+
+
+class BatchDocumentSearch:
+    """
+    Retrieval of the top chunks for many queries at once, without LLM synthesis.
+
+    All queries are embedded through the query embedding cache, with the misses
+    embedded together in batched model calls. The searches are then sent to Qdrant
+    as `search_batch` requests of `batch_search_size` queries each, with at most
+    `Search.batch_max_concurrency` of them in flight over the async client across the
+    process, through the semaphore of the resource registry. When a request fails,
+    its queries are retried one by one, so an error only affects the queries it
+    belongs to.
+
+    Attributes:
+    - collection (str): Name of the collection to be queried.
+    - top_k (int): Number of chunks returned per query.
+    - CONFIG (dict): Loaded configuration settings.
+    """
+
+    def __init__(self, collection: str, top_k: int = 5):
+        self.collection = collection
+        self.top_k = top_k
+        self.resources = get_resource_registry()
+        self.CONFIG = self.resources.CONFIG
+        search_config = self.CONFIG.get("Search", {})
+        self.max_queries = search_config.get("batch_max_queries", 1000)
+        self.embed_batch_size = search_config.get("batch_embed_size", 256)
+        self.search_batch_size = search_config.get("batch_search_size", 64)
+        self.search_params = get_collection_profile(self.CONFIG, collection).search_params()
+
+    async def _search_batch(self, vectors: list) -> list:
+        requests = [rest.SearchRequest(vector=vector, limit=self.top_k, params=self.search_params, with_payload=True) for vector in vectors]
+        async with self.resources.search_semaphore():
+            return await self.resources.aclient.search_batch(collection_name=self.collection, requests=requests)
+
+    async def _search_isolated(self, vectors: list) -> list:
+        # Returns the points of every query, or the exception that query failed with
+        try:
+            return await self._search_batch(vectors)
+        except Exception as e:
+            if len(vectors) == 1:
+                return [e]
+            logger.warning(f"Batch search request of {len(vectors)} queries failed, retrying them one by one: {e}")
+        singles = await asyncio.gather(*(self._search_isolated([vector]) for vector in vectors))
+        return [points for single in singles for points in single]
+
+    async def search(self, queries: list) -> tuple:
+        """
+        Retrieves the top chunks of every query.
+
+        Args:
+            queries (list): The query texts.
+
+        Returns:
+            tuple: For each query, in order, its chunks ranked by score; and the error
+            message of every query that failed, by query index. A failed query has no chunks.
+
+        Raises:
+            ValueError: If more queries than `Search.batch_max_queries` are given.
+        """
+        if len(queries) > self.max_queries:
+            raise ValueError(f"A batch holds at most {self.max_queries} queries, got {len(queries)}")
+        if not queries:
+            return [], {}
+
+        vectors = await self.resources.aget_query_embeddings(queries, self.embed_batch_size)
+        batches = [vectors[start:start + self.search_batch_size]
+                   for start in range(0, len(vectors), self.search_batch_size)]
+        hits = await asyncio.gather(*(self._search_isolated(batch) for batch in batches))
+
+        results, errors = [], {}
+        for index, points in enumerate(points for batch in hits for points in batch):
+            if isinstance(points, Exception):
+                errors[index] = str(points)
+                results.append([])
+            else:
+                results.append([node_to_chunk(point_to_node(point)) for point in points])
+        if errors:
+            logger.error(f"Batch search in '{self.collection}': {len(errors)} of {len(queries)} queries failed.")
+        logger.info(f"Batch search of {len(queries)} queries in '{self.collection}' over {len(batches)} requests.")
+        return results, errors
@@ -1,80 +1,278 @@
 # /app/src/tools/doc_search.py
+import asyncio
 import logging
+from datetime import datetime
 
 # Primary Components
-from llama_index import ServiceContext, VectorStoreIndex
-from llama_index.vector_stores.qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
+from llama_index import get_response_synthesizer
+from llama_index.schema import NodeWithScore
+from llama_index.vector_stores.utils import metadata_dict_to_node
+from qdrant_client.http import models as rest
 
-from src.utils.config import load_config, setup_environment_variables
-from src.utils.embedding_selector import EmbeddingConfig, EmbeddingSelector
+from src.loader.collection_profiles import get_collection_profile
+from src.loader.lexical_index import get_lexical_index
+from src.tools.reranker import get_reranker
+from src.utils.page_metadata import build_search_filter
+from src.utils.resources import get_resource_registry
 
 logger = logging.getLogger(__name__)
 
 
+def point_to_node(point) -> NodeWithScore:
+    """Rebuilds the llama_index node stored in a scored Qdrant point."""
+    return NodeWithScore(node=metadata_dict_to_node(point.payload), score=point.score)
+
+
+def node_to_chunk(node_with_score: NodeWithScore) -> dict:
+    """
+    Converts a retrieved node into a plain chunk.
+
+    Args:
+        node_with_score (NodeWithScore): A retrieved node and its score.
+
+    Returns:
+        dict: The chunk text, its score, its point id and the page URL or document it comes from.
+    """
+    node = node_with_score.node
+    return {
+        "text": node.get_content(),
+        "score": node_with_score.score,
+        "chunk_id": node.node_id,
+        "source": node.metadata.get("url") or node.metadata.get("file_name") or node.ref_doc_id,
+    }
+
+
+def rrf_fuse(rankings: list, k: int = 60) -> list:
+    """
+    Fuses ranked lists of ids by reciprocal rank fusion.
+
+    Each list adds 1 / (k + rank) to the score of every id it ranks, so ids ranked
+    well by several retrievers come first, without having to calibrate their scores
+    against each other.
+
+    Args:
+        rankings (list): Lists of ids, best first.
+        k (int): Damping constant; larger values flatten the weight of the top ranks.
+
+    Returns:
+        list: (id, fused score) pairs, best first.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def format_chunks(chunks: list) -> str:
+    """Renders retrieved chunks as a numbered, source-annotated text for the agent."""
+    if not chunks:
+        return "No relevant documents were found."
+    return "\n\n".join(
+        f"[{i}] (source: {chunk['source']}, score: {chunk['score']:.3f})\n{chunk['text']}"
+        for i, chunk in enumerate(chunks, start=1)
+    )
+
+
 class DocumentSearch:
     """
     Class to perform document searches using a vector store index.
 
+    A search first retrieves the top chunks straight from Qdrant. In retrieve mode
+    they are returned as they are; in synthesize mode the LLM writes an answer from
+    them.
+
+    In hybrid mode the dense candidates are fused by reciprocal rank fusion with the
+    BM25 candidates of the lexical index, so chunks quoting the exact identifiers of
+    the query are found even when their embedding is not the closest. Scores are then
+    fused scores, and the score threshold only filters the dense candidates.
+
+    Searches can be restricted to a domain, a URL prefix or pages fetched after a
+    date, with a filter on the indexed page metadata of the payload.
+
+    When reranking is enabled, `Rerank.candidates` chunks are retrieved and a
+    cross-encoder keeps the best `top_k` of them, scored by its own relevance score.
+
     Attributes:
     - collection (str): Name of the collection to be queried.
     - query (str): User input query for searching documents.
+    - top_k (int): Number of chunks retrieved.
+    - score_threshold (float): Minimum similarity of a retrieved chunk, or None.
+    - hybrid (bool): Whether dense results are fused with BM25 results.
+    - candidates (int): Number of candidates taken from each retriever in hybrid mode.
+    - rrf_k (int): Damping constant of the reciprocal rank fusion.
+    - reranker (CrossEncoderReranker): The rerank stage, or None when disabled.
+    - fetch_k (int): Number of chunks retrieved before reranking.
+    - search_filter (Filter): Qdrant filter on the page metadata, or None.
     - CONFIG (dict): Loaded configuration settings.
-    - client (QdrantClient): Client to interact with the Qdrant service.
+    - client (QdrantClient): Shared client to interact with the Qdrant service.
+    - embed_model: Shared embedding model used to embed the query.
     """
 
-    def __init__(self, query: str, collection: str):
+    def __init__(self, query: str, collection: str, top_k: int = None, score_threshold: float = None,
+                 hybrid: bool = None, rerank: bool = None, domain: str = None, url_prefix: str = None,
+                 fetched_after: datetime = None):
         """
         Initializes with collection name and user input.
 
         Parameters:
         - collection (str): Name of the collection to be queried.
         - query (str): User input query for searching documents.
+        - top_k (int): Number of chunks retrieved; defaults to `Search.top_k`.
+        - score_threshold (float): Minimum similarity of a chunk; defaults to `Search.score_threshold`.
+        - hybrid (bool): Whether to fuse dense and BM25 results; defaults to `Search.hybrid`.
+        - rerank (bool): Whether to rerank the results with the cross-encoder; defaults to `Rerank.enabled`.
+        - domain (str): Only search pages of this host.
+        - url_prefix (str): Only search pages under this URL.
+        - fetched_after (datetime): Only search pages fetched at or after this time.
         """
         self.collection = collection
         self.query = query
-        self.CONFIG = load_config()
-        setup_environment_variables(self.CONFIG)
-        self.client = QdrantClient(url="http://RAG_BOT_QDRANT:6333")
-        # self.embed_model = OpenAIEmbedding()
-        # self.embed_model = HuggingFaceEmbedding(model_name="sentence-transformers/multi-qa-mpnet-base-dot-v1")
-        self.embedding_config = EmbeddingConfig(type=self.CONFIG["Embedding_Type"])
-        self.embed_model = EmbeddingSelector(self.embedding_config).get_embedding_model()
-
-    def setup_index(self) -> VectorStoreIndex:
+        self.resources = get_resource_registry()
+        self.CONFIG = self.resources.CONFIG
+        self.client = self.resources.client
+        self.embed_model = self.resources.embed_model
+        search_config = self.CONFIG.get("Search", {})
+        self.top_k = top_k or search_config.get("top_k", 4)
+        self.score_threshold = score_threshold if score_threshold is not None else search_config.get("score_threshold")
+        self.hybrid = hybrid if hybrid is not None else search_config.get("hybrid", False)
+        rerank = rerank if rerank is not None else self.CONFIG.get("Rerank", {}).get("enabled", False)
+        self.reranker = get_reranker() if rerank else None
+        self.fetch_k = max(self.top_k, self.reranker.candidates) if self.reranker else self.top_k
+        self.candidates = max(self.fetch_k, search_config.get("hybrid_candidates", 20))
+        self.search_filter = build_search_filter(domain, url_prefix, fetched_after)
+        self.rrf_k = search_config.get("rrf_k", 60)
+        self.search_params = get_collection_profile(self.CONFIG, collection).search_params()
+
+    def _search_kwargs(self, query_vector: list) -> dict:
+        return {
+            "collection_name": self.collection,
+            "query_vector": query_vector,
+            "limit": self.candidates if self.hybrid else self.fetch_k,
+            "score_threshold": self.score_threshold,
+            "query_filter": self.search_filter,
+            "search_params": self.search_params,
+            "with_payload": True,
+        }
+
+    def _scroll_kwargs(self, chunk_ids: list) -> dict:
+        """Fetches chunks found only by the lexical index, dropping those that do not match the search filter."""
+        conditions = [rest.HasIdCondition(has_id=chunk_ids)]
+        if self.search_filter is not None:
+            conditions.extend(self.search_filter.must)
+        return {
+            "collection_name": self.collection,
+            "scroll_filter": rest.Filter(must=conditions),
+            "limit": len(chunk_ids),
+            "with_payload": True,
+            "with_vectors": False,
+        }
+
+    def _fuse(self, dense_nodes: list, lexical_hits: list) -> tuple:
         """
-        Sets up and returns the vector store index for the collection.
+        Fuses the dense nodes and the lexical (chunk_id, score) hits.
 
         Returns:
-        - VectorStoreIndex: The set up vector store index.
+            tuple: The (chunk_id, fused score) pairs, the nodes already retrieved by
+                   chunk id, and the chunk ids found only by the lexical index.
+        """
+        nodes = {node.node.node_id: node.node for node in dense_nodes}
+        fused = rrf_fuse(
+            [[node.node.node_id for node in dense_nodes], [chunk_id for chunk_id, _ in lexical_hits]],
+            k=self.rrf_k
+        )
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in nodes]
+        return fused, nodes, missing
 
-        Raises:
-        - Exception: Propagates any exceptions that occur during the index setup.
+    def _fused_nodes(self, fused: list, nodes: dict, points: list) -> list:
+        for point in points:
+            node = metadata_dict_to_node(point.payload)
+            nodes[node.node_id] = node
+        # Chunks outside the filter, or still indexed lexically but deleted from Qdrant, are skipped.
+        return [NodeWithScore(node=nodes[chunk_id], score=score)
+                for chunk_id, score in fused if chunk_id in nodes][:self.fetch_k]
+
+    def _candidate_nodes(self) -> list:
+        points = self.client.search(**self._search_kwargs(self.resources.get_query_embedding(self.query)))
+        dense_nodes = [point_to_node(point) for point in points]
+        if not self.hybrid:
+            return dense_nodes
+
+        lexical_hits = get_lexical_index().search(self.collection, self.query, self.candidates)
+        fused, nodes, missing = self._fuse(dense_nodes, lexical_hits)
+        points = self.client.scroll(**self._scroll_kwargs(missing))[0] if missing else []
+        return self._fused_nodes(fused, nodes, points)
+
+    async def _acandidate_nodes(self) -> list:
+        query_vector = await self.resources.aget_query_embedding(self.query)
+        if not self.hybrid:
+            points = await self.resources.aclient.search(**self._search_kwargs(query_vector))
+            return [point_to_node(point) for point in points]
+
+        # The BM25 lookup runs on a thread while Qdrant answers the dense search.
+        points, lexical_hits = await asyncio.gather(
+            self.resources.aclient.search(**self._search_kwargs(query_vector)),
+            asyncio.to_thread(get_lexical_index().search, self.collection, self.query, self.candidates)
+        )
+        fused, nodes, missing = self._fuse([point_to_node(point) for point in points], lexical_hits)
+        points = (await self.resources.aclient.scroll(**self._scroll_kwargs(missing)))[0] if missing else []
+        return self._fused_nodes(fused, nodes, points)
+
+    def retrieve_nodes(self) -> list:
         """
-        try:
-            vector_store = QdrantVectorStore(client=self.client, collection_name=self.collection)
-            service_context = ServiceContext.from_defaults(embed_model=self.embed_model)
-            index = VectorStoreIndex.from_vector_store(vector_store=vector_store, service_context=service_context)
+        Retrieves the top chunks of the query with a direct Qdrant search, fused with
+        the BM25 results of the lexical index in hybrid mode and reranked by the
+        cross-encoder when reranking is enabled.
+
+        Returns:
+        - list: The retrieved NodeWithScore objects, best first.
+        """
+        nodes = self._candidate_nodes()
+        if self.reranker is None:
+            return nodes
+        return self.reranker.rerank(self.query, nodes, self.top_k)
 
-            return index
+    async def aretrieve_nodes(self) -> list:
+        """Async variant of retrieve_nodes, using the async Qdrant client and reranking on a worker thread."""
+        nodes = await self._acandidate_nodes()
+        if self.reranker is None:
+            return nodes
+        return await asyncio.to_thread(self.reranker.rerank, self.query, nodes, self.top_k)
+
+    def retrieve(self) -> list:
+        """
+        Retrieves the top chunks of the query without calling the LLM.
 
+        Returns:
+        - list: The chunks (text, score, chunk_id, source), best first.
+        """
+        try:
+            return [node_to_chunk(node) for node in self.retrieve_nodes()]
+        except Exception as e:
+            logging.error(f"retrieve: Error - {str(e)}")
+            raise e
+
+    async def aretrieve(self) -> list:
+        """Async variant of retrieve."""
+        try:
+            return [node_to_chunk(node) for node in await self.aretrieve_nodes()]
         except Exception as e:
-            logging.error(f"setup_index: Error - {str(e)}")
+            logging.error(f"aretrieve: Error - {str(e)}")
             raise e
 
     def search_documents(self):
         """
-        Searches and returns documents based on the user input query.
+        Searches documents and synthesizes an answer to the user input query from them.
 
         Returns:
-        - Any: The response received from querying the index.
+        - Any: The response synthesized from the retrieved chunks.
 
         Raises:
         - Exception: Propagates any exceptions that occur during the document search.
         """
         try:
-            query_engine = (self.setup_index()).as_query_engine()
-            response = query_engine.query(self.query)
+            synthesizer = get_response_synthesizer(service_context=self.resources.service_context)
+            response = synthesizer.synthesize(self.query, self.retrieve_nodes())
             logging.info(f"search_documents: Response - {response}")
 
             return response
@@ -82,3 +280,24 @@ class DocumentSearch:
         except Exception as e:
             logging.error(f"search_documents: Error - {str(e)}")
             raise e
+
+    async def asearch_documents(self):
+        """
+        Async variant of search_documents, querying Qdrant through the async client.
+
+        Returns:
+        - Any: The response synthesized from the retrieved chunks.
+
+        Raises:
+        - Exception: Propagates any exceptions that occur during the document search.
+        """
+        try:
+            synthesizer = get_response_synthesizer(service_context=self.resources.service_context)
+            response = await synthesizer.asynthesize(self.query, await self.aretrieve_nodes())
+            logging.info(f"asearch_documents: Response - {response}")
+
+            return response
+
+        except Exception as e:
+            logging.error(f"asearch_documents: Error - {str(e)}")
+            raise e
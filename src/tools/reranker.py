@@ -0,0 +1,168 @@
+# /app/src/tools/reranker.py
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+from llama_index.schema import NodeWithScore
+
+from src.utils.embedding_cache import QueryEmbeddingCache
+from src.utils.resources import get_resource_registry
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the reranker instance shared by every search
+_reranker_instance = None
+_reranker_lock = threading.Lock()
+
+# Number of recent rerank latencies kept for the percentiles of the stats
+LATENCY_WINDOW = 1000
+
+
+class CrossEncoderReranker:
+    """
+    Rerank stage between retrieval and the LLM.
+
+    Vector search ranks chunks by the similarity of two independently computed
+    embeddings; a cross-encoder reads the query and each chunk together and scores
+    their relevance much more precisely. Searches therefore over-fetch candidates and
+    keep only the best few after reranking, so fewer, better chunks reach the prompt.
+
+    The model is a small cross-encoder run on the CPU, loaded on first use. Pairs are
+    scored in batches, and the scores of (query, chunk text) pairs are kept in an LRU
+    cache, so repeated and overlapping searches skip the model. Every call is timed
+    and the latencies are exposed by stats() to tune the number of candidates.
+
+    Attributes:
+    - model_name (str): sentence-transformers cross-encoder model.
+    - candidates (int): Number of chunks retrieved before reranking.
+    - batch_size (int): Pairs per model call.
+    - max_length (int): Token limit of a (query, chunk) pair; longer chunks are truncated.
+    - cache_size (int): Capacity of the score cache.
+    """
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", candidates: int = 20,
+                 batch_size: int = 32, max_length: int = 512, cache_size: int = 10000):
+        self.model_name = model_name
+        self.candidates = candidates
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._predict_lock = threading.Lock()
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CrossEncoderReranker":
+        """Builds the reranker from the `Rerank` section of config.yml."""
+        rerank_config = config.get("Rerank", {})
+        return cls(
+            model_name=rerank_config.get("model", "cross-encoder/ms-marco-MiniLM-L-6-v2"),
+            candidates=rerank_config.get("candidates", 20),
+            batch_size=rerank_config.get("batch_size", 32),
+            max_length=rerank_config.get("max_length", 512),
+            cache_size=rerank_config.get("cache_size", 10000),
+        )
+
+    @property
+    def model(self):
+        """The cross-encoder, loaded on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+                    logger.info(f"Loaded cross-encoder {self.model_name}.")
+        return self._model
+
+    @staticmethod
+    def _key(query: str, text: str) -> tuple:
+        return QueryEmbeddingCache.normalize(query), hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _score(self, query: str, texts: list) -> list:
+        """Scores (query, text) pairs, calling the model only for the pairs not in the cache."""
+        keys = [self._key(query, text) for text in texts]
+        scores = {}
+        with self._lock:
+            for key in keys:
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[key] = self._scores[key]
+            self.cache_hits += len(scores)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in scores}
+        if missing:
+            # One model call at a time: the model already uses every core for a batch.
+            with self._predict_lock:
+                predicted = self.model.predict([(query, text) for text in missing.values()],
+                                               batch_size=self.batch_size, show_progress_bar=False)
+            with self._lock:
+                for key, score in zip(missing, predicted):
+                    scores[key] = self._scores[key] = float(score)
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+                self.pairs_scored += len(missing)
+        return [scores[key] for key in keys]
+
+    def rerank(self, query: str, nodes: list, top_n: int) -> list:
+        """
+        Reorders retrieved nodes by cross-encoder relevance.
+
+        Args:
+            query (str): The search query.
+            nodes (list): The retrieved NodeWithScore candidates.
+            top_n (int): Number of nodes kept.
+
+        Returns:
+            list: The top_n nodes, best first, scored by the cross-encoder.
+        """
+        if not nodes:
+            return []
+        start = time.perf_counter()
+        scores = self._score(query, [node.node.get_content() for node in nodes])
+        ranked = sorted(zip(nodes, scores), key=lambda item: item[1], reverse=True)[:top_n]
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(elapsed)
+        logger.info(f"Reranked {len(nodes)} candidates in {elapsed * 1000:.1f} ms.")
+        return [NodeWithScore(node=node.node, score=score) for node, score in ranked]
+
+    def stats(self) -> dict:
+        """Returns the call and cache counters and the latency of recent calls."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            cached = len(self._scores)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000 if latencies else 0.0
+
+        return {
+            "model": self.model_name,
+            "candidates": self.candidates,
+            "calls": self.calls,
+            "pairs_scored": self.pairs_scored,
+            "cache_hits": self.cache_hits,
+            "cached_scores": cached,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+def get_reranker() -> CrossEncoderReranker:
+    # Singleton-like accessor for the CrossEncoderReranker instance; the model itself loads on first use
+    global _reranker_instance
+    if _reranker_instance is None:
+        with _reranker_lock:
+            if _reranker_instance is None:
+                _reranker_instance = CrossEncoderReranker.from_config(get_resource_registry().CONFIG)
+    return _reranker_instance
@@ -1,11 +1,14 @@
 # /app/src/tools/setup.py
 import logging
+from datetime import datetime
+from typing import Optional, Type
 
 from langchain.pydantic_v1 import BaseModel, Field
 from langchain.tools import BaseTool
 from langchain_community.tools import DuckDuckGoSearchResults
 
-from src.tools.doc_search import DocumentSearch
+from src.tools.doc_search import DocumentSearch, format_chunks
+from src.utils.config import load_config
 
 logger = logging.getLogger(__name__)
 
@@ -17,30 +20,49 @@ class SearchWebInput(BaseModel):
 class SearchTechDocsInput(BaseModel):
     query: str = Field(description="The search query")
     collection: str = Field(default="techdocs", description="The document collection to search in")
+    domain: Optional[str] = Field(default=None, description="Only search pages of this website host, e.g. 'docs.python.org'")
+    url_prefix: Optional[str] = Field(default=None, description="Only search pages under this URL, e.g. 'https://docs.python.org/3/library'")
+    fetched_after: Optional[datetime] = Field(default=None, description="Only search pages scraped on or after this ISO date, in UTC")
 
 
 class SearchWebTool(BaseTool):
     name = "search_web"
     description = "Conducts DuckDuckGo searches."
-    args_schema = SearchWebInput
+    args_schema: Type[BaseModel] = SearchWebInput
     return_direct = True
 
     def _run(self, query: str, **kwargs) -> str:
         search = DuckDuckGoSearchResults()
         return search.run(query)
 
+    async def _arun(self, query: str, **kwargs) -> str:
+        search = DuckDuckGoSearchResults()
+        return await search.arun(query)
+
 
 class SearchTechDocsTool(BaseTool):
     name = "search_techdocs"
     description = "This tool enables the querying of a specialized vector store named ‘TechDocs,’ a repository where users archive valuable technical documentation they have encountered. It is particularly beneficial when engaging with technical subjects or when involved in coding activities. Utilize this search tool to scrutinize the vector store for pertinent context when addressing technical inquiries or tasks. If a term from the user input is unfamiliar but appears to be technical in nature, it is imperative to consult ‘TechDocs’ to ascertain whether relevant information or context is available therein. For your awareness, the information provided is sourced from ‘TechDocs,’ and we will refer to this source for any related queries."
-    args_schema = SearchTechDocsInput
+    args_schema: Type[BaseModel] = SearchTechDocsInput
     return_direct = True
+    mode: str = "synthesize"
 
-    def _run(self, query: str, collection: str = "techdocs", **kwargs) -> str:
-        search = DocumentSearch(query, collection)
+    def _run(self, query: str, collection: str = "techdocs", domain: str = None, url_prefix: str = None,
+             fetched_after: datetime = None, **kwargs) -> str:
+        search = DocumentSearch(query, collection, domain=domain, url_prefix=url_prefix, fetched_after=fetched_after)
+        if self.mode == "retrieve":
+            return format_chunks(search.retrieve())
         results = search.search_documents()
         return results
 
+    async def _arun(self, query: str, collection: str = "techdocs", domain: str = None, url_prefix: str = None,
+                    fetched_after: datetime = None, **kwargs) -> str:
+        search = DocumentSearch(query, collection, domain=domain, url_prefix=url_prefix, fetched_after=fetched_after)
+        if self.mode == "retrieve":
+            return format_chunks(await search.aretrieve())
+        results = await search.asearch_documents()
+        return results
+
 
 class ToolSetup:
     """
@@ -51,7 +73,13 @@ class ToolSetup:
     def setup_tools(cls) -> list:
         """
         Initializes and returns a list of tools for the agent.
+
+        In the 'retrieve' mode of `Search.tool_mode`, the TechDocs tool hands the raw
+        chunks back to the agent, which writes the answer itself, saving the LLM call
+        that would synthesize one inside the tool.
         Returns:
         - list: A list of initialized tools for agent's use.
         """
-        return [SearchWebTool(), SearchTechDocsTool()]
+        mode = load_config().get("Search", {}).get("tool_mode", "synthesize")
+        techdocs_tool = SearchTechDocsTool(mode=mode, return_direct=(mode == "synthesize"))
+        return [SearchWebTool(), techdocs_tool]
@@ -1,25 +1,56 @@
 # /app/src/ui/gradio_interface.py
+import json
+import uuid
+
 import gradio as gr
 import requests
 
-FASTAPI_URL = "http://fastapi:8000/chat/"  # This is the URL of your FastAPI service inside the Docker network
+FASTAPI_URL = "http://fastapi:8000/chat/stream/"  # This is the URL of your FastAPI service inside the Docker network
+
+
+def iter_sse_events(response: requests.Response):
+    """Yields the JSON payload of every server-sent event of a streaming response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith("data:"):
+            yield json.loads(line[len("data:"):].strip())
+
 
+def chat_with_bot(user_input: str, session_id: str):
+    """Function to interface with Gradio that chats with the agent through the FastAPI service.
 
-def chat_with_bot(user_input: str) -> str:
-    """Function to interface with Gradio that chats with the agent through the FastAPI service."""
-    response = requests.post(FASTAPI_URL, json={"user_input": user_input})
+    Each browser session gets its own session id, so the agent remembers the
+    conversation. Yields the text rendered so far (the agent's tool calls, then
+    the final answer as its tokens arrive) together with the session id.
+    """
+    session_id = session_id or uuid.uuid4().hex
+    steps = []
+    answer = ""
+    try:
+        payload = {"user_input": user_input, "session_id": session_id}
+        with requests.post(FASTAPI_URL, json=payload, stream=True) as response:
+            if response.status_code != 200:
+                yield "Error communicating with the agent.", session_id
+                return
 
-    if response.status_code == 200:
-        return response.json()["response"]
-    else:
-        return "Error communicating with the agent."
+            for event in iter_sse_events(response):
+                if event["type"] == "action":
+                    steps.append(f"Searching with {event['tool']}: {event['tool_input']}")
+                elif event["type"] == "token":
+                    answer += event["text"]
+                elif event["type"] in ("final", "error"):
+                    answer = event["response"]
+                else:
+                    continue
+                yield ("\n".join(steps + ["", answer]).strip() if steps else answer), session_id
+    except requests.RequestException:
+        yield "Error communicating with the agent.", session_id
 
 
 # Gradio Interface
 iface = gr.Interface(
     fn=chat_with_bot,
-    inputs="text",
-    outputs="text"
+    inputs=["text", "state"],
+    outputs=["text", "state"]
 )
 
 # If this script is run directly, launch the Gradio app
@@ -0,0 +1,261 @@
+# /app/src/utils/embedding_cache.py
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Queries looked up per SQLite statement, within its limit on bound parameters
+SQLITE_BATCH = 500
+
+
+class QueryEmbeddingCache:
+    """
+    Cache of query embeddings keyed by (embedding model id, normalised query text).
+
+    Lookups go through a bounded in-memory LRU first, then through a shared state
+    backend (e.g. Redis) when one is given, and, when a path is configured, through
+    a SQLite table that survives restarts. Misses are embedded with the model and
+    written to every tier.
+
+    Attributes:
+    - max_entries (int): Capacity of the in-memory LRU.
+    - persist_path (str): SQLite file of the persistent tier, or None to disable it.
+    - backend (StateBackend): Shared tier seen by every API worker, or None.
+    - backend_ttl (int): Lifetime of the entries of the shared tier, in seconds.
+    - hits (int): Lookups answered from memory.
+    - persistent_hits (int): Lookups answered from the shared or persistent tier.
+    - misses (int): Lookups that required an embedding call.
+    """
+
+    def __init__(self, max_entries: int = 4096, persist_path: str = None, backend=None,
+                 backend_ttl: int = 604800):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.backend = backend
+        self.backend_ttl = backend_ttl
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Guards the in-memory tier and the counters only; backend and SQLite I/O run outside it.
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        if persist_path:
+            self._create_table()
+
+    def _create_table(self):
+        directory = os.path.dirname(self.persist_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings ("
+            "model TEXT NOT NULL, query TEXT NOT NULL, embedding BLOB NOT NULL, "
+            "PRIMARY KEY (model, query))"
+        )
+        db.commit()
+
+    def _db(self):
+        """Returns the SQLite connection of the calling thread, so threads read the persistent tier concurrently."""
+        if not self.persist_path:
+            return None
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.persist_path, check_same_thread=False, timeout=30)
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Collapses runs of whitespace so trivially different spellings share an entry."""
+        return " ".join(query.split())
+
+    @staticmethod
+    def model_id(embed_model) -> str:
+        """
+        Identifies the embedding model, so vectors of different models never mix.
+
+        ONNX models also carry their precision and export directory: the int8 and
+        float32 variants of one model give slightly different vectors.
+        """
+        model_id = f"{type(embed_model).__name__}:{embed_model.model_name}"
+        quantize = getattr(embed_model, "quantize", None)
+        if quantize is not None:
+            model_id += f":{'int8' if quantize else 'float32'}:{embed_model.export_dir}"
+        return model_id
+
+    @staticmethod
+    def _backend_key(key: tuple) -> str:
+        return "query_embedding:" + hashlib.sha256("\n".join(key).encode("utf-8")).hexdigest()
+
+    def get(self, model_id: str, query: str):
+        """Returns the cached embedding of a normalised query, or None."""
+        return self.get_many(model_id, [query])[0]
+
+    def get_many(self, model_id: str, queries: list) -> list:
+        """
+        Returns the cached embeddings of normalised queries, None for each miss.
+
+        The in-memory tier is read first; the queries it misses are then looked up
+        with one MGET in the shared tier and one query in the persistent tier.
+        """
+        found = {}
+        with self._lock:
+            for query in queries:
+                key = (model_id, query)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[query] = self._entries[key]
+            self.hits += sum(query in found for query in queries)
+
+        missing = list(dict.fromkeys(query for query in queries if query not in found))
+        loaded = {}
+        if missing and self.backend is not None:
+            raws = self.backend.mget([self._backend_key((model_id, query)) for query in missing])
+            loaded.update({query: array("d", raw).tolist() for query, raw in zip(missing, raws) if raw is not None})
+            missing = [query for query in missing if query not in loaded]
+
+        db = self._db()
+        if missing and db is not None:
+            for start in range(0, len(missing), SQLITE_BATCH):
+                batch = missing[start:start + SQLITE_BATCH]
+                rows = db.execute(
+                    "SELECT query, embedding FROM query_embeddings WHERE model = ? AND query IN "
+                    f"({', '.join('?' * len(batch))})", [model_id, *batch]
+                ).fetchall()
+                loaded.update({query: array("d", blob).tolist() for query, blob in rows})
+
+        with self._lock:
+            for query, embedding in loaded.items():
+                self._remember((model_id, query), embedding)
+            self.persistent_hits += sum(query in loaded for query in queries)
+            self.misses += sum(query not in found and query not in loaded for query in queries)
+        found.update(loaded)
+        return [found.get(query) for query in queries]
+
+    def put(self, model_id: str, query: str, embedding: list):
+        """Stores the embedding of a normalised query in every tier."""
+        self.put_many(model_id, [(query, embedding)])
+
+    def put_many(self, model_id: str, items: list):
+        """Stores (normalised query, embedding) pairs in every tier, in one round trip per tier."""
+        if not items:
+            return
+        with self._lock:
+            for query, embedding in items:
+                self._remember((model_id, query), embedding)
+        blobs = [(query, array("d", embedding).tobytes()) for query, embedding in items]
+        if self.backend is not None:
+            self.backend.set_many({self._backend_key((model_id, query)): blob for query, blob in blobs},
+                                  ttl=self.backend_ttl)
+        db = self._db()
+        if db is not None:
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO query_embeddings (model, query, embedding) VALUES (?, ?, ?)",
+                    [(model_id, query, blob) for query, blob in blobs]
+                )
+
+    def _remember(self, key: tuple, embedding: list):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_query_embedding(self, embed_model, query: str) -> list:
+        """
+        Returns the embedding of a query, calling the model only on a cache miss.
+
+        Args:
+            embed_model: The llama_index embedding model.
+            query (str): The raw query text.
+
+        Returns:
+            list: The query embedding.
+        """
+        model_id = self.model_id(embed_model)
+        query = self.normalize(query)
+        embedding = self.get(model_id, query)
+        if embedding is None:
+            embedding = embed_model.get_query_embedding(query)
+            self.put(model_id, query, embedding)
+        return embedding
+
+    def get_query_embeddings(self, embed_model, queries: list, batch_size: int = 256) -> list:
+        """
+        Returns the embeddings of several queries, embedding all cache misses in batched model calls.
+
+        Args:
+            embed_model: The llama_index embedding model.
+            queries (list): The raw query texts.
+            batch_size (int): Maximum number of queries per model call.
+
+        Returns:
+            list: The query embeddings, in the order of the queries.
+        """
+        model_id = self.model_id(embed_model)
+        normalized = [self.normalize(query) for query in queries]
+        embeddings = self.get_many(model_id, normalized)
+
+        # Duplicate queries in a batch are embedded once.
+        misses = list(dict.fromkeys(query for query, embedding in zip(normalized, embeddings) if embedding is None))
+        computed = {}
+        for start in range(0, len(misses), batch_size):
+            batch = misses[start:start + batch_size]
+            batch_embeddings = list(zip(batch, self._embed_queries(embed_model, batch)))
+            self.put_many(model_id, batch_embeddings)
+            computed.update(batch_embeddings)
+
+        return [embedding if embedding is not None else computed[query]
+                for query, embedding in zip(normalized, embeddings)]
+
+    @staticmethod
+    def _embed_queries(embed_model, queries: list) -> list:
+        # Query embeddings only differ from text embeddings by the model's query
+        # instruction, so HuggingFace models get the formatted queries through their
+        # batch encoder and produce the same vectors as get_query_embedding.
+        if hasattr(embed_model, "query_instruction") and hasattr(embed_model, "_embed"):
+            from llama_index.embeddings.huggingface_utils import format_query
+
+            formatted = [format_query(query, embed_model.model_name, embed_model.query_instruction) for query in queries]
+            return embed_model._embed(formatted)
+        return embed_model._get_text_embeddings(queries)
+
+    async def aget_query_embedding(self, embed_model, query: str) -> list:
+        """Async variant of get_query_embedding; the cache tiers are read and written off the event loop."""
+        model_id = self.model_id(embed_model)
+        query = self.normalize(query)
+        embedding = await asyncio.to_thread(self.get, model_id, query)
+        if embedding is None:
+            embedding = await embed_model.aget_query_embedding(query)
+            await asyncio.to_thread(self.put, model_id, query, embedding)
+        return embedding
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters and the current size of the in-memory tier."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def close(self):
+        """Closes the connections of the persistent tier."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self.persist_path = None
+        for db in connections:
+            db.close()
@@ -10,6 +10,27 @@ CONFIG = load_config()
 class EmbeddingConfig(BaseModel):
     type: str
     huggingface_model: Optional[str] = "sentence-transformers/multi-qa-mpnet-base-dot-v1"
+    onnx_export_dir: Optional[str] = "/app/src/data/onnx/multi-qa-mpnet-base-dot-v1"
+    onnx_quantize: bool = True
+    onnx_threads: int = 0
+    onnx_bucket_size: int = 16
+    embed_batch_size: int = 64
+
+    @classmethod
+    def from_config(cls, config: dict) -> "EmbeddingConfig":
+        """
+        Builds the embedding settings from `Embedding_Type`, the `Onnx_Embedding` section and
+        `Loader.embed_batch_size` of config.yml; the model embeds the loader batches in one call.
+        """
+        onnx_config = config.get("Onnx_Embedding", {})
+        return cls(
+            type=config["Embedding_Type"],
+            onnx_export_dir=onnx_config.get("export_dir", "/app/src/data/onnx/multi-qa-mpnet-base-dot-v1"),
+            onnx_quantize=onnx_config.get("quantize", True),
+            onnx_threads=onnx_config.get("threads", 0),
+            onnx_bucket_size=onnx_config.get("bucket_size", 16),
+            embed_batch_size=config.get("Loader", {}).get("embed_batch_size", 64),
+        )
 
 
 class EmbeddingSelector:
@@ -19,9 +40,20 @@ class EmbeddingSelector:
     def get_embedding_model(self):
         if self.config.type == "openai":
             from llama_index.embeddings import OpenAIEmbedding
-            return OpenAIEmbedding()
+            return OpenAIEmbedding(embed_batch_size=self.config.embed_batch_size)
         elif self.config.type == "local":
             from llama_index.embeddings import HuggingFaceEmbedding
-            return HuggingFaceEmbedding(model_name=self.config.huggingface_model)
+            return HuggingFaceEmbedding(model_name=self.config.huggingface_model,
+                                        embed_batch_size=self.config.embed_batch_size)
+        elif self.config.type == "onnx":
+            from src.utils.onnx_embedding import OnnxEmbedding
+            return OnnxEmbedding(
+                model_name=self.config.huggingface_model,
+                export_dir=self.config.onnx_export_dir,
+                quantize=self.config.onnx_quantize,
+                threads=self.config.onnx_threads,
+                bucket_size=self.config.onnx_bucket_size,
+                embed_batch_size=self.config.embed_batch_size,
+            )
         else:
             raise ValueError(f"Unsupported embedding type: {self.config.type}")
@@ -0,0 +1,168 @@
+# /app/src/utils/onnx_embedding.py
+import logging
+import os
+import threading
+from typing import Any, List, Optional
+
+from llama_index.bridge.pydantic import Field, PrivateAttr
+from llama_index.callbacks import CallbackManager
+from llama_index.embeddings.base import DEFAULT_EMBED_BATCH_SIZE, BaseEmbedding
+from llama_index.embeddings.huggingface_utils import format_query, format_text
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+
+# Exports are written once per directory, even when several threads load the model
+_export_lock = threading.Lock()
+
+
+def export_model(model_name: str, export_dir: str, quantize: bool) -> str:
+    """
+    Exports a HuggingFace model to ONNX in `export_dir`, once, and returns the path of the model file.
+
+    The tokenizer is saved alongside. With `quantize`, the weights of the exported
+    model are also converted to int8 by dynamic quantization: activations stay in
+    float and are quantized on the fly, so no calibration data is needed.
+    """
+    onnx_path = os.path.join(export_dir, ONNX_MODEL_FILE)
+    quantized_path = os.path.join(export_dir, QUANTIZED_MODEL_FILE)
+    with _export_lock:
+        if not os.path.exists(onnx_path):
+            try:
+                from optimum.onnxruntime import ORTModelForFeatureExtraction
+                from transformers import AutoTokenizer
+            except ImportError:
+                raise ImportError("The 'onnx' embedding type requires optimum[onnxruntime] to export the model.")
+
+            logger.info(f"Exporting {model_name} to ONNX in {export_dir}.")
+            ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+        if quantize and not os.path.exists(quantized_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            logger.info(f"Quantizing {onnx_path} to int8.")
+            quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+    return quantized_path if quantize else onnx_path
+
+
+class OnnxEmbedding(BaseEmbedding):
+    """
+    CPU embedding model running a sentence-transformers model exported to ONNX.
+
+    It produces the vectors of HuggingFaceEmbedding for the same model (CLS pooling,
+    L2-normalized) with ONNX Runtime instead of PyTorch, optionally with int8 weights.
+    Texts of a call are sorted by token length and encoded in buckets of
+    `bucket_size`, each padded only to its own longest text, so short chunks are not
+    padded to the length of the longest chunk of the batch.
+
+    ONNX Runtime sessions are thread-safe: the loader calls the model from
+    `Loader.embed_workers` threads, and each run uses up to `threads` cores, so their
+    product should not exceed the CPU cores.
+
+    Attributes:
+    - model_name (str): HuggingFace model the ONNX model is exported from.
+    - export_dir (str): Directory holding the exported model and its tokenizer.
+    - quantize (bool): Whether to run the int8 quantized model.
+    - threads (int): Intra-op threads of a model run; 0 for the ONNX Runtime default.
+    - bucket_size (int): Texts encoded per model run.
+    - max_length (int): Token limit of a text; longer texts are truncated.
+    """
+
+    model_name: str = Field(description="HuggingFace model the ONNX model is exported from.")
+    export_dir: str = Field(description="Directory holding the exported model and its tokenizer.")
+    quantize: bool = Field(default=True, description="Whether to run the int8 quantized model.")
+    threads: int = Field(default=0, description="Intra-op threads of a model run; 0 for the default.")
+    bucket_size: int = Field(default=16, description="Texts encoded per model run.", gt=0)
+    max_length: int = Field(default=512, description="Token limit of a text.")
+    query_instruction: Optional[str] = Field(default=None, description="Instruction to prepend to queries.")
+    text_instruction: Optional[str] = Field(default=None, description="Instruction to prepend to texts.")
+
+    _session: Any = PrivateAttr()
+    _tokenizer: Any = PrivateAttr()
+    _input_names: set = PrivateAttr()
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/multi-qa-mpnet-base-dot-v1",
+        export_dir: Optional[str] = None,
+        quantize: bool = True,
+        threads: int = 0,
+        bucket_size: int = 16,
+        max_length: Optional[int] = None,
+        embed_batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        callback_manager: Optional[CallbackManager] = None,
+    ):
+        try:
+            import onnxruntime
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImportError("The 'onnx' embedding type requires onnxruntime and transformers.")
+
+        export_dir = export_dir or os.path.join("/app/src/data/onnx", model_name.split("/")[-1])
+        model_path = export_model(model_name, export_dir, quantize)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+
+        super().__init__(
+            embed_batch_size=embed_batch_size,
+            callback_manager=callback_manager,
+            model_name=model_name,
+            export_dir=export_dir,
+            quantize=quantize,
+            threads=threads,
+            bucket_size=bucket_size,
+            max_length=max_length or min(tokenizer.model_max_length, 512),
+        )
+        self._session = session
+        self._tokenizer = tokenizer
+        self._input_names = {model_input.name for model_input in session.get_inputs()}
+        logger.info(f"Loaded ONNX model {model_path} ({'int8' if quantize else 'float32'}, "
+                    f"{threads or 'default'} threads).")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "OnnxEmbedding"
+
+    def _embed(self, sentences: List[str]) -> List[List[float]]:
+        """Embeds texts in buckets of similar token length, returning the vectors in input order."""
+        import numpy as np
+
+        lengths = self._tokenizer(sentences, truncation=True, max_length=self.max_length,
+                                  return_length=True)["length"]
+        order = sorted(range(len(sentences)), key=lambda i: lengths[i])
+        embeddings = [None] * len(sentences)
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start:start + self.bucket_size]
+            encoded = self._tokenizer([sentences[i] for i in bucket], padding=True, truncation=True,
+                                      max_length=self.max_length, return_tensors="np")
+            inputs = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+            # CLS pooling: the hidden state of the first token represents the text.
+            vectors = self._session.run(None, inputs)[0][:, 0]
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+            for i, vector in zip(bucket, vectors.tolist()):
+                embeddings[i] = vector
+        return embeddings
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._embed([format_query(query, self.model_name, self.query_instruction)])[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed([format_text(text, self.model_name, self.text_instruction)])[0]
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed([format_text(text, self.model_name, self.text_instruction) for text in texts])
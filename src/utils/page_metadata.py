@@ -0,0 +1,123 @@
+# /app/src/utils/page_metadata.py
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+from qdrant_client.http import models as rest
+
+logger = logging.getLogger(__name__)
+
+# Saved pages keep their metadata in a JSON file next to them, e.g. <hash>.meta.json
+SIDECAR_SUFFIX = ".meta.json"
+
+# Payload fields of the points of scraped pages, and the index type of each.
+# fetched_at is a Unix timestamp, so a FLOAT index serves range filters on it.
+PAYLOAD_INDEXES = {
+    "url": rest.PayloadSchemaType.KEYWORD,
+    "domain": rest.PayloadSchemaType.KEYWORD,
+    "url_prefixes": rest.PayloadSchemaType.KEYWORD,
+    "fetched_at": rest.PayloadSchemaType.FLOAT,
+}
+
+# Metadata kept out of the text embedded for a chunk and the text shown to the LLM
+EXCLUDED_EMBED_KEYS = ["domain", "url_prefixes", "fetched_at", "description"]
+EXCLUDED_LLM_KEYS = ["domain", "url_prefixes", "fetched_at"]
+
+
+def sidecar_path(filepath: str) -> str:
+    """Returns the path of the metadata sidecar of a saved page."""
+    return os.path.splitext(filepath)[0] + SIDECAR_SUFFIX
+
+
+def normalize_domain(domain: str) -> str:
+    """Lowercases a host name and drops its 'www.' prefix."""
+    domain = domain.strip().lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def normalize_url_prefix(prefix: str) -> str:
+    """Puts a URL prefix in the form stored in `url_prefixes`: lowercase host, no 'www.', no trailing slash."""
+    parsed = urlparse(prefix.strip())
+    return f"{parsed.scheme}://{normalize_domain(parsed.netloc)}{parsed.path}".rstrip("/")
+
+
+def url_prefixes(url: str) -> list:
+    """
+    Returns the prefixes of a URL on path segment boundaries, from the site root to the
+    page itself, so a keyword match on any of them selects a whole section of a site.
+
+    Example: https://docs.x.io/guide/install gives https://docs.x.io,
+    https://docs.x.io/guide and https://docs.x.io/guide/install.
+    """
+    root = normalize_url_prefix(url.split("?")[0].split("#")[0])
+    parsed = urlparse(root)
+    prefixes = [f"{parsed.scheme}://{parsed.netloc}"]
+    for segment in filter(None, parsed.path.split("/")):
+        prefixes.append(f"{prefixes[-1]}/{segment}")
+    return prefixes
+
+
+def build_page_metadata(url: str, title: str = "", description: str = "", fetched_at: float = None) -> dict:
+    """
+    Builds the metadata of a scraped page, as stored in its sidecar and in the payload of its chunks.
+
+    Returns:
+        dict: url, domain, title, description, fetched_at (Unix time) and url_prefixes.
+    """
+    return {
+        "url": url,
+        "domain": normalize_domain(urlparse(url).netloc),
+        "title": (title or "").strip(),
+        "description": (description or "").strip(),
+        "fetched_at": fetched_at if fetched_at is not None else time.time(),
+        "url_prefixes": url_prefixes(url),
+    }
+
+
+def write_sidecar(filepath: str, metadata: dict):
+    """Writes the metadata sidecar of a saved page."""
+    with open(sidecar_path(filepath), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+
+
+def read_sidecar(filepath: str) -> dict:
+    """Returns the metadata of a saved page, or an empty dict when it has no readable sidecar."""
+    path = sidecar_path(filepath)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable page metadata {path}: {e}")
+        return {}
+
+
+def build_search_filter(domain: str = None, url_prefix: str = None, fetched_after: datetime = None):
+    """
+    Builds the Qdrant filter restricting a search to some scraped pages.
+
+    Args:
+        domain (str): Only pages of this host, e.g. 'docs.python.org'.
+        url_prefix (str): Only pages under this URL, matched on path segment boundaries.
+        fetched_after (datetime): Only pages fetched at or after this time; read as UTC
+                                  when it has no time zone.
+
+    Returns:
+        Filter: The filter, or None when no condition is given.
+    """
+    conditions = []
+    if domain:
+        conditions.append(rest.FieldCondition(key="domain", match=rest.MatchValue(value=normalize_domain(domain))))
+    if url_prefix:
+        conditions.append(rest.FieldCondition(key="url_prefixes",
+                                              match=rest.MatchValue(value=normalize_url_prefix(url_prefix))))
+    if fetched_after:
+        if fetched_after.tzinfo is None:
+            # Never the time zone of the server, which the client cannot know.
+            fetched_after = fetched_after.replace(tzinfo=timezone.utc)
+        conditions.append(rest.FieldCondition(key="fetched_at", range=rest.Range(gte=fetched_after.timestamp())))
+    return rest.Filter(must=conditions) if conditions else None
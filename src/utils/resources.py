@@ -0,0 +1,249 @@
+# /app/src/utils/resources.py
+import asyncio
+import logging
+import threading
+import weakref
+
+import httpx
+from llama_index import ServiceContext, VectorStoreIndex
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from src.utils.config import load_config, setup_environment_variables
+from src.utils.embedding_cache import QueryEmbeddingCache
+from src.utils.embedding_selector import EmbeddingConfig, EmbeddingSelector
+from src.utils.state import get_state_backend
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the resource registry instance
+_registry_instance = None
+_registry_lock = threading.Lock()
+
+
+class ResourceRegistry:
+    """
+    Process-wide registry of the expensive resources shared by the API handlers,
+    the agent tools and the document loader.
+
+    Every resource is built lazily on first access and then reused, so the
+    configuration is read once, the embedding model is loaded once and a single
+    Qdrant client (and its pooled HTTP/gRPC connection) serves every request.
+    An async Qdrant client is kept alongside it for the async chat path.
+
+    Attributes:
+    - CONFIG (dict): Loaded configuration settings.
+    """
+
+    def __init__(self, config: dict = None):
+        """
+        Initializes the registry without building any resource.
+
+        Parameters:
+        - config (dict): Optional configuration; loaded from config.yml when omitted.
+        """
+        self.CONFIG = config or load_config()
+        setup_environment_variables(self.CONFIG)
+        self._lock = threading.RLock()
+        self._embed_model = None
+        self._service_context = None
+        self._client = None
+        self._aclient = None
+        self._query_cache = None
+        self._search_semaphores = weakref.WeakKeyDictionary()
+        self._vector_stores = {}
+        self._indexes = {}
+
+    @property
+    def embed_model(self):
+        """The embedding model selected by `Embedding_Type`, loaded on first use."""
+        if self._embed_model is None:
+            with self._lock:
+                if self._embed_model is None:
+                    embedding_config = EmbeddingConfig.from_config(self.CONFIG)
+                    self._embed_model = EmbeddingSelector(embedding_config).get_embedding_model()
+                    logger.info(f"Loaded embedding model for type '{embedding_config.type}'.")
+        return self._embed_model
+
+    @property
+    def service_context(self) -> ServiceContext:
+        """A ServiceContext bound to the shared embedding model."""
+        if self._service_context is None:
+            with self._lock:
+                if self._service_context is None:
+                    self._service_context = ServiceContext.from_defaults(embed_model=self.embed_model)
+        return self._service_context
+
+    @property
+    def query_cache(self) -> QueryEmbeddingCache:
+        """
+        The query embedding cache configured under `Query_Cache`. With a shared state
+        backend, the workers also share the embeddings they computed.
+        """
+        if self._query_cache is None:
+            with self._lock:
+                if self._query_cache is None:
+                    cache_config = self.CONFIG.get("Query_Cache", {})
+                    state_backend = get_state_backend()
+                    self._query_cache = QueryEmbeddingCache(
+                        max_entries=cache_config.get("max_entries", 4096),
+                        persist_path=cache_config.get("persist_path") or None,
+                        backend=state_backend if state_backend.shared else None,
+                        backend_ttl=cache_config.get("shared_ttl_seconds", 604800)
+                    )
+        return self._query_cache
+
+    def get_query_embedding(self, query: str) -> list:
+        """Embeds a query with the shared model, going through the query embedding cache."""
+        return self.query_cache.get_query_embedding(self.embed_model, query)
+
+    async def aget_query_embeddings(self, queries: list, batch_size: int = 256) -> list:
+        """Embeds many queries in batched model calls on a worker thread, going through the cache."""
+        return await asyncio.to_thread(self.query_cache.get_query_embeddings, self.embed_model, queries, batch_size)
+
+    async def aget_query_embedding(self, query: str) -> list:
+        """
+        Async variant of get_query_embedding.
+
+        Remote models are awaited directly. Local models compute in-process, so they
+        run on a worker thread to keep the event loop free.
+        """
+        if self.CONFIG["Embedding_Type"] == "openai":
+            return await self.query_cache.aget_query_embedding(self.embed_model, query)
+        return await asyncio.to_thread(self.get_query_embedding, query)
+
+    @property
+    def client(self) -> QdrantClient:
+        """The shared Qdrant client, keeping its connections alive between requests."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @property
+    def aclient(self) -> AsyncQdrantClient:
+        """The shared async Qdrant client, used by coroutines so they never wait on a thread."""
+        if self._aclient is None:
+            with self._lock:
+                if self._aclient is None:
+                    self._aclient = self._create_client(AsyncQdrantClient)
+        return self._aclient
+
+    def search_semaphore(self) -> asyncio.Semaphore:
+        """
+        The semaphore bounding the Qdrant batch search requests in flight, sized by
+        `Search.batch_max_concurrency`. One is kept per event loop, since a semaphore
+        cannot be awaited from a loop other than the one it first waited on.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._search_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.CONFIG.get("Search", {}).get("batch_max_concurrency", 4))
+                self._search_semaphores[loop] = semaphore
+        return semaphore
+
+    def _create_client(self, client_class=QdrantClient):
+        qdrant_config = self.CONFIG["Qdrant"]
+        limits = httpx.Limits(
+            max_connections=qdrant_config.get("max_connections", 20),
+            max_keepalive_connections=qdrant_config.get("max_keepalive_connections", 10),
+        )
+        logger.info(f"Connecting {client_class.__name__} to Qdrant at {qdrant_config['url']}.")
+        return client_class(
+            url=qdrant_config["url"],
+            prefer_grpc=qdrant_config.get("prefer_grpc", False),
+            grpc_port=qdrant_config.get("grpc_port", 6334),
+            timeout=qdrant_config.get("timeout"),
+            limits=limits,
+        )
+
+    def get_vector_store(self, collection: str) -> QdrantVectorStore:
+        """
+        Returns the QdrantVectorStore for a collection, creating it on first use.
+
+        Parameters:
+        - collection (str): Name of the Qdrant collection.
+        """
+        with self._lock:
+            if collection not in self._vector_stores:
+                self._vector_stores[collection] = QdrantVectorStore(
+                    client=self.client, aclient=self.aclient, collection_name=collection
+                )
+            return self._vector_stores[collection]
+
+    def get_index(self, collection: str) -> VectorStoreIndex:
+        """
+        Returns the VectorStoreIndex for a collection, creating it on first use.
+
+        Parameters:
+        - collection (str): Name of the Qdrant collection.
+        """
+        with self._lock:
+            if collection not in self._indexes:
+                self._indexes[collection] = VectorStoreIndex.from_vector_store(
+                    vector_store=self.get_vector_store(collection),
+                    service_context=self.service_context
+                )
+            return self._indexes[collection]
+
+    def evict(self, collection: str):
+        """
+        Drops the cached vector store and index of a collection.
+
+        Must be called after a collection is (re)created so the next access sees
+        its current state instead of the one captured when it was first cached.
+        """
+        with self._lock:
+            self._vector_stores.pop(collection, None)
+            self._indexes.pop(collection, None)
+
+    def warm_up(self, collections: list = None):
+        """
+        Eagerly builds the embedding model, the Qdrant client and the indexes of
+        the given collections, so the first request does not pay for them.
+
+        Parameters:
+        - collections (list): Collections to prepare; defaults to `Qdrant.warm_up_collections`.
+        """
+        if collections is None:
+            collections = self.CONFIG["Qdrant"].get("warm_up_collections", [])
+
+        # A throwaway embedding forces lazy model weights onto the device.
+        self.embed_model.get_query_embedding("warm up")
+        self.client.get_collections()
+        self.query_cache
+        for collection in collections:
+            self.get_index(collection)
+        logger.info(f"Resources warmed up for collections: {collections}")
+
+    def close(self):
+        """Closes the Qdrant client and the query cache, and forgets every cached resource."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+            if self._query_cache is not None:
+                self._query_cache.close()
+            self._client = None
+            self._aclient = None
+            self._query_cache = None
+            self._vector_stores.clear()
+            self._indexes.clear()
+
+    async def aclose(self):
+        """Closes the async Qdrant client, then every other resource."""
+        aclient = self._aclient
+        if aclient is not None:
+            await aclient.close()
+        self.close()
+
+
+def get_resource_registry() -> ResourceRegistry:
+    # Singleton-like accessor for the ResourceRegistry instance
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = ResourceRegistry()
+    return _registry_instance
@@ -0,0 +1,332 @@
+# /app/src/utils/state.py
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from src.utils.config import load_config
+
+logger = logging.getLogger(__name__)
+
+# Global variable to store the state backend instance
+_state_backend_instance = None
+_state_backend_lock = threading.Lock()
+
+# Attempts of an optimistic Redis update before giving up
+UPDATE_RETRIES = 50
+
+
+class StateBackend(ABC):
+    """
+    Key-value store for the state that must be shared by every API worker:
+    conversation sessions and response caches.
+
+    Values are bytes. Besides plain keys with an optional TTL, the interface
+    offers counters and sorted sets (members ranked by a float score), which is
+    what the session memory needs for its LRU index. Implementations must be
+    safe to call from several threads.
+
+    Attributes:
+    - shared (bool): True when the state is visible to other processes.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str):
+        """Returns the value of a key, or None if it is missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float = None):
+        """Stores a value, expiring it after `ttl` seconds when given."""
+
+    def mget(self, keys: list) -> list:
+        """Returns the values of several keys, None for each missing one."""
+        return [self.get(key) for key in keys]
+
+    def set_many(self, values: dict, ttl: float = None):
+        """Stores several values, each expiring after `ttl` seconds when given."""
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    @abstractmethod
+    def update(self, key: str, func, ttl: float = None):
+        """
+        Atomically reads, changes and writes back a value, even against other processes.
+
+        Args:
+            key (str): The key.
+            func (callable): Called with the current value (None when missing); returns
+                             (new value or None to leave the key unchanged, result). It may
+                             be called again when another writer got in between, so it must
+                             not have side effects.
+            ttl (float): Expiry of the new value, in seconds.
+
+        Returns:
+            The result returned by the last call of `func`.
+        """
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        """Removes keys."""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        """Adds to a counter and returns its new value."""
+
+    @abstractmethod
+    def zadd(self, key: str, member: str, score: float):
+        """Adds a member to a sorted set, or updates its score."""
+
+    @abstractmethod
+    def zrem(self, key: str, *members: str):
+        """Removes members from a sorted set."""
+
+    @abstractmethod
+    def zcard(self, key: str) -> int:
+        """Returns the number of members of a sorted set."""
+
+    @abstractmethod
+    def zrange(self, key: str) -> list:
+        """Returns every member of a sorted set, lowest score first."""
+
+    @abstractmethod
+    def zpopmin(self, key: str, count: int = 1) -> list:
+        """Removes and returns the `count` members with the lowest scores."""
+
+    @abstractmethod
+    def zremrangebyscore(self, key: str, max_score: float) -> list:
+        """Removes and returns the members whose score is at most `max_score`."""
+
+    def close(self):
+        """Releases the connections of the backend."""
+
+
+class InMemoryStateBackend(StateBackend):
+    """State backend held in the process; only correct with a single API worker."""
+
+    def __init__(self):
+        self._values = {}
+        self._expiry = {}
+        self._sorted_sets = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> bool:
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._values.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._values
+
+    def get(self, key):
+        with self._lock:
+            return self._values[key] if self._live(key) else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = value
+            if ttl:
+                self._expiry[key] = time.monotonic() + ttl
+            else:
+                self._expiry.pop(key, None)
+
+    def update(self, key, func, ttl=None):
+        with self._lock:
+            value, result = func(self._values[key] if self._live(key) else None)
+            if value is not None:
+                self._values[key] = value
+                if ttl:
+                    self._expiry[key] = time.monotonic() + ttl
+                else:
+                    self._expiry.pop(key, None)
+            return result
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+                self._expiry.pop(key, None)
+                self._sorted_sets.pop(key, None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            value = int(self._values[key]) + amount if self._live(key) else amount
+            self._values[key] = str(value).encode()
+            return value
+
+    def zadd(self, key, member, score):
+        with self._lock:
+            self._sorted_sets.setdefault(key, {})[member] = score
+
+    def zrem(self, key, *members):
+        with self._lock:
+            sorted_set = self._sorted_sets.get(key, {})
+            for member in members:
+                sorted_set.pop(member, None)
+
+    def zcard(self, key):
+        with self._lock:
+            return len(self._sorted_sets.get(key, {}))
+
+    def _ranked(self, key):
+        sorted_set = self._sorted_sets.get(key, {})
+        return sorted(sorted_set, key=sorted_set.get)
+
+    def zrange(self, key):
+        with self._lock:
+            return self._ranked(key)
+
+    def zpopmin(self, key, count=1):
+        with self._lock:
+            popped = self._ranked(key)[:count]
+            for member in popped:
+                del self._sorted_sets[key][member]
+            return popped
+
+    def zremrangebyscore(self, key, max_score):
+        with self._lock:
+            sorted_set = self._sorted_sets.get(key, {})
+            removed = [member for member in self._ranked(key) if sorted_set[member] <= max_score]
+            for member in removed:
+                del sorted_set[member]
+            return removed
+
+
+class RedisStateBackend(StateBackend):
+    """
+    State backend stored in Redis, shared by every worker and replica.
+
+    Works with any client exposing the redis-py API, such as a fakeredis
+    instance in tests. Every key is namespaced by `key_prefix`.
+
+    Attributes:
+    - client: The redis-py compatible client.
+    - key_prefix (str): Prefix added to every key.
+    """
+
+    shared = True
+
+    def __init__(self, client, key_prefix: str = "rag_bot:"):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: str, key_prefix: str = "rag_bot:") -> "RedisStateBackend":
+        import redis
+
+        return cls(redis.Redis.from_url(url), key_prefix)
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    @staticmethod
+    def _members(members: list) -> list:
+        return [member.decode() if isinstance(member, bytes) else member for member in members]
+
+    def get(self, key):
+        return self.client.get(self._key(key))
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self._key(key), value, px=int(ttl * 1000) if ttl else None)
+
+    def mget(self, keys):
+        return self.client.mget([self._key(key) for key in keys]) if keys else []
+
+    def set_many(self, values, ttl=None):
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.set(self._key(key), value, px=int(ttl * 1000) if ttl else None)
+        pipeline.execute()
+
+    def update(self, key, func, ttl=None):
+        from redis.exceptions import WatchError
+
+        key = self._key(key)
+        with self.client.pipeline(transaction=True) as pipeline:
+            for _ in range(UPDATE_RETRIES):
+                try:
+                    # WATCH makes EXEC fail when another client changes the key after it was read.
+                    pipeline.watch(key)
+                    value, result = func(pipeline.get(key))
+                    if value is None:
+                        pipeline.unwatch()
+                        return result
+                    pipeline.multi()
+                    pipeline.set(key, value, px=int(ttl * 1000) if ttl else None)
+                    pipeline.execute()
+                    return result
+                except WatchError:
+                    continue
+        raise RuntimeError(f"Could not update {key}: too many concurrent writers")
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self._key(key) for key in keys))
+
+    def incr(self, key, amount=1):
+        return self.client.incrby(self._key(key), amount)
+
+    def zadd(self, key, member, score):
+        self.client.zadd(self._key(key), {member: score})
+
+    def zrem(self, key, *members):
+        if members:
+            self.client.zrem(self._key(key), *members)
+
+    def zcard(self, key):
+        return self.client.zcard(self._key(key))
+
+    def zrange(self, key):
+        return self._members(self.client.zrange(self._key(key), 0, -1))
+
+    def zpopmin(self, key, count=1):
+        return self._members([member for member, _ in self.client.zpopmin(self._key(key), count)])
+
+    def zremrangebyscore(self, key, max_score):
+        # Read and remove atomically, so two workers never both claim the same members.
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.zrangebyscore(self._key(key), "-inf", max_score)
+        pipeline.zremrangebyscore(self._key(key), "-inf", max_score)
+        members, _ = pipeline.execute()
+        return self._members(members)
+
+    def close(self):
+        self.client.close()
+
+
+def create_state_backend(config: dict) -> StateBackend:
+    """
+    Builds the state backend selected by the `State` section of config.yml.
+
+    Args:
+        config (dict): The loaded configuration.
+
+    Returns:
+        StateBackend: An in-memory backend for 'memory', a Redis backend for 'redis'.
+    """
+    state_config = config.get("State", {})
+    backend = state_config.get("backend", "memory")
+    if backend == "memory":
+        return InMemoryStateBackend()
+    if backend == "redis":
+        logger.info(f"Using Redis state backend at {state_config['redis_url']}.")
+        return RedisStateBackend.from_url(state_config["redis_url"], state_config.get("key_prefix", "rag_bot:"))
+    raise ValueError(f"Unsupported state backend: {backend}")
+
+
+def get_state_backend() -> StateBackend:
+    # Singleton-like accessor for the StateBackend instance
+    global _state_backend_instance
+    if _state_backend_instance is None:
+        with _state_backend_lock:
+            if _state_backend_instance is None:
+                _state_backend_instance = create_state_backend(load_config())
+    return _state_backend_instance
+
+
+def close_state_backend():
+    """Closes the state backend, if it was created."""
+    global _state_backend_instance
+    if _state_backend_instance is not None:
+        _state_backend_instance.close()
+        _state_backend_instance = None
@@ -0,0 +1,86 @@
+# tests/agent/test_answer_cache.py
+import time
+
+import pytest
+from qdrant_client import QdrantClient
+
+from src.agent.answer_cache import AnswerCache
+
+
+class FakeResources:
+    """The parts of the resource registry the answer cache uses, over an in-memory Qdrant."""
+
+    def __init__(self):
+        self.CONFIG = {"Qdrant": {"vector_size": 4}}
+        self.client = QdrantClient(":memory:")
+
+    def get_query_embedding(self, query: str) -> list:
+        return [1.0, 0.5, 0.2, len(query) / 10]
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(FakeResources(), similarity_threshold=0.9, ttl_seconds=60, purge_interval_seconds=0)
+
+
+def add_answer(cache: AnswerCache, question: str, answer: str, age: float):
+    cache._ensure_collection()
+    point = cache._point(question, answer, cache.resources.get_query_embedding(question))
+    point.payload["created_at"] = time.time() - age
+    cache.resources.client.upsert(collection_name=cache.collection, points=[point])
+
+
+def stored_answers(cache: AnswerCache) -> set:
+    points, _ = cache.resources.client.scroll(collection_name=cache.collection, with_payload=True)
+    return {point.payload["answer"] for point in points}
+
+
+def test_store_then_lookup_returns_the_answer(cache):
+    cache.store("what is rag_bot?", "a bot")
+
+    assert cache.lookup("what is rag_bot?") == "a bot"
+
+
+def test_expired_answers_are_not_returned(cache):
+    add_answer(cache, "what is rag_bot?", "old", age=120)
+
+    assert cache.lookup("what is rag_bot?") is None
+
+
+def test_purge_deletes_only_expired_answers(cache):
+    add_answer(cache, "old question", "old", age=120)
+    add_answer(cache, "recent question", "recent", age=10)
+
+    cache.purge_expired()
+
+    assert stored_answers(cache) == {"recent"}
+
+
+def test_store_purges_expired_answers(cache):
+    add_answer(cache, "old question", "old", age=120)
+
+    cache.store("new question", "new")
+
+    assert stored_answers(cache) == {"new"}
+
+
+def test_store_purges_at_most_once_per_interval(cache):
+    cache.purge_interval_seconds = 3600
+    cache.store("first question", "first")
+    add_answer(cache, "old question", "old", age=120)
+
+    cache.store("second question", "second")
+
+    assert stored_answers(cache) == {"first", "old", "second"}
+
+
+def test_invalidate_ignores_unrelated_collections(cache):
+    cache.source_collections = ["techdocs"]
+    cache.store("what is rag_bot?", "a bot")
+
+    cache.invalidate("other")
+    assert stored_answers(cache) == {"a bot"}
+
+    cache.invalidate("techdocs")
+    assert stored_answers(cache) == set()
+
@@ -0,0 +1,101 @@
+# tests/agent/test_parallel_tools.py
+import asyncio
+import time
+from typing import Type
+
+from langchain.pydantic_v1 import BaseModel, Field
+from langchain.tools import BaseTool
+
+from src.agent.parallel_tools import TimeoutTool, with_timeouts
+
+
+class LookupInput(BaseModel):
+    query: str = Field(description="The lookup query")
+    delay: float = Field(default=0.0, description="Seconds the lookup takes")
+
+
+class LookupTool(BaseTool):
+    name = "lookup"
+    description = "Looks a query up."
+    args_schema: Type[BaseModel] = LookupInput
+
+    def _run(self, query: str, delay: float = 0.0, **kwargs) -> str:
+        if query == "fail":
+            raise RuntimeError("backend down")
+        time.sleep(delay)
+        return f"found {query}"
+
+    async def _arun(self, query: str, delay: float = 0.0, **kwargs) -> str:
+        if query == "fail":
+            raise RuntimeError("backend down")
+        await asyncio.sleep(delay)
+        return f"found {query}"
+
+
+class EchoTool(BaseTool):
+    name = "echo"
+    description = "Repeats its input."
+
+    def _run(self, text: str, **kwargs) -> str:
+        return text
+
+    async def _arun(self, text: str, **kwargs) -> str:
+        return text
+
+
+def test_wrap_keeps_the_tool_interface():
+    tool = LookupTool()
+
+    wrapped = TimeoutTool.wrap(tool, 1.0)
+
+    assert (wrapped.name, wrapped.description, wrapped.args_schema) == (tool.name, tool.description, LookupInput)
+    assert not wrapped.return_direct
+
+
+def test_call_within_the_timeout():
+    assert TimeoutTool.wrap(LookupTool(), 1.0).run({"query": "docs"}) == "found docs"
+
+
+def test_single_string_input():
+    assert TimeoutTool.wrap(EchoTool(), 1.0).run("hello") == "hello"
+
+
+def test_call_over_the_timeout():
+    start = time.monotonic()
+
+    observation = TimeoutTool.wrap(LookupTool(), 0.1).run({"query": "docs", "delay": 0.5})
+
+    assert observation == "The lookup tool did not answer within 0.1 seconds."
+    assert time.monotonic() - start < 0.4
+
+
+def test_failing_call():
+    assert TimeoutTool.wrap(LookupTool(), 1.0).run({"query": "fail"}) == "The lookup tool failed: backend down"
+
+
+def test_async_calls():
+    tool = TimeoutTool.wrap(LookupTool(), 0.1)
+
+    async def run_both():
+        return await asyncio.gather(tool.arun({"query": "docs"}), tool.arun({"query": "docs", "delay": 0.5}))
+
+    assert asyncio.run(run_both()) == ["found docs", "The lookup tool did not answer within 0.1 seconds."]
+
+
+def test_async_failing_call():
+    observation = asyncio.run(TimeoutTool.wrap(LookupTool(), 1.0).arun({"query": "fail"}))
+
+    assert observation == "The lookup tool failed: backend down"
+
+
+def test_with_timeouts_applies_the_overrides():
+    config = {"Agent": {"tool_timeout": 5, "tool_timeouts": {"echo": 2}}}
+
+    tools = with_timeouts([LookupTool(), EchoTool()], config)
+
+    assert [(tool.name, tool.timeout) for tool in tools] == [("lookup", 5), ("echo", 2)]
+    assert all(isinstance(tool, TimeoutTool) for tool in tools)
+
+
+def test_with_timeouts_default():
+    assert with_timeouts([EchoTool()], {})[0].timeout == 20
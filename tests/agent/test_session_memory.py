@@ -0,0 +1,131 @@
+# tests/agent/test_session_memory.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.agent.session_memory import SessionMemory
+
+
+class FakeLLM:
+    """Summarises by listing every question of the prompt; fails while `failing` is set."""
+
+    def __init__(self):
+        self.prompts = []
+        self.failing = False
+
+    def invoke(self, prompt: str):
+        self.prompts.append(prompt)
+        if self.failing:
+            raise RuntimeError("llm unavailable")
+        questions = [line[len("Human: "):] for line in prompt.splitlines() if line.startswith("Human: ")]
+        summary = prompt.split("Current summary:\n")[1].split("\n\n")[0]
+        return SimpleNamespace(content=" ".join(([] if summary == "(none)" else [summary]) + questions))
+
+    async def ainvoke(self, prompt: str):
+        return self.invoke(prompt)
+
+
+def session_record(memory: SessionMemory, session_id: str) -> dict:
+    return memory._load(session_id)
+
+
+def test_window_keeps_the_last_turns():
+    memory = SessionMemory(window_turns=2)
+    for i in range(5):
+        memory.save_turn("s", f"q{i}", f"a{i}")
+
+    assert memory.get_history("s") == "Human: q3\nAI: a3\nHuman: q4\nAI: a4"
+
+
+def test_history_stays_within_the_character_budget():
+    memory = SessionMemory(window_turns=10, max_history_chars=40)
+    for i in range(10):
+        memory.save_turn("s", f"question {i}", f"answer {i}")
+
+    history = memory.get_history("s")
+
+    assert len(history) <= 40
+    assert history.endswith("Human: question 9\nAI: answer 9")
+
+
+def test_least_recently_used_sessions_are_evicted():
+    memory = SessionMemory(max_sessions=2)
+    memory.save_turn("a", "q", "a")
+    memory.save_turn("b", "q", "a")
+    memory.get_history("a")
+
+    memory.save_turn("c", "q", "a")
+
+    assert memory.has_history("a") and memory.has_history("c")
+    assert not memory.has_history("b")
+    assert memory.stats()["sessions"] == 2
+    assert memory.stats()["evicted_sessions"] == 1
+
+
+def test_idle_sessions_expire():
+    memory = SessionMemory(ttl_seconds=-1)
+    memory.save_turn("s", "q", "a")
+
+    assert memory.get_history("s") == ""
+    assert memory.stats()["expired_sessions"] == 1
+
+
+def test_summary_covers_the_turns_pushed_out_of_the_window():
+    memory = SessionMemory(history_mode="summary", window_turns=2, llm=FakeLLM())
+    for i in range(5):
+        memory.save_turn("s", f"q{i}", f"a{i}")
+
+    session = session_record(memory, "s")
+    assert session["summary"] == "q0 q1 q2"
+    assert session["pending"] == []
+    assert memory.stats()["summaries"] == 3
+
+
+def test_turns_left_by_a_failed_summary_are_folded_into_the_next_one():
+    llm = FakeLLM()
+    memory = SessionMemory(history_mode="summary", window_turns=3, llm=llm)
+    llm.failing = True
+    for i in range(5):
+        memory.save_turn("s", f"q{i}", f"a{i}")
+    assert session_record(memory, "s")["pending"] == [["q0", "a0"], ["q1", "a1"]]
+
+    llm.failing = False
+    memory.save_turn("s", "q5", "a5")
+
+    assert session_record(memory, "s")["summary"] == "q0 q1 q2"
+    assert "Summary of the earlier conversation: q0 q1 q2" in memory.get_history("s")
+
+
+def test_turns_beyond_the_next_summary_are_summarised_before_being_trimmed():
+    llm = FakeLLM()
+    memory = SessionMemory(history_mode="summary", window_turns=2, llm=llm)
+    llm.failing = True
+    for i in range(6):
+        memory.save_turn("s", f"q{i}", f"a{i}")
+
+    # The last failed summary was asked for every turn out of the window, then the oldest were trimmed.
+    assert "Human: q1" in llm.prompts[-1] and "Human: q3" in llm.prompts[-1]
+    assert session_record(memory, "s")["pending"] == [["q2", "a2"], ["q3", "a3"]]
+
+    llm.failing = False
+    memory.save_turn("s", "q6", "a6")
+    assert session_record(memory, "s")["summary"] == "q2 q3 q4"
+
+
+def test_async_save_turn_summarises():
+    memory = SessionMemory(history_mode="summary", window_turns=1, llm=FakeLLM())
+
+    async def converse():
+        for i in range(3):
+            await memory.asave_turn("s", f"q{i}", f"a{i}")
+        return await memory.aget_history("s")
+
+    history = asyncio.run(converse())
+
+    assert history == "Summary of the earlier conversation: q0 q1\nHuman: q2\nAI: a2"
+
+
+def test_summary_mode_requires_an_llm():
+    with pytest.raises(ValueError):
+        SessionMemory(history_mode="summary")
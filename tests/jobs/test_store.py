@@ -0,0 +1,116 @@
+# tests/jobs/test_store.py
+from types import SimpleNamespace
+
+import pytest
+
+from src.jobs import store as store_module
+from src.jobs.store import CANCELLED, FAILED, QUEUED, RUNNING, JobStore
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(store_module, "time", SimpleNamespace(time=clock))
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    store = JobStore(str(tmp_path / "jobs" / "jobs.sqlite"))
+    yield store
+    store.close()
+
+
+def test_jobs_survive_reopening_the_store(tmp_path, clock):
+    path = str(tmp_path / "jobs.sqlite")
+    first = JobStore(path)
+    first.create("job-1", "ingest", {"collection": "docs"}, owner="worker-a")
+    first.update("job-1", progress={"pages": 3})
+    first.close()
+
+    job = JobStore(path).get("job-1")
+
+    assert job["params"] == {"collection": "docs"}
+    assert job["progress"] == {"pages": 3}
+    assert job["status"] == QUEUED
+
+
+def test_jobs_of_a_live_owner_are_kept(store, clock):
+    store.heartbeat("worker-a")
+    store.create("job-1", "ingest", {}, owner="worker-a")
+    store.start("job-1")
+
+    clock.now += 30
+    assert store.fail_interrupted(stale_after=60) == 0
+    assert store.get("job-1")["status"] == RUNNING
+
+
+def test_jobs_of_a_stale_owner_are_failed(store, clock):
+    store.heartbeat("worker-a")
+    store.heartbeat("worker-b")
+    store.create("job-a", "ingest", {}, owner="worker-a")
+    store.create("job-b", "ingest", {}, owner="worker-b")
+
+    clock.now += 90
+    store.heartbeat("worker-b")
+
+    assert store.fail_interrupted(stale_after=60) == 1
+    assert store.get("job-a")["status"] == FAILED
+    assert store.get("job-a")["error"] == "Interrupted by an API restart"
+    assert store.get("job-b")["status"] == QUEUED
+
+
+def test_jobs_of_a_removed_owner_are_failed(store):
+    store.heartbeat("worker-a")
+    store.create("job-1", "ingest", {}, owner="worker-a")
+
+    store.remove_owner("worker-a")
+
+    assert store.fail_interrupted() == 1
+    assert store.get("job-1")["status"] == FAILED
+
+
+def test_finished_jobs_are_never_failed(store):
+    store.create("job-1", "ingest", {}, owner="gone")
+    store.update("job-1", status="completed")
+
+    assert store.fail_interrupted() == 0
+
+
+def test_cancelling_a_queued_job_finishes_it(store):
+    store.create("job-1", "ingest", {}, owner="worker-a")
+
+    store.request_cancel("job-1")
+
+    assert store.get("job-1")["status"] == CANCELLED
+    assert store.start("job-1") is False
+    assert store.cancel_requested("worker-a") == []
+
+
+def test_cancelling_a_running_job_flags_it_for_its_owner(store):
+    store.create("job-1", "ingest", {}, owner="worker-a")
+    store.create("job-2", "ingest", {}, owner="worker-b")
+    store.start("job-1")
+    store.start("job-2")
+
+    store.request_cancel("job-1")
+    store.request_cancel("job-2")
+
+    assert store.get("job-1")["status"] == RUNNING
+    assert store.cancel_requested("worker-a") == ["job-1"]
+    assert store.cancel_requested("worker-b") == ["job-2"]
+
+
+def test_a_job_starts_only_once(store):
+    store.create("job-1", "ingest", {})
+
+    assert store.start("job-1") is True
+    assert store.start("job-1") is False
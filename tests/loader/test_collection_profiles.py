@@ -0,0 +1,76 @@
+# tests/loader/test_collection_profiles.py
+import pytest
+from qdrant_client.http import models as rest
+
+from src.loader.collection_profiles import CollectionProfile, get_collection_profile
+
+CONFIG = {
+    "Qdrant": {"collection_profiles": {"big": "compact"}, "default_collection_profile": "default"},
+    "Collection_Profiles": {
+        "default": {"hnsw": {"m": 16, "ef_construct": 100}},
+        "compact": {
+            "hnsw": {"m": 8, "ef_construct": 64, "on_disk": True},
+            "search_ef": 48,
+            "quantization": {"type": "scalar", "quantile": 0.95, "always_ram": True, "oversampling": 2.0},
+            "on_disk_vectors": True,
+            "on_disk_payload": True,
+            "optimizers": {"indexing_threshold": 10000, "memmap_threshold": 20000},
+        },
+        "binary": {"quantization": {"type": "binary", "always_ram": False, "rescore": False}},
+    },
+}
+
+
+def test_default_profile_create_kwargs():
+    kwargs = CollectionProfile().create_kwargs(768)
+
+    assert kwargs["vectors_config"] == rest.VectorParams(size=768, distance=rest.Distance.COSINE, on_disk=False)
+    assert kwargs["on_disk_payload"] is False
+    assert kwargs["hnsw_config"] == rest.HnswConfigDiff(m=16, ef_construct=100, on_disk=False)
+    assert kwargs["optimizers_config"] == rest.OptimizersConfigDiff()
+    assert kwargs["quantization_config"] is None
+
+
+def test_scalar_profile_create_kwargs():
+    kwargs = get_collection_profile(CONFIG, "big").create_kwargs("768")
+
+    assert kwargs["vectors_config"].size == 768
+    assert kwargs["vectors_config"].on_disk is True
+    assert kwargs["on_disk_payload"] is True
+    assert kwargs["hnsw_config"] == rest.HnswConfigDiff(m=8, ef_construct=64, on_disk=True)
+    assert kwargs["optimizers_config"] == rest.OptimizersConfigDiff(indexing_threshold=10000, memmap_threshold=20000)
+    assert kwargs["quantization_config"] == rest.ScalarQuantization(scalar=rest.ScalarQuantizationConfig(
+        type=rest.ScalarType.INT8, quantile=0.95, always_ram=True))
+
+
+def test_binary_profile_create_kwargs():
+    kwargs = get_collection_profile(CONFIG, "techdocs", "binary").create_kwargs(384)
+
+    assert kwargs["quantization_config"] == rest.BinaryQuantization(
+        binary=rest.BinaryQuantizationConfig(always_ram=False))
+
+
+def test_search_params():
+    assert CollectionProfile().search_params() is None
+    assert get_collection_profile(CONFIG, "big").search_params() == rest.SearchParams(
+        hnsw_ef=48, quantization=rest.QuantizationSearchParams(rescore=True, oversampling=2.0))
+
+
+def test_disabling_quantization_in_place():
+    assert CollectionProfile().update_kwargs()["quantization_config"] == rest.Disabled.DISABLED
+
+
+def test_profile_selection():
+    assert get_collection_profile(CONFIG, "techdocs").name == "default"
+    assert get_collection_profile(CONFIG, "big").name == "compact"
+    assert get_collection_profile({}, "techdocs") == CollectionProfile()
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        get_collection_profile(CONFIG, "techdocs", "missing")
+
+
+def test_unsupported_quantization():
+    with pytest.raises(ValueError):
+        CollectionProfile.from_dict("bad", {"quantization": {"type": "product"}})
@@ -0,0 +1,103 @@
+# tests/loader/test_embedding_pipeline.py
+import asyncio
+import threading
+import time
+
+import pytest
+from llama_index.embeddings.base import BaseEmbedding
+from llama_index.schema import TextNode
+
+from src.loader.embedding_pipeline import EmbeddingPipeline, iter_batches
+
+
+class SlowEmbedding(BaseEmbedding):
+    """Embeds a text as its number, taking longer for the small numbers so the later batches finish first."""
+
+    threads_seen: set = set()
+
+    def _embed(self, text):
+        return [float(text), 1.0]
+
+    def _get_query_embedding(self, query):
+        return self._embed(query)
+
+    async def _aget_query_embedding(self, query):
+        return self._embed(query)
+
+    def _get_text_embedding(self, text):
+        return self._embed(text)
+
+    async def _aget_text_embedding(self, text):
+        return self._embed(text)
+
+    def _get_text_embeddings(self, texts):
+        self.threads_seen.add(threading.current_thread().name)
+        time.sleep(0.02 / (1 + float(texts[0])))
+        return [self._embed(text) for text in texts]
+
+    async def _aget_text_embeddings(self, texts):
+        await asyncio.sleep(0.02 / (1 + float(texts[0])))
+        return [self._embed(text) for text in texts]
+
+
+class RecordingStore:
+    def __init__(self):
+        self.upserts = []
+
+    def add(self, nodes):
+        self.upserts.append(list(nodes))
+
+
+def make_nodes(count: int) -> list:
+    return [TextNode(text=str(i), id_=f"node-{i}") for i in range(count)]
+
+
+def test_iter_batches_splits_in_order():
+    assert list(iter_batches([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+
+
+@pytest.mark.parametrize("embedding_type", ["local", "openai"])
+def test_batches_come_back_in_input_order(embedding_type):
+    pipeline = EmbeddingPipeline(SlowEmbedding(threads_seen=set()), embedding_type, batch_size=3, workers=4,
+                                 max_concurrency=4)
+    nodes = make_nodes(20)
+
+    batches = list(pipeline._embed_batches(nodes))
+
+    assert [node.node_id for batch in batches for node in batch] == [node.node_id for node in nodes]
+    assert all(node.embedding == [float(node.text), 1.0] for node in nodes)
+
+
+def test_local_batches_run_on_the_worker_threads():
+    model = SlowEmbedding(threads_seen=set())
+    pipeline = EmbeddingPipeline(model, "local", batch_size=2, workers=3)
+
+    list(pipeline._embed_batches(make_nodes(12)))
+
+    assert len(model.threads_seen) > 1
+    assert all(name.startswith("embed") for name in model.threads_seen)
+
+
+def test_run_upserts_every_node_in_order():
+    pipeline = EmbeddingPipeline(SlowEmbedding(threads_seen=set()), "local", batch_size=3, workers=4,
+                                 upsert_batch_size=5)
+    nodes = make_nodes(17)
+    store = RecordingStore()
+
+    assert pipeline.run(nodes, store) == 17
+
+    assert [len(batch) for batch in store.upserts] == [5, 5, 5, 2]
+    assert [node.node_id for batch in store.upserts for node in batch] == [node.node_id for node in nodes]
+
+
+def test_nodes_with_an_embedding_skip_the_model():
+    pipeline = EmbeddingPipeline(SlowEmbedding(threads_seen=set()), "local", batch_size=3, workers=2)
+    nodes = make_nodes(4)
+    nodes[1].embedding = [-1.0, -1.0]
+    progress = []
+
+    pipeline.run(nodes, RecordingStore(), progress_callback=lambda **counts: progress.append(counts))
+
+    assert nodes[1].embedding == [-1.0, -1.0]
+    assert sum(counts.get("chunks_embedded", 0) for counts in progress) == 3
+    assert sum(counts.get("points_upserted", 0) for counts in progress) == 4
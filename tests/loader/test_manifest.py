@@ -0,0 +1,165 @@
+# tests/loader/test_manifest.py
+from types import SimpleNamespace
+
+import pytest
+from llama_index.embeddings.base import BaseEmbedding
+from llama_index.node_parser import SentenceSplitter
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
+
+from src.loader import document
+from src.loader.document import DocumentLoader
+from src.loader.embedding_pipeline import EmbeddingPipeline
+from src.loader.lexical_index import LexicalIndex
+from src.loader.manifest import IngestionManifest
+
+COLLECTION = "docs"
+
+
+class CountingEmbedding(BaseEmbedding):
+    """Embeds a text as its length, and remembers which texts it embedded."""
+
+    embedded: list = []
+
+    def _get_query_embedding(self, query):
+        return [float(len(query)), 1.0]
+
+    async def _aget_query_embedding(self, query):
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text):
+        self.embedded.append(text)
+        return [float(len(text)), 1.0]
+
+    async def _aget_text_embedding(self, text):
+        return self._get_text_embedding(text)
+
+
+class FailingPipeline:
+    def run(self, nodes, vector_store, progress_callback=None):
+        raise RuntimeError("embedding service down")
+
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+    monkeypatch.setattr(document, "get_answer_cache", lambda: None)
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION, vectors_config=rest.VectorParams(size=2, distance=rest.Distance.COSINE))
+
+    loader = DocumentLoader.__new__(DocumentLoader)
+    loader.source_dir = str(tmp_path / "source")
+    loader.collection_name = COLLECTION
+    loader.CONFIG = {"Loader": {"out_dir": str(tmp_path / "out")}}
+    loader.client = client
+    loader.resources = SimpleNamespace(
+        get_vector_store=lambda collection: QdrantVectorStore(client=client, collection_name=collection),
+        get_index=lambda collection: None
+    )
+    loader.manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+    loader.lexical_index = LexicalIndex(":memory:")
+    loader.pipeline = EmbeddingPipeline(CountingEmbedding(embedded=[]), "local", workers=1)
+    loader.file_extractor = None
+    loader.transformations = [SentenceSplitter(chunk_size=8, chunk_overlap=0, tokenizer=str.split)]
+    loader.vector_size = 2
+    loader.max_inflight_bytes = 2 ** 20
+    (tmp_path / "source").mkdir()
+    return loader
+
+
+def load(loader, text, file_name="page.txt"):
+    with open(f"{loader.source_dir}/{file_name}", "w", encoding="utf-8") as f:
+        f.write(text)
+    loader.load_documents()
+
+
+def stored_texts(loader):
+    points, _ = loader.client.scroll(COLLECTION, limit=100, with_payload=True)
+    return sorted(document.metadata_dict_to_node(point.payload).get_content() for point in points)
+
+
+def lexical_hits(loader, query):
+    return [chunk_id for chunk_id, _ in loader.lexical_index.search(COLLECTION, query, 10)]
+
+
+FIRST = "One two three four five six.\n\nSeven eight nine ten eleven."
+CHANGED = "One two three four five six.\n\nTwelve thirteen fourteen fifteen."
+
+
+def test_new_document_is_stored_and_recorded(loader):
+    load(loader, FIRST)
+
+    assert stored_texts(loader) == ["One two three four five six.", "Seven eight nine ten eleven."]
+    assert loader.lexical_index.count(COLLECTION) == 2
+    entry = loader.manifest.get(COLLECTION, "page.txt")
+    assert entry["hash"] == IngestionManifest.hash_text(FIRST)
+    assert entry["doc_ids"] == ["page.txt_part_0"]
+    assert "replaced_doc_ids" not in entry
+
+
+def test_unchanged_document_is_skipped(loader):
+    load(loader, FIRST)
+    loader.pipeline.embed_model.embedded.clear()
+
+    load(loader, FIRST)
+
+    assert loader.pipeline.embed_model.embedded == []
+    assert len(stored_texts(loader)) == 2
+
+
+def test_changed_document_replaces_its_points(loader):
+    load(loader, FIRST)
+
+    load(loader, CHANGED)
+
+    assert stored_texts(loader) == ["One two three four five six.", "Twelve thirteen fourteen fifteen."]
+    assert loader.lexical_index.count(COLLECTION) == 2
+    assert lexical_hits(loader, "seven") == []
+    assert len(lexical_hits(loader, "twelve")) == 1
+    assert loader.manifest.get(COLLECTION, "page.txt")["hash"] == IngestionManifest.hash_text(CHANGED)
+
+
+def test_unchanged_chunks_of_a_changed_document_keep_their_vectors(loader):
+    load(loader, FIRST)
+    loader.pipeline.embed_model.embedded.clear()
+
+    load(loader, CHANGED)
+
+    embedded = loader.pipeline.embed_model.embedded
+    assert len(embedded) == 1
+    assert embedded[0].endswith("\n\nTwelve thirteen fourteen fifteen.")
+
+
+def test_failed_load_keeps_the_previous_points(loader):
+    load(loader, FIRST)
+    loader.pipeline = FailingPipeline()
+
+    with pytest.raises(RuntimeError):
+        load(loader, CHANGED)
+
+    assert stored_texts(loader) == ["One two three four five six.", "Seven eight nine ten eleven."]
+    assert len(lexical_hits(loader, "seven")) == 1
+    assert loader.manifest.get(COLLECTION, "page.txt")["hash"] == IngestionManifest.hash_text(FIRST)
+
+
+def test_documents_are_tracked_per_collection(loader):
+    load(loader, FIRST)
+    loader.client.create_collection("other", vectors_config=rest.VectorParams(size=2, distance=rest.Distance.COSINE))
+    loader.collection_name = "other"
+
+    load(loader, FIRST)
+
+    assert loader.manifest.get("other", "page.txt")["hash"] == IngestionManifest.hash_text(FIRST)
+    assert loader.client.count(COLLECTION).count == 2
+
+
+def test_manifest_survives_a_reload(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = IngestionManifest(path)
+    manifest.record("docs", "page.txt", "hash", ["page.txt_part_0"], {"chunk": "point"})
+    manifest.save()
+
+    entry = IngestionManifest(path).get("docs", "page.txt")
+
+    assert entry["hash"] == "hash"
+    assert entry["chunks"] == {"chunk": "point"}
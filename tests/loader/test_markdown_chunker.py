@@ -0,0 +1,92 @@
+# tests/loader/test_markdown_chunker.py
+from llama_index import Document
+
+from src.loader.markdown_chunker import MarkdownChunker, parse_sections
+
+PAGE = """Intro line.
+
+# Install
+
+Run the installer.
+
+## Configuration
+
+Set the options:
+
+* first
+* second
+
+```python
+# not a heading
+
+print("configured")
+```
+
+# Usage
+
+Call the tool.
+"""
+
+
+def chunker(chunk_size):
+    # Whitespace tokens keep the budgets readable and need no tokenizer download.
+    return MarkdownChunker(chunk_size=chunk_size, tokenizer=str.split)
+
+
+def test_parse_sections_follows_the_heading_path():
+    sections = parse_sections(PAGE)
+
+    assert [path for path, _ in sections] == [
+        (), ("Install",), ("Install", "Configuration"), ("Usage",)
+    ]
+
+
+def test_parse_sections_keeps_blocks_and_fences_whole():
+    _, blocks = parse_sections(PAGE)[2]
+
+    assert blocks == [
+        "## Configuration",
+        "Set the options:",
+        "* first\n* second",
+        '```python\n# not a heading\n\nprint("configured")\n```',
+    ]
+
+
+def test_parse_sections_of_text_without_headings():
+    assert parse_sections("One.\n\nTwo.") == [((), ["One.", "Two."])]
+
+
+def test_small_sections_are_merged():
+    chunks = chunker(200).split_sections(PAGE)
+
+    assert len(chunks) == 1
+    assert chunks[0][0] == ()
+    assert chunks[0][1].startswith("Intro line.\n\n# Install")
+
+
+def test_sections_over_the_budget_start_new_chunks():
+    chunks = chunker(12).split_sections(PAGE)
+
+    assert [path for path, _ in chunks] == [
+        (), ("Install", "Configuration"), ("Install", "Configuration"), ("Usage",)
+    ]
+    assert all(len(text.split()) <= 12 for _, text in chunks)
+
+
+def test_oversized_code_block_is_split_with_its_fence():
+    code = "```\n" + "\n".join(f"line {i}" for i in range(20)) + "\n```"
+
+    pieces = [text for _, text in chunker(10).split_sections(code)]
+
+    assert len(pieces) > 1
+    for piece in pieces:
+        assert piece.startswith("```\n") and piece.endswith("\n```")
+    assert "\n".join(piece[4:-4] for piece in pieces) == code[4:-4]
+
+
+def test_nodes_carry_their_heading_path():
+    nodes = chunker(12).get_nodes_from_documents([Document(text=PAGE)])
+
+    assert [node.metadata["heading_path"] for node in nodes] == [
+        "", "Install > Configuration", "Install > Configuration", "Usage"
+    ]
@@ -0,0 +1,105 @@
+# tests/scraper/test_crawler.py
+import asyncio
+import logging
+
+import httpx
+import pytest
+
+from src.scraper import async_scraper, crawler
+from src.scraper.crawler import AsyncCrawler
+from src.scraper.http_cache import HttpCache
+from src.scraper.scraper import WebScraper, parse_html
+
+CONFIG = {"Crawler": {"concurrency": 4, "per_host_concurrency": 2, "politeness_delay": 0, "timeout": 5}}
+
+PAGES = {
+    "/docs/": '<html><a href="install">Install</a><a href="/docs/usage">Usage</a></html>',
+    "/docs/install": "<html><p>Install it.</p></html>",
+    "/docs/usage": "<html><p>Use it.</p></html>",
+}
+
+
+def serve(request: httpx.Request) -> httpx.Response:
+    # /start redirects to the docs index, whose relative links are relative to /docs/
+    if request.url.path == "/start":
+        return httpx.Response(301, headers={"Location": "https://docs.example.com/docs/"})
+    if request.url.path in PAGES:
+        return httpx.Response(200, headers={"content-type": "text/html"}, text=PAGES[request.url.path])
+    return httpx.Response(404)
+
+
+class FakeScraper:
+    """The parts of WebScraper the crawler uses, saving pages in memory."""
+
+    handle_response = WebScraper.handle_response
+    commit_response = WebScraper.commit_response
+    is_valid_url = staticmethod(WebScraper.is_valid_url)
+
+    def __init__(self, cache_dir):
+        self.CONFIG = CONFIG
+        self.logger = logging.getLogger(__name__)
+        self.parser_backend = "html.parser"
+        self.http_cache = HttpCache(cache_dir, ttl_seconds=0)
+        self.saved = []
+
+    def get_random_user_agent(self):
+        return "test-agent"
+
+    def save_to_file(self, url, content, title="", description=""):
+        self.saved.append(url)
+        return f"/data/{len(self.saved)}.md"
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    async def parse_in_process(content, backend):
+        return parse_html(content, backend)
+
+    monkeypatch.setattr(crawler, "parse_in_pool", parse_in_process)
+    return FakeScraper(str(tmp_path / "http_cache"))
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    created = []
+
+    def get_client(config):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(serve), follow_redirects=True)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(crawler, "get_http_client", get_client)
+    return created
+
+
+def test_links_resolve_against_the_url_after_redirects(scraper, clients):
+    result = asyncio.run(AsyncCrawler(max_depth=1, scraper=scraper).crawl(["https://docs.example.com/start"]))
+
+    assert sorted(scraper.saved) == ["https://docs.example.com/docs/install",
+                                     "https://docs.example.com/docs/usage",
+                                     "https://docs.example.com/start"]
+    assert result["failed"] == []
+
+
+def test_crawl_does_not_close_the_shared_client(scraper, clients):
+    async def crawl_twice():
+        for _ in range(2):
+            await AsyncCrawler(max_depth=0, scraper=scraper).crawl(["https://docs.example.com/docs/usage"])
+        return [client.is_closed for client in clients]
+
+    assert asyncio.run(crawl_twice()) == [False, False]
+
+
+def test_http_client_is_shared_within_an_event_loop():
+    async def clients_of_loop():
+        first = async_scraper.get_http_client(CONFIG)
+        second = async_scraper.get_http_client(CONFIG)
+        await async_scraper.close_http_client()
+        return first, second
+
+    first, second = asyncio.run(clients_of_loop())
+    other, _ = asyncio.run(clients_of_loop())
+
+    assert first is second
+    assert first.is_closed
+    assert other is not first
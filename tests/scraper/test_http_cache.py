@@ -0,0 +1,69 @@
+# tests/scraper/test_http_cache.py
+import pytest
+
+from src.scraper.http_cache import HttpCache
+
+URL = "https://docs.example.com/guide"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(str(tmp_path / "http_cache"), ttl_seconds=3600)
+
+
+def test_store_reports_changed_bodies(cache):
+    assert cache.store(URL, "<html>v1</html>", etag='"v1"') is True
+    assert cache.store(URL, "<html>v1</html>", etag='"v1"') is False
+    assert cache.store(URL, "<html>v2</html>", etag='"v2"') is True
+    assert cache.read_body(URL) == "<html>v2</html>"
+
+
+def test_store_records_validators(cache):
+    cache.store(URL, "<html></html>", etag='"abc"', last_modified="Wed, 21 Oct 2015 07:28:00 GMT")
+
+    entry = cache.get(URL)
+
+    assert entry["etag"] == '"abc"'
+    assert entry["last_modified"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert cache.is_fresh(entry)
+
+
+def test_links_are_kept_only_while_the_body_is_unchanged(cache):
+    cache.store(URL, "<html>v1</html>", links=["/a"])
+
+    cache.store(URL, "<html>v1</html>")
+    assert cache.get(URL)["links"] == ["/a"]
+
+    cache.store(URL, "<html>v2</html>")
+    assert cache.get(URL)["links"] is None
+
+
+def test_has_changed(cache):
+    assert cache.has_changed(URL, "<html>v1</html>")
+    cache.store(URL, "<html>v1</html>")
+    assert not cache.has_changed(URL, "<html>v1</html>")
+    assert cache.has_changed(URL, "<html>v2</html>")
+
+
+def test_stale_entry(tmp_path):
+    cache = HttpCache(str(tmp_path), ttl_seconds=0)
+    cache.store(URL, "<html></html>")
+
+    assert not cache.is_fresh(cache.get(URL))
+
+
+def test_missing_entry(cache):
+    assert cache.get(URL) is None
+
+
+@pytest.mark.parametrize("entry, headers", [
+    (None, {}),
+    ({"etag": None, "last_modified": None}, {}),
+    ({"etag": '"abc"', "last_modified": None}, {"If-None-Match": '"abc"'}),
+    ({"etag": None, "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+     {"If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+    ({"etag": '"abc"', "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+     {"If-None-Match": '"abc"', "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+])
+def test_conditional_headers(entry, headers):
+    assert HttpCache.conditional_headers(entry) == headers
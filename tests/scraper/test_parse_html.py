@@ -0,0 +1,66 @@
+# tests/scraper/test_parse_html.py
+import pytest
+
+from src.scraper.scraper import PARSER_BACKENDS, parse_html
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <title>
+    Install <b>guide</b> &amp; notes
+  </title>
+  <meta name="description" content="How to install the tool">
+  <style>p { color: red; }</style>
+  <script>var ignored = "<p>not content</p>";</script>
+</head>
+<body>
+  <h1>Install</h1>
+  <p>Run the <code>install</code> command, then read <a href="/docs/next">the next page</a>.</p>
+  <div>
+    <h2>Options</h2>
+    <ul>
+      <li>First <em>option</em></li>
+      <li>Second option</li>
+    </ul>
+    <pre>pip install tool
+  --upgrade</pre>
+  </div>
+  <template><p>Never rendered</p></template>
+  <a href="https://example.com/other">Other site</a>
+  <!-- a comment -->
+</body>
+</html>
+"""
+
+
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+def test_backend_parses_fixture_page(backend):
+    parsed = parse_html(PAGE, backend)
+
+    assert parsed["title"] == "Install guide & notes"
+    assert parsed["metadata"] == {"description": "How to install the tool"}
+    assert parsed["links"] == ["/docs/next", "https://example.com/other"]
+    blocks = parsed["content"].split("\n\n")
+    assert blocks[0] == "# Install"
+    assert "## Options" in blocks
+    assert "* Second option" in blocks
+    assert "```\npip install tool\n  --upgrade\n```" in blocks
+    assert blocks[-1] == "[Other site](https://example.com/other)"
+    assert "not content" not in parsed["content"]
+    assert "Never rendered" not in parsed["content"]
+
+
+def test_backends_agree():
+    html_parser, *others = [parse_html(PAGE, backend) for backend in PARSER_BACKENDS]
+    for parsed in others:
+        assert parsed == html_parser
+
+
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+def test_missing_title_is_empty(backend):
+    assert parse_html("<html><body><p>No title</p></body></html>", backend)["title"] == ""
+
+
+def test_unsupported_backend():
+    with pytest.raises(ValueError):
+        parse_html(PAGE, "html5lib")
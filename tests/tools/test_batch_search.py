@@ -0,0 +1,93 @@
+# tests/tools/test_batch_search.py
+import asyncio
+
+import pytest
+
+from src.tools import batch_search
+from src.tools.batch_search import BatchDocumentSearch
+from src.utils.resources import ResourceRegistry
+
+CONFIG = {
+    "Key_File": "missing.env",
+    "Search": {"batch_search_size": 2, "batch_max_concurrency": 2},
+}
+
+
+class FakeAsyncClient:
+    """Answers each query vector with a single point echoing it, failing on the vectors in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+
+    async def search_batch(self, collection_name, requests):
+        self.calls.append([request.vector[0] for request in requests])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if any(request.vector[0] in self.failing for request in requests):
+                raise RuntimeError("search failed")
+            return [[request.vector[0]] for request in requests]
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def make_search(monkeypatch):
+    def make(client):
+        registry = ResourceRegistry(CONFIG)
+        registry._aclient = client
+
+        async def embed(queries, batch_size):
+            return [[float(query)] for query in queries]
+
+        registry.aget_query_embeddings = embed
+        monkeypatch.setattr(batch_search, "get_resource_registry", lambda: registry)
+        monkeypatch.setattr(batch_search, "point_to_node", lambda point: point)
+        monkeypatch.setattr(batch_search, "node_to_chunk", lambda node: node)
+        return BatchDocumentSearch("docs", top_k=1)
+    return make
+
+
+def test_requests_in_flight_are_bounded(make_search):
+    client = FakeAsyncClient()
+    search = make_search(client)
+
+    results, errors = asyncio.run(search.search([str(i) for i in range(12)]))
+
+    assert len(client.calls) == 6
+    assert client.max_in_flight == 2
+    assert results == [[float(i)] for i in range(12)]
+    assert errors == {}
+
+
+def test_semaphore_is_bound_to_the_running_loop(make_search):
+    search = make_search(FakeAsyncClient())
+
+    queries = [str(i) for i in range(8)]
+    first = asyncio.run(search.search(queries))
+    second = asyncio.run(search.search(queries))
+
+    assert first == second
+
+
+def test_failed_query_does_not_fail_the_others(make_search):
+    client = FakeAsyncClient(failing={3.0})
+    search = make_search(client)
+
+    results, errors = asyncio.run(search.search(["1", "2", "3", "4", "5"]))
+
+    assert results == [[1.0], [2.0], [], [4.0], [5.0]]
+    assert errors == {2: "search failed"}
+    assert [3.0] in client.calls and [4.0] in client.calls
+
+
+def test_too_many_queries_are_rejected(make_search):
+    search = make_search(FakeAsyncClient())
+    search.max_queries = 2
+
+    with pytest.raises(ValueError):
+        asyncio.run(search.search(["1", "2", "3"]))
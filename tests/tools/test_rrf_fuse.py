@@ -0,0 +1,34 @@
+# tests/tools/test_rrf_fuse.py
+import pytest
+
+from src.tools.doc_search import rrf_fuse
+
+
+def test_ids_ranked_by_both_retrievers_come_first():
+    fused = rrf_fuse([["a", "b", "c"], ["d", "c", "a"]], k=60)
+
+    assert [item_id for item_id, _ in fused][:2] == ["a", "c"]
+    assert {item_id for item_id, _ in fused} == {"a", "b", "c", "d"}
+
+
+def test_scores_sum_reciprocal_ranks():
+    scores = dict(rrf_fuse([["a", "b"], ["b"]], k=10))
+
+    assert scores["a"] == pytest.approx(1 / 11)
+    assert scores["b"] == pytest.approx(1 / 12 + 1 / 11)
+
+
+def test_single_ranking_keeps_its_order():
+    assert [item_id for item_id, _ in rrf_fuse([["x", "y", "z"]])] == ["x", "y", "z"]
+
+
+def test_larger_k_flattens_the_top_ranks():
+    sharp = dict(rrf_fuse([["a", "b"]], k=1))
+    flat = dict(rrf_fuse([["a", "b"]], k=100))
+
+    assert sharp["a"] / sharp["b"] > flat["a"] / flat["b"]
+
+
+@pytest.mark.parametrize("rankings", [[], [[]], [[], []]])
+def test_empty_rankings(rankings):
+    assert rrf_fuse(rankings) == []
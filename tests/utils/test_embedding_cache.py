@@ -0,0 +1,103 @@
+# tests/utils/test_embedding_cache.py
+import pytest
+
+from src.utils.embedding_cache import QueryEmbeddingCache
+from src.utils.state import InMemoryStateBackend
+
+MODEL = "FakeEmbedding:fake"
+
+
+class FakeEmbedding:
+    """Embeds a query as its length, counting the queries it embedded."""
+
+    model_name = "fake"
+
+    def __init__(self):
+        self.embedded = []
+
+    def get_query_embedding(self, query):
+        self.embedded.append(query)
+        return [float(len(query)), 1.0]
+
+    def _get_text_embeddings(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.fixture
+def persist_path(tmp_path):
+    return str(tmp_path / "cache" / "queries.sqlite")
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryEmbeddingCache(max_entries=2)
+    cache.put(MODEL, "a", [1.0])
+    cache.put(MODEL, "b", [2.0])
+    cache.get(MODEL, "a")
+
+    cache.put(MODEL, "c", [3.0])
+
+    assert cache.get_many(MODEL, ["a", "b", "c"]) == [[1.0], None, [3.0]]
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_of_other_models_are_not_returned():
+    cache = QueryEmbeddingCache()
+    cache.put(MODEL, "a", [1.0])
+
+    assert cache.get("OtherEmbedding:other", "a") is None
+
+
+def test_embeddings_are_reloaded_from_disk(persist_path):
+    cache = QueryEmbeddingCache(persist_path=persist_path)
+    cache.put_many(MODEL, [("a", [1.0, 2.0]), ("b", [3.0, 4.0])])
+    cache.close()
+
+    reloaded = QueryEmbeddingCache(persist_path=persist_path)
+
+    assert reloaded.get_many(MODEL, ["a", "b", "c"]) == [[1.0, 2.0], [3.0, 4.0], None]
+    assert reloaded.stats()["persistent_hits"] == 2
+    assert reloaded.stats()["misses"] == 1
+    reloaded.close()
+
+
+def test_evicted_entries_are_read_back_from_disk(persist_path):
+    cache = QueryEmbeddingCache(max_entries=1, persist_path=persist_path)
+    cache.put(MODEL, "a", [1.0])
+    cache.put(MODEL, "b", [2.0])
+
+    assert cache.get(MODEL, "a") == [1.0]
+    assert cache.stats()["persistent_hits"] == 1
+    cache.close()
+
+
+def test_shared_backend_serves_other_workers():
+    backend = InMemoryStateBackend()
+    QueryEmbeddingCache(backend=backend).put(MODEL, "a", [1.0, 2.0])
+
+    other = QueryEmbeddingCache(backend=backend)
+
+    assert other.get(MODEL, "a") == [1.0, 2.0]
+    assert other.stats()["persistent_hits"] == 1
+
+
+def test_misses_are_embedded_once_in_query_order():
+    cache = QueryEmbeddingCache()
+    model = FakeEmbedding()
+    cache.put(QueryEmbeddingCache.model_id(model), "cached", [0.0, 0.0])
+
+    embeddings = cache.get_query_embeddings(model, ["abc", "cached", "a  b", "abc"], batch_size=1)
+
+    assert embeddings == [[3.0, 1.0], [0.0, 0.0], [3.0, 1.0], [3.0, 1.0]]
+    assert model.embedded == ["abc", "a b"]
+
+
+def test_query_embedding_normalizes_whitespace():
+    cache = QueryEmbeddingCache()
+    model = FakeEmbedding()
+
+    cache.get_query_embedding(model, "how  to\tinstall")
+    cache.get_query_embedding(model, "how to install")
+
+    assert model.embedded == ["how to install"]
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,57 @@
+# tests/utils/test_page_metadata.py
+from datetime import datetime, timezone
+
+from qdrant_client.http import models as rest
+
+from src.utils.page_metadata import build_page_metadata, build_search_filter, url_prefixes
+
+
+def test_no_condition_gives_no_filter():
+    assert build_search_filter() is None
+    assert build_search_filter(domain="", url_prefix="") is None
+
+
+def test_domain_is_normalized():
+    search_filter = build_search_filter(domain=" WWW.Docs.Python.org ")
+
+    assert search_filter.must == [rest.FieldCondition(key="domain", match=rest.MatchValue(value="docs.python.org"))]
+
+
+def test_url_prefix_matches_the_stored_prefixes():
+    search_filter = build_search_filter(url_prefix="https://www.Docs.x.io/guide/")
+
+    assert search_filter.must == [
+        rest.FieldCondition(key="url_prefixes", match=rest.MatchValue(value="https://docs.x.io/guide"))
+    ]
+    assert "https://docs.x.io/guide" in url_prefixes("https://docs.x.io/guide/install?lang=en")
+
+
+def test_fetched_after_is_a_timestamp_range():
+    fetched_after = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    search_filter = build_search_filter(fetched_after=fetched_after)
+
+    assert search_filter.must == [
+        rest.FieldCondition(key="fetched_at", range=rest.Range(gte=fetched_after.timestamp()))
+    ]
+
+
+def test_naive_fetched_after_is_read_as_utc():
+    search_filter = build_search_filter(fetched_after=datetime(2024, 1, 1))
+
+    assert search_filter.must[0].range.gte == datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def test_conditions_are_combined():
+    search_filter = build_search_filter(domain="x.io", url_prefix="https://x.io/guide",
+                                        fetched_after=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    assert [condition.key for condition in search_filter.must] == ["domain", "url_prefixes", "fetched_at"]
+
+
+def test_page_metadata_matches_the_filters():
+    metadata = build_page_metadata("https://www.x.io/guide/install", title=" Install ", fetched_at=1.0)
+
+    assert metadata["domain"] == "x.io"
+    assert metadata["title"] == "Install"
+    assert metadata["url_prefixes"] == ["https://x.io", "https://x.io/guide", "https://x.io/guide/install"]
@@ -0,0 +1,112 @@
+# tests/utils/test_state.py
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from src.utils import state
+from src.utils.state import InMemoryStateBackend, RedisStateBackend, create_state_backend
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryStateBackend()
+    return RedisStateBackend(fakeredis.FakeRedis(server=fakeredis.FakeServer()))
+
+
+def increment(value):
+    count = int(value or 0) + 1
+    return str(count).encode(), count
+
+
+def test_set_get_and_expiry(backend):
+    backend.set("a", b"1")
+    backend.set("b", b"2", ttl=0.05)
+
+    assert backend.mget(["a", "b", "c"]) == [b"1", b"2", None]
+    time.sleep(0.1)
+    assert backend.get("b") is None
+
+
+def test_update_returns_the_result_of_func(backend):
+    assert backend.update("counter", increment) == 1
+    assert backend.update("counter", increment) == 2
+    assert backend.get("counter") == b"2"
+
+
+def test_update_leaves_the_key_when_func_returns_none(backend):
+    backend.set("key", b"kept")
+
+    assert backend.update("key", lambda value: (None, value)) == b"kept"
+    assert backend.get("key") == b"kept"
+
+
+def test_concurrent_updates_are_not_lost(backend):
+    def work():
+        for _ in range(25):
+            backend.update("counter", increment)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.get("counter") == b"200"
+
+
+def test_sorted_sets_rank_by_score(backend):
+    backend.zadd("lru", "a", 3.0)
+    backend.zadd("lru", "b", 1.0)
+    backend.zadd("lru", "c", 2.0)
+
+    assert backend.zrange("lru") == ["b", "c", "a"]
+    assert backend.zpopmin("lru") == ["b"]
+    assert backend.zremrangebyscore("lru", 2.5) == ["c"]
+    assert backend.zcard("lru") == 1
+
+
+def test_redis_update_retries_after_a_concurrent_write():
+    server = fakeredis.FakeServer()
+    backend = RedisStateBackend(fakeredis.FakeRedis(server=server))
+    other_writer = RedisStateBackend(fakeredis.FakeRedis(server=server))
+    backend.set("counter", b"10")
+    seen = []
+
+    def func(value):
+        seen.append(value)
+        if len(seen) == 1:
+            other_writer.set("counter", b"20")
+        return increment(value)
+
+    assert backend.update("counter", func) == 21
+    assert seen == [b"10", b"20"]
+    assert backend.get("counter") == b"21"
+
+
+def test_redis_update_gives_up_after_the_retries(monkeypatch):
+    monkeypatch.setattr(state, "UPDATE_RETRIES", 3)
+    server = fakeredis.FakeServer()
+    backend = RedisStateBackend(fakeredis.FakeRedis(server=server))
+    other_writer = RedisStateBackend(fakeredis.FakeRedis(server=server))
+
+    def func(value):
+        other_writer.set("counter", b"0")
+        return increment(value)
+
+    with pytest.raises(RuntimeError):
+        backend.update("counter", func)
+
+
+def test_redis_keys_are_prefixed():
+    client = fakeredis.FakeRedis()
+    RedisStateBackend(client, key_prefix="app:").set("key", b"value")
+
+    assert client.get("app:key") == b"value"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_state_backend({"State": {"backend": "etcd"}})